@@ -0,0 +1,246 @@
+"""
+Perfect Books - Engine Method Benchmarks
+
+Times the engine's hot methods against a synthetic ledger fixture (see
+ledger_fixtures.py) and reports p50/p95/p99 latency per case. Regular-user
+cases cycle through a fixed, seeded sample of users; heavy cases hit the
+fixture's one very large user. Writes (log_expense, advance_time) run against
+a scratch copy of the fixture, so every run starts from the same data.
+
+Results can be saved as a JSON baseline; later runs on the same preset are
+compared against it and exit non-zero when a case's p50 or p95 regressed by
+more than --threshold. Baselines are machine-specific: record one on the
+machine (or CI runner) that will do the comparing.
+
+Usage:
+    python benchmarks/engine_methods.py [preset] [--iterations N] [--warmup N]
+        [--cases name,name] [--seed N] [--output results.json]
+        [--baseline path] [--save-baseline] [--threshold 0.2]
+
+With no --baseline, benchmarks/baselines/<preset>.json is used if it exists.
+"""
+
+import argparse
+import datetime
+import json
+import math
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ledger_fixtures import DEFAULT_SEED, PRESETS, get_fixture
+
+import engine  # ledger_fixtures puts src/ on sys.path
+from db_pool import get_pool
+
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+
+# Differences below this many milliseconds are noise, whatever the ratio
+NOISE_FLOOR_MS = 0.2
+
+
+def _checked(result):
+    """Raise if an engine method reported a failure, so it isn't timed as a success."""
+    if isinstance(result, tuple) and result and result[0] is False:
+        raise RuntimeError(result[1])
+    if isinstance(result, dict) and any('error occurred' in line for line in result.get('log', [])):
+        raise RuntimeError(result['log'][-1])
+    return result
+
+
+# (name, users, call); users is 'regular', 'heavy' or 'distinct' (a different
+# regular user every iteration, for writes that only do work once per user)
+CASES = [
+    ('get_ledger_entries', 'regular',
+     lambda sim, user: sim.get_ledger_entries(user['user_id'], transaction_limit=50)),
+    ('get_ledger_entries[heavy]', 'heavy',
+     lambda sim, user: sim.get_ledger_entries(user['user_id'], transaction_limit=50)),
+    ('get_ledger_entries[heavy, page 20]', 'heavy',
+     lambda sim, user: sim.get_ledger_entries(user['user_id'], transaction_limit=50, transaction_offset=950)),
+    ('get_ledger_entries[heavy, account]', 'heavy',
+     lambda sim, user: sim.get_ledger_entries(user['user_id'], transaction_limit=50, account_filter='Checking')),
+    ('get_ledger_entries[search]', 'regular',
+     lambda sim, user: sim.get_ledger_entries(user['user_id'], transaction_limit=50, search_query='checking')),
+    ('get_ledger_entries[heavy, search]', 'heavy',
+     lambda sim, user: sim.get_ledger_entries(user['user_id'], transaction_limit=50, search_query='whole')),
+    ('get_dashboard_data', 'regular',
+     lambda sim, user: sim.get_dashboard_data(user['user_id'], days=30)),
+    ('get_dashboard_data[heavy]', 'heavy',
+     lambda sim, user: sim.get_dashboard_data(user['user_id'], days=30)),
+    ('get_accounts_list', 'regular',
+     lambda sim, user: sim.get_accounts_list(user['user_id'])),
+    ('get_balance_sheet', 'regular',
+     lambda sim, user: sim.get_balance_sheet(user['user_id'])),
+    ('get_balance_sheet[heavy]', 'heavy',
+     lambda sim, user: sim.get_balance_sheet(user['user_id'])),
+    ('log_expense', 'regular',
+     lambda sim, user: _checked(sim.log_expense(user['user_id'], user['checking_id'], 'Benchmark Coffee', 4.25))),
+    ('advance_time', 'distinct',
+     lambda sim, user: _checked(sim.advance_time(user['user_id'], 30))),
+]
+
+
+def percentile(sorted_samples, p):
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_samples[max(0, math.ceil(p / 100 * len(sorted_samples)) - 1)]
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'n': len(ordered),
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p95_ms': round(percentile(ordered, 95), 3),
+        'p99_ms': round(percentile(ordered, 99), 3),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def _load_users(db_path, metadata, count, seed):
+    """Return (seeded sample of regular users, the heavy user), with their Checking account ids."""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        checking = dict(conn.execute("SELECT user_id, account_id FROM accounts WHERE name = 'Checking'"))
+    finally:
+        conn.close()
+
+    heavy_id = metadata['heavy_user_id']
+    regular_ids = sorted(user_id for user_id in checking if user_id != heavy_id)
+    sample = random.Random(seed).sample(regular_ids, min(count, len(regular_ids)))
+    return ([{'user_id': user_id, 'checking_id': checking[user_id]} for user_id in sample],
+            {'user_id': heavy_id, 'checking_id': checking[heavy_id]})
+
+
+def run_cases(sim, cases, regular, heavy, iterations, warmup):
+    """Time each case; returns {name: summary}."""
+    results = {}
+    distinct = iter(regular)
+    for name, users, call in cases:
+        samples = []
+        for i in range(warmup + iterations):
+            if users == 'heavy':
+                user = heavy
+            elif users == 'distinct':
+                user = next(distinct, None)
+                if user is None:
+                    break
+            else:
+                user = regular[i % len(regular)]
+            started = time.perf_counter()
+            call(sim, user)
+            elapsed = (time.perf_counter() - started) * 1000
+            if i >= warmup:
+                samples.append(elapsed)
+        if samples:
+            results[name] = summarize(samples)
+            stats = results[name]
+            print(f"  {name:<38} p50 {stats['p50_ms']:9.2f} ms   p95 {stats['p95_ms']:9.2f} ms   "
+                  f"p99 {stats['p99_ms']:9.2f} ms   n={stats['n']}")
+        else:
+            print(f"  {name:<38} skipped (not enough users)")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print each case against the baseline.
+
+    Returns:
+        list: Names of cases whose p50 or p95 regressed by more than threshold
+    """
+    regressions = []
+    print(f"\nCompared with baseline from {baseline.get('created_at', '?')} (threshold +{threshold:.0%}):")
+    for name, stats in results['cases'].items():
+        before = baseline.get('cases', {}).get(name)
+        if not before:
+            print(f"  {name:<38} new case")
+            continue
+        ratios = {key: stats[key] / before[key] if before[key] else 1.0 for key in ('p50_ms', 'p95_ms')}
+        flags = [key[:3] for key, ratio in ratios.items()
+                 if ratio > 1 + threshold and stats[key] - before[key] > NOISE_FLOOR_MS]
+        status = f"REGRESSED ({', '.join(flags)})" if flags else "ok"
+        print(f"  {name:<38} p50 x{ratios['p50_ms']:5.2f}   p95 x{ratios['p95_ms']:5.2f}   {status}")
+        if flags:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the engine's hot methods on a synthetic ledger")
+    parser.add_argument('preset', nargs='?', default='small', choices=sorted(PRESETS))
+    parser.add_argument('--iterations', type=int, default=200, help="Timed calls per case")
+    parser.add_argument('--warmup', type=int, default=5, help="Untimed calls per case before timing")
+    parser.add_argument('--cases', help="Comma-separated case names (default: all)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--output', help="Also write the results JSON here")
+    parser.add_argument('--baseline', help="Baseline JSON (default: benchmarks/baselines/<preset>.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="Write these results as the baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    cases = CASES
+    if args.cases:
+        wanted = {name.strip() for name in args.cases.split(',')}
+        cases = [case for case in CASES if case[0] in wanted]
+        unknown = wanted - {case[0] for case in cases}
+        if unknown:
+            parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+
+    fixture_path, metadata = get_fixture(args.preset, args.seed)
+    regular, heavy = _load_users(fixture_path, metadata, args.warmup + args.iterations, args.seed)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        db_path = Path(scratch) / "perfectbooks.db"
+        shutil.copyfile(fixture_path, db_path)
+        engine.DB_PATH = db_path
+        sim = engine.BusinessSimulator()
+
+        print(f"\n'{args.preset}' fixture: {metadata['users']:,} users, {metadata['ledger_rows']:,} ledger rows; "
+              f"{args.iterations} runs per case after {args.warmup} warm-up")
+        case_results = run_cases(sim, cases, regular, heavy, args.iterations, args.warmup)
+        get_pool(db_path).close_idle()
+
+    results = {
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'preset': args.preset,
+        'fixture': metadata,
+        'iterations': args.iterations,
+        'warmup': args.warmup,
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+        },
+        'cases': case_results,
+    }
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    baseline_path = Path(args.baseline) if args.baseline else BASELINES_DIR / f"{args.preset}.json"
+    regressions = []
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2))
+        print(f"\nBaseline saved to {baseline_path}")
+    elif baseline_path.exists():
+        regressions = compare(results, json.loads(baseline_path.read_text()), args.threshold)
+    else:
+        print(f"\nNo baseline at {baseline_path}; run with --save-baseline to record one")
+
+    if regressions:
+        print(f"[ERROR] {len(regressions)} case(s) regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
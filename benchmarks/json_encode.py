@@ -0,0 +1,110 @@
+"""
+Perfect Books - JSON Encode Microbenchmark
+
+Times how long each JSON provider takes to turn a 5,000-row ledger page into
+a Flask response body, the same call jsonify() makes in /api/ledger.
+
+The page is synthetic but has the shape get_ledger_entries() returns
+(including running_balance, as in an account-filtered view) and is generated
+from a fixed seed, so runs are comparable. A handful of Decimal and date
+values are mixed in to exercise the default() fallback both providers share.
+
+Usage:
+    python benchmarks/json_encode.py [rows] [repeats]
+"""
+
+import datetime
+import json
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from flask import Flask
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from json_provider import CustomJSONProvider, OrjsonJSONProvider, orjson  # noqa: E402
+
+
+def build_ledger_page(rows, seed=42):
+    """Return a list of ledger entry dicts shaped like get_ledger_entries()."""
+    rnd = random.Random(seed)
+    accounts = ['Checking', 'Savings', 'Visa', 'Expenses', 'Income']
+    descriptions = ['Safeway', 'Chipotle', 'Shell', 'Amazon', 'Paycheck', 'Rent', 'Café Olé']
+    start = datetime.date(2024, 1, 1)
+    balance = 2500.0
+    page = []
+    for i in range(rows):
+        day = start + datetime.timedelta(days=i // 4)
+        amount = round(rnd.uniform(1, 400), 2)
+        debit = amount if i % 2 == 0 else None
+        credit = None if i % 2 == 0 else amount
+        balance += (debit or 0) - (credit or 0)
+        page.append({
+            'entry_id': rows - i,
+            'transaction_uuid': f"{rnd.getrandbits(128):032x}",
+            'transaction_date': f"{day.isoformat()} 12:00:00",
+            'description': rnd.choice(descriptions),
+            'account': rnd.choice(accounts),
+            'debit': debit,
+            'credit': credit,
+            'category_id': rnd.randint(1, 25),
+            'category_name': 'Food & Dining',
+            'category_color': '#f59e0b',
+            'is_business': i % 7 == 0,
+            'running_balance': round(balance, 2),
+        })
+    # A few values that need the default() fallback
+    for entry in page[::500]:
+        entry['debit'] = Decimal(str(entry['debit'] or 0))
+        entry['transaction_date'] = datetime.date.fromisoformat(entry['transaction_date'][:10])
+    return page
+
+
+def time_provider(provider_class, payload, repeats):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+    samples = []
+    with app.app_context():
+        body = app.json.response(payload).get_data()
+        for _ in range(repeats):
+            started = time.perf_counter()
+            app.json.response(payload).get_data()
+            samples.append((time.perf_counter() - started) * 1000)
+    return body, samples
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    payload = build_ledger_page(rows)
+
+    providers = [CustomJSONProvider]
+    if orjson is not None:
+        providers.append(OrjsonJSONProvider)
+    else:
+        print("orjson is not installed - timing the standard library provider only")
+
+    print(f"Encoding a {rows}-row ledger page, {repeats} runs per provider")
+    bodies = {}
+    baseline = None
+    for provider_class in providers:
+        body, samples = time_provider(provider_class, payload, repeats)
+        bodies[provider_class.__name__] = body
+        median = statistics.median(samples)
+        p95 = sorted(samples)[int(len(samples) * 0.95) - 1]
+        baseline = baseline or median
+        print(f"  {provider_class.__name__:<22} median {median:8.2f} ms   p95 {p95:8.2f} ms   "
+              f"{len(body) / 1024:8.1f} KiB   x{baseline / median:.1f}")
+
+    decoded = [json.loads(body) for body in bodies.values()]
+    if any(d != decoded[0] for d in decoded):
+        print("[ERROR] Providers produced different JSON")
+        sys.exit(1)
+    print("[OK] All providers produced the same JSON")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Perfect Books - Synthetic Ledger Fixtures
+
+Builds deterministic benchmark databases: many users, each with a checking,
+savings and credit card account, a year of paychecks, rent, bills, card
+payments and day-to-day spending, and the recurring items advance_time posts.
+One extra "heavy" user carries a much longer ledger, so per-user queries are
+also measured at the size where they hurt.
+
+Every ledger line goes through BusinessSimulator._post_ledger_entries, so the
+materialised tables (account_balances, transactions, ledger_daily_rollups,
+ledger_search, ledger_running_balances, ledger_descriptions) are exactly what
+the engine would have written. Users are inserted directly with one shared
+password hash instead of through register_user, whose bcrypt cost would
+dominate a 100k-user build.
+
+The same preset and seed always produce the same rows. Dates are laid out
+backwards from the build day, so the dashboard's "last 30 days" and
+advance_time's next due dates always have data to work on.
+
+Built databases are cached in benchmarks/.fixtures/ and reused until the
+preset, seed or schema migrations change.
+
+Usage:
+    python benchmarks/ledger_fixtures.py [preset] [--seed N] [--rebuild]
+
+Presets: smoke, small, medium, large (see PRESETS)
+"""
+
+import argparse
+import contextlib
+import datetime
+import hashlib
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import bcrypt
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+import engine  # noqa: E402
+import migration_runner  # noqa: E402
+import setup_sqlite  # noqa: E402
+from db_pool import get_pool  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).resolve().parent / ".fixtures"
+
+# users: regular users; months: history length; spending: day-to-day purchases per
+# regular user on top of the 8 scheduled transactions a month; heavy_spending: the
+# same for the extra heavy user (always the last user_id)
+PRESETS = {
+    'smoke': {'users': 100, 'months': 6, 'spending': 40, 'heavy_spending': 2_000},
+    'small': {'users': 1_000, 'months': 12, 'spending': 120, 'heavy_spending': 20_000},
+    'medium': {'users': 10_000, 'months': 12, 'spending': 60, 'heavy_spending': 100_000},
+    'large': {'users': 100_000, 'months': 3, 'spending': 10, 'heavy_spending': 250_000},
+}
+
+DEFAULT_SEED = 20240101
+
+# Users committed per transaction while building
+COMMIT_EVERY = 200
+
+MERCHANTS = {
+    'Food & Dining': ['Safeway', "Trader Joe's", 'Whole Foods', 'Costco', 'Chipotle', 'Starbucks',
+                      'Panera Bread', 'Sweetgreen', 'DoorDash', 'Local Diner'],
+    'Transportation': ['Shell', 'Chevron', 'Uber', 'Lyft', 'City Parking', 'Jiffy Lube'],
+    'Shopping': ['Amazon', 'Target', 'Walmart', 'Best Buy', 'Home Depot', 'IKEA', 'REI'],
+    'Entertainment': ['AMC Theatres', 'Steam', 'Spotify', 'Ticketmaster', 'Bowling Alley'],
+    'Healthcare': ['CVS Pharmacy', 'Walgreens', 'Dental Care', 'Urgent Care'],
+    'Personal': ['Great Clips', 'Planet Fitness', 'Dry Cleaners'],
+    'Other Expenses': ['USPS', 'Gift', 'Donation'],
+}
+
+# (description, category, day of month, payment account)
+MONTHLY_BILLS = [
+    ('Rent', 'Housing', 3, 'Checking'),
+    ('Electric Bill', 'Utilities', 18, 'Checking'),
+    ('Internet', 'Utilities', 22, 'Visa'),
+    ('Netflix', 'Entertainment', 9, 'Visa'),
+]
+
+PAYDAYS = (1, 15)
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1, day=1)
+
+
+def _stamp(day, rnd):
+    return f"{day.isoformat()} {rnd.randint(7, 21):02d}:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d}"
+
+
+def _migration_names():
+    return sorted(path.name for path in migration_runner.get_migrations_path().glob('*.sql'))
+
+
+def fixture_key(preset, seed):
+    """Cache key for a preset, seed and the current set of migrations."""
+    params = dict(PRESETS[preset], seed=seed, migrations=_migration_names())
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:10]
+    return f"{preset}-{seed}-{digest}"
+
+
+def _create_schema(db_path):
+    setup_sqlite.get_db_path = lambda: db_path
+    migration_runner.get_db_path = lambda: db_path
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup_sqlite.create_database()
+        if not migration_runner.run_all_pending():
+            raise RuntimeError("Migrations failed while building the fixture")
+
+
+def _user_history(rnd, user_id, categories, today, months, spending):
+    """
+    Return (ledger entries, recurring expenses, recurring income) for one user.
+
+    Paychecks, bills, card payments and savings transfers fall on fixed days
+    of each month; `spending` purchases are spread over the rest.
+    """
+    start = _add_months(today, -months)
+    days = (today - start).days + 1
+    scheduled = {}
+
+    salary = rnd.randrange(3_000, 9_000) * 100
+    rent = salary * rnd.randrange(25, 40) // 10_000 * 100
+    checking_open = rnd.randrange(2_000, 9_000) * 100
+    savings_open = rnd.randrange(500, 25_000) * 100
+
+    entries = []
+    sequence = 0
+
+    def post(day, lines, transaction_type, description, category=None):
+        nonlocal sequence
+        sequence += 1
+        line = {'transaction_uuid': f"bench-{user_id}-{sequence}", 'transaction_date': _stamp(day, rnd),
+                'description': description, 'transaction_type': transaction_type}
+        for account, debit_cents, credit_cents, with_category in lines:
+            entries.append({**line, 'account': account,
+                            'debit': f"{debit_cents / 100:.2f}", 'credit': f"{credit_cents / 100:.2f}",
+                            'debit_cents': debit_cents, 'credit_cents': credit_cents,
+                            'category_id': categories[category] if with_category and category else None})
+
+    for account, cents in (('Checking', checking_open), ('Savings', savings_open), ('Visa', 0)):
+        post(start, [(account, cents, 0, False), ('Equity', 0, cents, False)],
+             'OPENING_BALANCE', 'Initial Balance')
+
+    month = start
+    while month <= today:
+        for payday in PAYDAYS:
+            scheduled.setdefault(month.replace(day=payday), []).append(('pay', salary // 2))
+        for description, category, due_day, account in MONTHLY_BILLS:
+            amount = rent if description == 'Rent' else rnd.randrange(40, 180) * 100 + rnd.randrange(100)
+            scheduled.setdefault(month.replace(day=due_day), []).append(('bill', description, category, account, amount))
+        scheduled.setdefault(month.replace(day=25), []).append(('card',))
+        scheduled.setdefault(month.replace(day=27), []).append(('save', rnd.randrange(1, 6) * 5_000))
+        month = _add_months(month, 1)
+
+    spend_days = sorted(start + datetime.timedelta(days=rnd.randrange(1, days)) for _ in range(spending))
+    # Sized to about half of what is left after rent, bills and savings, so balances stay positive
+    left_over = salary - rent - 4 * 18_000 - 25_000
+    spend_budget = max(100, left_over * months // 2 // max(1, spending))
+    for day in spend_days:
+        scheduled.setdefault(day, []).append(('spend',))
+
+    visa_owed = 0
+    for day in sorted(d for d in scheduled if start <= d <= today):
+        for item in scheduled[day]:
+            kind = item[0]
+            if kind == 'pay':
+                post(day, [('Checking', item[1], 0, True), ('Income', 0, item[1], True)],
+                     'INCOME', 'Paycheck', 'W2 Job Income')
+            elif kind == 'bill':
+                _, description, category, account, amount = item
+                post(day, [('Expenses', amount, 0, True), (account, 0, amount, False)],
+                     'EXPENSE', description, category)
+                if account == 'Visa':
+                    visa_owed += amount
+            elif kind == 'card' and visa_owed:
+                post(day, [('Visa', visa_owed, 0, False), ('Checking', 0, visa_owed, False)],
+                     'TRANSFER', 'Credit Card Payment')
+                visa_owed = 0
+            elif kind == 'save':
+                post(day, [('Savings', item[1], 0, False), ('Checking', 0, item[1], False)],
+                     'TRANSFER', 'Monthly Savings')
+            elif kind == 'spend':
+                category = rnd.choice(list(MERCHANTS))
+                description = rnd.choice(MERCHANTS[category])
+                if rnd.random() < 0.1:
+                    # One-off payees keep the description dictionary realistic
+                    description = f"{description} #{rnd.randrange(1000, 9999)}"
+                amount = max(100, int(rnd.expovariate(1 / spend_budget)))
+                account = 'Visa' if rnd.random() < 0.4 else 'Checking'
+                post(day, [('Expenses', amount, 0, True), (account, 0, amount, False)],
+                     'EXPENSE', description, category)
+                if account == 'Visa':
+                    visa_owed += amount
+
+    def last_due(due_day):
+        due = today.replace(day=due_day) if today.day >= due_day else _add_months(today, -1).replace(day=due_day)
+        return due.isoformat()
+
+    recurring_expenses = [
+        (description, f"{(rent if description == 'Rent' else 9_900) / 100:.2f}", due_day, last_due(due_day),
+         account, categories[category])
+        for description, category, due_day, account in MONTHLY_BILLS
+    ]
+    recurring_income = [
+        (f"Paycheck ({payday})", 'Paycheck', f"{salary / 200:.2f}", payday, last_due(payday),
+         categories['W2 Job Income'])
+        for payday in PAYDAYS
+    ]
+    return entries, recurring_expenses, recurring_income
+
+
+def build_fixture(db_path, users, months, spending, heavy_spending, seed=DEFAULT_SEED, today=None):
+    """
+    Build a benchmark database at db_path (which must not exist yet).
+
+    Returns:
+        dict: Fixture metadata (parameters, build day, row counts, build time)
+    """
+    started = time.perf_counter()
+    today = today or datetime.date.today()
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    _create_schema(db_path)
+
+    engine.DB_PATH = db_path
+    sim = engine.BusinessSimulator()
+    password_hash = bcrypt.hashpw(b'benchmark', bcrypt.gensalt(rounds=4)).decode('utf-8')
+
+    conn, cursor = sim._get_db_connection()
+    try:
+        cursor.executemany(
+            "INSERT INTO users (user_id, username, password_hash) VALUES (?, ?, ?)",
+            [(user_id, f"bench{user_id:06d}", password_hash) for user_id in range(1, users + 2)]
+        )
+        conn.commit()
+
+        # The first user gets the real default categories; everyone else copies them
+        sim.initialize_default_categories(1)
+        cursor.execute("""
+            INSERT INTO expense_categories (user_id, name, color, is_default, parent_id)
+            SELECT u.user_id, c.name, c.color, c.is_default, c.parent_id
+            FROM users u JOIN expense_categories c ON c.user_id = 1
+            WHERE u.user_id > 1
+            ORDER BY u.user_id, c.category_id
+        """)
+        conn.commit()
+
+        for user_id in range(1, users + 2):
+            heavy = user_id == users + 1
+            rnd = random.Random(seed * 1_000_003 + user_id)
+            cursor.execute("SELECT name, category_id FROM expense_categories WHERE user_id = ?", (user_id,))
+            categories = {row['name']: row['category_id'] for row in cursor.fetchall()}
+
+            entries, recurring_expenses, recurring_income = _user_history(
+                rnd, user_id, categories, today, months, heavy_spending if heavy else spending)
+
+            cursor.executemany(
+                "INSERT INTO accounts (user_id, name, type, balance, credit_limit) VALUES (?, ?, ?, ?, ?)",
+                [(user_id, 'Equity', 'EQUITY', '0.00', None),
+                 (user_id, 'Checking', 'CHECKING', '0.00', None),
+                 (user_id, 'Savings', 'SAVINGS', '0.00', None),
+                 (user_id, 'Visa', 'CREDIT_CARD', '0.00', '5000.00')]
+            )
+            sim._post_ledger_entries(cursor, user_id, entries)
+
+            cursor.execute("SELECT name, account_id FROM accounts WHERE user_id = ?", (user_id,))
+            accounts = {row['name']: row['account_id'] for row in cursor.fetchall()}
+            cursor.executemany(
+                "INSERT INTO recurring_expenses (user_id, description, amount, frequency, due_day_of_month, "
+                "last_processed_date, payment_account_id, category_id) VALUES (?, ?, ?, 'MONTHLY', ?, ?, ?, ?)",
+                [(user_id, description, amount, due_day, last_processed, accounts[account], category_id)
+                 for description, amount, due_day, last_processed, account, category_id in recurring_expenses]
+            )
+            cursor.executemany(
+                "INSERT INTO recurring_income (user_id, name, description, amount, frequency, due_day_of_month, "
+                "last_processed_date, destination_account_id, category_id) VALUES (?, ?, ?, ?, 'MONTHLY', ?, ?, ?, ?)",
+                [(user_id, name, description, amount, due_day, last_processed, accounts['Checking'], category_id)
+                 for name, description, amount, due_day, last_processed, category_id in recurring_income]
+            )
+
+            # Keep accounts.balance in step for the screens that still read it
+            cursor.execute("""
+                UPDATE accounts SET balance = printf('%.2f', b.balance_cents / 100.0)
+                FROM account_balances b
+                WHERE accounts.user_id = ? AND b.user_id = accounts.user_id AND b.account = accounts.name
+            """, (user_id,))
+
+            if user_id % COMMIT_EVERY == 0:
+                conn.commit()
+        conn.commit()
+
+        cursor.execute("ANALYZE")
+        cursor.execute("SELECT COUNT(*) FROM financial_ledger")
+        ledger_rows = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM transactions")
+        transaction_rows = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        conn.close()
+
+    pool = get_pool(db_path)
+    pool.checkpoint('TRUNCATE')
+    pool.close_idle()
+
+    return {
+        'users': users + 1,
+        'heavy_user_id': users + 1,
+        'months': months,
+        'spending': spending,
+        'heavy_spending': heavy_spending,
+        'seed': seed,
+        'built_on': today.isoformat(),
+        'ledger_rows': ledger_rows,
+        'transaction_rows': transaction_rows,
+        'build_seconds': round(time.perf_counter() - started, 1),
+    }
+
+
+def get_fixture(preset='small', seed=DEFAULT_SEED, rebuild=False):
+    """
+    Return (db_path, metadata) for a preset, building it if it isn't cached.
+
+    The cached database is read-only input: copy it before running anything
+    that writes.
+    """
+    key = fixture_key(preset, seed)
+    db_path = FIXTURES_DIR / f"{key}.db"
+    meta_path = FIXTURES_DIR / f"{key}.json"
+
+    if rebuild or not (db_path.exists() and meta_path.exists()):
+        for stale in FIXTURES_DIR.glob(f"{key}.*"):
+            stale.unlink()
+        for suffix in ('-wal', '-shm'):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+        print(f"Building '{preset}' fixture ({PRESETS[preset]['users']:,} users) -> {db_path}")
+        metadata = dict(build_fixture(db_path, seed=seed, **PRESETS[preset]), preset=preset)
+        meta_path.write_text(json.dumps(metadata, indent=2))
+        print(f"  {metadata['ledger_rows']:,} ledger rows in {metadata['build_seconds']}s")
+
+    return db_path, json.loads(meta_path.read_text())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a cached benchmark database")
+    parser.add_argument('preset', nargs='?', default='small', choices=sorted(PRESETS))
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild even if a cached copy exists")
+    args = parser.parse_args()
+
+    db_path, metadata = get_fixture(args.preset, args.seed, args.rebuild)
+    print(json.dumps(dict(metadata, path=str(db_path)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
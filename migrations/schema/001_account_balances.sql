@@ -0,0 +1,26 @@
+-- Materialised per-account ledger balances.
+--
+-- The engine updates this table in the same transaction as every
+-- financial_ledger insert (see BusinessSimulator._post_ledger_entries), so
+-- balance reads no longer need SUM(debit) - SUM(credit) over the ledger.
+-- Balances are stored in integer cents to avoid float drift on increments.
+--
+-- Verify / rebuild with: python src/maintenance.py verify-balances
+
+CREATE TABLE IF NOT EXISTS account_balances (
+    user_id INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    balance_cents INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, account),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Backfill from the existing ledger
+DELETE FROM account_balances;
+
+INSERT INTO account_balances (user_id, account, balance_cents)
+SELECT user_id, account,
+       SUM(CAST(ROUND(COALESCE(debit, 0) * 100) AS INTEGER))
+       - SUM(CAST(ROUND(COALESCE(credit, 0) * 100) AS INTEGER))
+FROM financial_ledger
+GROUP BY user_id, account;
@@ -0,0 +1,21 @@
+-- Integer-cents money columns for financial_ledger.
+--
+-- debit/credit stay as TEXT for display and external tools (Power BI), but
+-- every aggregate in the engine sums debit_cents/credit_cents instead, so
+-- totals are exact integer math rather than string -> float parsing.
+-- The engine writes both representations (BusinessSimulator._post_ledger_entries).
+
+ALTER TABLE financial_ledger ADD COLUMN debit_cents INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE financial_ledger ADD COLUMN credit_cents INTEGER NOT NULL DEFAULT 0;
+
+UPDATE financial_ledger
+SET debit_cents = CAST(ROUND(COALESCE(debit, 0) * 100) AS INTEGER),
+    credit_cents = CAST(ROUND(COALESCE(credit, 0) * 100) AS INTEGER);
+
+-- Re-derive the materialised balances from the exact columns
+DELETE FROM account_balances;
+
+INSERT INTO account_balances (user_id, account, balance_cents)
+SELECT user_id, account, SUM(debit_cents - credit_cents)
+FROM financial_ledger
+GROUP BY user_id, account;
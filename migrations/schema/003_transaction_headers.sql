@@ -0,0 +1,58 @@
+-- Transaction headers: one row per transaction_uuid.
+--
+-- Ledger lines stay in financial_ledger; this table holds what every line of
+-- a transaction shares, so listing/paging/reversal checks read N header rows
+-- instead of GROUP BY transaction_uuid over the whole ledger. The engine
+-- writes headers alongside the lines (BusinessSimulator._post_ledger_entries).
+--
+-- transaction_date / last_entry_id are MAX() over the transaction's lines and
+-- are the keyset used by ledger pagination.
+
+CREATE TABLE IF NOT EXISTS transactions (
+    user_id INTEGER NOT NULL,
+    transaction_uuid TEXT NOT NULL,
+    transaction_date TEXT NOT NULL,
+    last_entry_id INTEGER NOT NULL,
+    description TEXT,
+    type TEXT NOT NULL DEFAULT 'OTHER',
+    is_reversal INTEGER DEFAULT 0,
+    category_id INTEGER DEFAULT NULL,
+    is_business INTEGER DEFAULT 0,
+    amount_cents INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, transaction_uuid),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_order
+    ON transactions(user_id, transaction_date DESC, last_entry_id DESC);
+
+-- Backfill from existing ledger lines
+DELETE FROM transactions;
+
+INSERT INTO transactions (user_id, transaction_uuid, transaction_date, last_entry_id, description,
+                          type, is_reversal, category_id, is_business, amount_cents)
+SELECT
+    l.user_id,
+    l.transaction_uuid,
+    MAX(l.transaction_date),
+    MAX(l.entry_id),
+    (SELECT f.description FROM financial_ledger f
+     WHERE f.user_id = l.user_id AND f.transaction_uuid = l.transaction_uuid
+     ORDER BY f.entry_id LIMIT 1),
+    CASE
+        WHEN l.transaction_uuid LIKE 'income-%' THEN 'INCOME'
+        WHEN l.transaction_uuid LIKE 'expense-%' THEN 'EXPENSE'
+        WHEN l.transaction_uuid LIKE 'transfer-%' THEN 'TRANSFER'
+        WHEN l.transaction_uuid LIKE 'reversal-%' THEN 'REVERSAL'
+        WHEN l.transaction_uuid LIKE 'revalue-%' THEN 'REVALUATION'
+        WHEN l.transaction_uuid LIKE 'init-%' OR l.transaction_uuid LIKE 'add-%' THEN 'OPENING_BALANCE'
+        WHEN l.transaction_uuid LIKE 'time-adv-%' THEN 'SYSTEM'
+        WHEN MAX(l.account = 'Interest Expense') = 1 THEN 'INTEREST'
+        ELSE 'LOAN_PAYMENT'
+    END,
+    MAX(l.is_reversal),
+    MAX(l.category_id),
+    MAX(l.is_business),
+    SUM(l.debit_cents)
+FROM financial_ledger l
+GROUP BY l.user_id, l.transaction_uuid;
@@ -0,0 +1,29 @@
+-- Composite indexes matching the engine's hot query shapes.
+--
+-- (user_id, account, transaction_date, ...) serves per-account balances, the
+-- account-filtered running balance and the 'Income'/'Expenses' date-range
+-- aggregates; carrying is_reversal and the cents columns makes those queries
+-- index-only. (user_id, transaction_uuid) serves every per-transaction
+-- lookup, and (user_id, category_id, transaction_date) the category views.
+--
+-- The single-column category/is_reversal indexes are superseded (is_reversal
+-- has two values, so it never narrowed anything).
+--
+-- Check with: python src/maintenance.py check-indexes
+
+CREATE INDEX IF NOT EXISTS idx_ledger_user_account_date
+    ON financial_ledger(user_id, account, transaction_date, is_reversal, debit_cents, credit_cents);
+
+CREATE INDEX IF NOT EXISTS idx_ledger_user_uuid
+    ON financial_ledger(user_id, transaction_uuid);
+
+CREATE INDEX IF NOT EXISTS idx_ledger_user_category_date
+    ON financial_ledger(user_id, category_id, transaction_date);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_category
+    ON transactions(user_id, category_id);
+
+DROP INDEX IF EXISTS idx_ledger_category;
+DROP INDEX IF EXISTS idx_ledger_reversal;
+
+ANALYZE;
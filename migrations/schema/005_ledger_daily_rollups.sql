@@ -0,0 +1,47 @@
+-- Daily ledger rollups for the analytics readers
+--
+-- One row per (user, day, account, category, flags) holding the summed cents
+-- and line count, so get_n_day_average, get_daily_net, the expense
+-- analysis/trends, budgets and the dashboard aggregate a few rows per day
+-- instead of every ledger line.
+--
+-- transaction_date holds the day only (YYYY-MM-DD, the first ten characters
+-- of the ledger's transaction_date, which often carries a time of day), so
+-- readers filter on whole days: BETWEEN DATE(start) AND DATE(end), or
+-- = DATE(day). category_id uses 0 for "no category" because primary key
+-- columns can't be NULL. is_system is 1 for lines the analytics exclude by
+-- description ('Time Advanced', 'Initial Balance', or no description).
+--
+-- Maintained by the engine in the same transaction as every ledger write.
+--
+-- Verify / rebuild with: python src/maintenance.py verify-rollups
+
+CREATE TABLE IF NOT EXISTS ledger_daily_rollups (
+    user_id INTEGER NOT NULL,
+    transaction_date TEXT NOT NULL,
+    account TEXT NOT NULL,
+    category_id INTEGER NOT NULL DEFAULT 0,
+    is_reversal INTEGER NOT NULL DEFAULT 0,
+    is_business INTEGER NOT NULL DEFAULT 0,
+    is_system INTEGER NOT NULL DEFAULT 0,
+    debit_cents INTEGER NOT NULL DEFAULT 0,
+    credit_cents INTEGER NOT NULL DEFAULT 0,
+    line_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, transaction_date, account, category_id, is_reversal, is_business, is_system),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Backfill from the existing ledger
+DELETE FROM ledger_daily_rollups;
+
+INSERT INTO ledger_daily_rollups
+    (user_id, transaction_date, account, category_id, is_reversal, is_business, is_system,
+     debit_cents, credit_cents, line_count)
+SELECT user_id, substr(transaction_date, 1, 10), account,
+       COALESCE(category_id, 0),
+       COALESCE(is_reversal, 0),
+       COALESCE(is_business, 0),
+       COALESCE(description IN ('Time Advanced', 'Initial Balance'), 1),
+       SUM(debit_cents), SUM(credit_cents), COUNT(*)
+FROM financial_ledger
+GROUP BY 1, 2, 3, 4, 5, 6, 7;
@@ -0,0 +1,17 @@
+-- Per-user data version counters.
+--
+-- BusinessSimulator bumps a user's version after every method that changes
+-- what that user's read endpoints return (see engine.writes_user_data). The
+-- API keys its response cache and ETags on (user, endpoint, parameters,
+-- version), so a poll of unchanged data is answered without touching the
+-- ledger. Kept in the database rather than in memory so every gunicorn
+-- worker sees the same counter.
+
+CREATE TABLE IF NOT EXISTS user_data_versions (
+    user_id INTEGER NOT NULL PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO user_data_versions (user_id, version)
+SELECT user_id, 1 FROM users;
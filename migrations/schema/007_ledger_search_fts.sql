@@ -0,0 +1,50 @@
+-- Full-text index for ledger search
+--
+-- One FTS5 row per transaction header (rowid = transactions.rowid) holding
+-- the distinct descriptions and account names of the transaction's lines.
+-- The trigram tokenizer matches any substring of 3+ characters, case
+-- insensitively, which is what the ledger search box's LIKE '%q%' did - but
+-- from the index instead of a scan of every ledger line.
+--
+-- owner holds '<user_id>' (e.g. '<42>'), itself one trigram or more, so a
+-- search ANDs the phrase with owner:"<42>" and FTS5 only visits that user's
+-- rows; filtering a user_id column after the MATCH would still read every
+-- user's matches. The brackets keep '<4>' from matching inside '<42>'.
+--
+-- Maintained by the engine (BusinessSimulator._refresh_ledger_search) in the
+-- same transaction as every ledger write; rows are dropped with their header
+-- by the trigger below, including cascaded deletes of a user.
+--
+-- (user_id, amount_cents) on the headers serves amount and amount-range
+-- searches (e.g. "42.50", "50..100", ">1000").
+--
+-- Rebuild with: python src/maintenance.py rebuild-search
+
+CREATE VIRTUAL TABLE IF NOT EXISTS ledger_search USING fts5(
+    owner,
+    descriptions,
+    accounts,
+    tokenize = 'trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_search_delete
+AFTER DELETE ON transactions
+BEGIN
+    DELETE FROM ledger_search WHERE rowid = old.rowid;
+END;
+
+CREATE INDEX IF NOT EXISTS idx_transactions_user_amount
+    ON transactions(user_id, amount_cents);
+
+-- Backfill from existing ledger lines
+DELETE FROM ledger_search;
+
+INSERT INTO ledger_search (rowid, owner, descriptions, accounts)
+SELECT
+    t.rowid,
+    '<' || t.user_id || '>',
+    (SELECT group_concat(DISTINCT l.description) FROM financial_ledger l
+     WHERE l.user_id = t.user_id AND l.transaction_uuid = t.transaction_uuid),
+    (SELECT group_concat(DISTINCT l.account) FROM financial_ledger l
+     WHERE l.user_id = t.user_id AND l.transaction_uuid = t.transaction_uuid)
+FROM transactions t;
@@ -0,0 +1,39 @@
+-- Running account balance after every ledger line
+--
+-- One row per financial_ledger line, keyed in register order (account,
+-- transaction_date, entry_id), holding the account's balance in cents once
+-- that line is applied. An account-filtered ledger page reads its balances
+-- with the lines instead of summing the account's history up to the newest
+-- visible row and walking the page backwards.
+--
+-- non_reversal_balance_cents leaves out reversed transactions and their
+-- reversals (is_reversal = 1), which is what the ledger shows when reversals
+-- are hidden.
+--
+-- Maintained by the engine in the same transaction as every ledger write. A
+-- back-dated line, a reversal or an account rename recomputes the affected
+-- account from that date onward.
+--
+-- Verify / rebuild with: python src/maintenance.py verify-running-balances
+
+CREATE TABLE IF NOT EXISTS ledger_running_balances (
+    user_id INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    transaction_date TEXT NOT NULL,
+    entry_id INTEGER NOT NULL,
+    balance_cents INTEGER NOT NULL,
+    non_reversal_balance_cents INTEGER NOT NULL,
+    PRIMARY KEY (user_id, account, transaction_date, entry_id),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Backfill from the existing ledger
+DELETE FROM ledger_running_balances;
+
+INSERT INTO ledger_running_balances (user_id, account, transaction_date, entry_id,
+                                     balance_cents, non_reversal_balance_cents)
+SELECT user_id, account, transaction_date, entry_id,
+       SUM(debit_cents - credit_cents) OVER running,
+       SUM(CASE WHEN is_reversal THEN 0 ELSE debit_cents - credit_cents END) OVER running
+FROM financial_ledger
+WINDOW running AS (PARTITION BY user_id, account ORDER BY transaction_date, entry_id);
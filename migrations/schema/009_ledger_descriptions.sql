@@ -0,0 +1,43 @@
+-- Per-user dictionary of expense and income descriptions
+--
+-- One row per (user, 'Expenses' / 'Income', description) holding how often
+-- the description was used, when it was last used, and the category and
+-- amount of that last use. The description autocomplete loads a user's rows
+-- into memory (src/description_index.py) instead of running SELECT DISTINCT
+-- over the ledger on every fetch, and ranks and prefills from them.
+--
+-- Only lines that are not reversals (is_reversal = 0) and have a description
+-- count, as in the ledger query this replaces.
+--
+-- Maintained by the engine in the same transaction as every ledger write;
+-- reversals and category changes recompute the descriptions they touch.
+
+CREATE TABLE IF NOT EXISTS ledger_descriptions (
+    user_id INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    description TEXT NOT NULL,
+    use_count INTEGER NOT NULL DEFAULT 0,
+    last_used TEXT NOT NULL,
+    last_entry_id INTEGER NOT NULL,
+    category_id INTEGER DEFAULT NULL,
+    amount_cents INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, account, description),
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Backfill from existing ledger lines (latest use per description)
+DELETE FROM ledger_descriptions;
+
+INSERT INTO ledger_descriptions (user_id, account, description, use_count, last_used, last_entry_id,
+                                 category_id, amount_cents)
+SELECT user_id, account, description, use_count, transaction_date, entry_id, category_id, amount_cents
+FROM (
+    SELECT user_id, account, description, transaction_date, entry_id, category_id,
+           ABS(debit_cents - credit_cents) AS amount_cents,
+           COUNT(*) OVER uses AS use_count,
+           ROW_NUMBER() OVER (uses ORDER BY transaction_date DESC, entry_id DESC) AS recency
+    FROM financial_ledger
+    WHERE account IN ('Expenses', 'Income') AND is_reversal = 0 AND description != ''
+    WINDOW uses AS (PARTITION BY user_id, account, description)
+)
+WHERE recency = 1;
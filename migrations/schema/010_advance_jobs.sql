@@ -0,0 +1,33 @@
+-- Background time advance jobs
+--
+-- One row per queued, running or finished advance of a user from start_date
+-- to target_date (BusinessSimulator.start_advance_job). Workers in
+-- src/advance_jobs.py process a job in chunks of days; each chunk's postings
+-- commit together with the job's new processed_through (the last fully
+-- processed day) and log, so after a crash the job resumes from the last
+-- committed chunk instead of starting over.
+--
+-- worker and heartbeat_at (unix time) record which process owns a running
+-- job; a job whose heartbeat has gone stale can be claimed by another worker.
+-- A user has at most one queued or running job.
+
+CREATE TABLE IF NOT EXISTS advance_jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    start_date TEXT NOT NULL,
+    target_date TEXT NOT NULL,
+    processed_through TEXT NOT NULL,
+    log TEXT NOT NULL DEFAULT '[]',
+    error TEXT DEFAULT NULL,
+    worker TEXT DEFAULT NULL,
+    heartbeat_at REAL DEFAULT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_advance_jobs_active
+ON advance_jobs (user_id) WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS idx_advance_jobs_user ON advance_jobs (user_id, job_id);
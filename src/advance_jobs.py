@@ -0,0 +1,166 @@
+"""
+Perfect Books - Background Time Advance
+
+Runs advance jobs (BusinessSimulator.start_advance_job) on a worker thread so
+a user coming back after months isn't kept waiting at login while every
+missed bill and paycheck is posted. Login and /api/auto_advance queue a job
+and return at once; the page shows a "catching up" banner and polls
+/api/advance_job/status until the job is done.
+
+The worker processes a job ADVANCE_CHUNK_DAYS at a time, committing each chunk with
+the job's checkpoint (the last fully processed day), so other requests get the
+write lock between chunks and a crash loses at most the chunk in progress.
+Jobs left queued or running by a process that died are picked up again when
+this process's worker starts, or when the user's status poll finds the job's
+heartbeat has gone stale.
+
+Each process (gunicorn worker) runs its own worker thread; the database
+decides which one owns a job (BusinessSimulator.claim_advance_job).
+
+Usage:
+    runner = AdvanceJobRunner(sim)
+    runner.auto_advance(user_id, client_date)   # login / page load
+    runner.status(user_id)                      # /api/advance_job/status
+
+Configuration (environment variables):
+- PERFECTBOOKS_ADVANCE_JOBS: 0 to advance synchronously instead (default 1)
+- PERFECTBOOKS_ADVANCE_CHUNK_DAYS: Days processed per commit (default 31;
+  shared with engine.advance_time)
+- PERFECTBOOKS_ADVANCE_STALE_SECONDS: Heartbeat age after which another
+  worker may take over a running job (default 120)
+
+Author: Matthew Jenkins
+License: MIT
+"""
+
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+
+try:
+    from engine import ADVANCE_CHUNK_DAYS, ADVANCE_STALE_SECONDS
+except ModuleNotFoundError:
+    from src.engine import ADVANCE_CHUNK_DAYS, ADVANCE_STALE_SECONDS
+
+
+DEFAULT_ENABLED = os.getenv('PERFECTBOOKS_ADVANCE_JOBS', '1') == '1'
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class AdvanceJobRunner:
+    """
+    Per-process worker thread that runs queued advance jobs chunk by chunk.
+
+    Args:
+        sim (BusinessSimulator): Engine the jobs run against
+        enabled (bool): False to advance synchronously, as before jobs existed
+        chunk_days (int): Days processed per committed chunk
+        stale_seconds (float): Heartbeat age after which a running job is
+            considered abandoned
+    """
+
+    def __init__(self, sim, enabled=DEFAULT_ENABLED, chunk_days=ADVANCE_CHUNK_DAYS,
+                 stale_seconds=ADVANCE_STALE_SECONDS):
+        self.sim = sim
+        self.enabled = enabled
+        self.chunk_days = max(1, int(chunk_days))
+        self.stale_seconds = stale_seconds
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+
+    @property
+    def worker_id(self):
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self):
+        """
+        Start this process's worker thread if it isn't running, and queue any
+        jobs left behind by a process that died.
+
+        Safe to call repeatedly; after a fork the child starts its own thread.
+        """
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name='advance-jobs', daemon=True)
+            self._thread.start()
+        try:
+            for job_id in self.sim.list_resumable_advance_jobs(self.stale_seconds):
+                self._queue.put(job_id)
+        except Exception as e:
+            print(f"[ADVANCE JOBS] Could not list resumable jobs: {e}")
+
+    def submit(self, job_id):
+        """Queue a job for this process's worker thread."""
+        self.start()
+        self._queue.put(job_id)
+
+    def auto_advance(self, user_id, client_date=None):
+        """
+        Bring the user up to today: queue a job if enabled, else advance in place.
+
+        Returns:
+            dict: auto_advance_time's result ('job' is set when one was queued)
+        """
+        if not self.enabled:
+            return self.sim.auto_advance_time(user_id, client_date=client_date)
+        result = self.sim.auto_advance_time(user_id, client_date=client_date, background=True)
+        job = result.get('job')
+        if job and job['status'] in ACTIVE_STATUSES:
+            self.submit(job['job_id'])
+        return result
+
+    def advance(self, user_id, days_to_advance):
+        """
+        Queue a job advancing the user by days_to_advance days.
+
+        Returns:
+            dict: The queued or running job
+        """
+        job = self.sim.start_advance_job(user_id, days_to_advance)
+        if job['status'] in ACTIVE_STATUSES:
+            self.submit(job['job_id'])
+        return job
+
+    def status(self, user_id, job_id=None):
+        """
+        Return the user's latest (or a given) job, requeueing it here if no live
+        worker holds it.
+
+        Returns:
+            dict: Job (see BusinessSimulator.get_advance_job), or None
+        """
+        job = self.sim.get_advance_job(user_id, job_id)
+        if job and job['status'] in ACTIVE_STATUSES:
+            # Claiming is atomic, so queueing a job some other worker runs is harmless
+            stale = (job['heartbeat_at'] or 0) < time.time() - self.stale_seconds
+            if job['status'] == 'queued' or stale:
+                self.submit(job['job_id'])
+        return job
+
+    def run_job(self, job_id):
+        """Claim a job and run it to completion on the calling thread."""
+        worker = self.worker_id
+        if not self.sim.claim_advance_job(job_id, worker, self.stale_seconds):
+            return None
+        while True:
+            job = self.sim.run_advance_job_chunk(job_id, worker, self.chunk_days)
+            if job is None or job['status'] != 'running':
+                return job
+
+    def _run(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self.run_job(job_id)
+            except Exception as e:
+                print(f"[ADVANCE JOBS] Job {job_id} stopped: {e}")
+                traceback.print_exc()
@@ -30,22 +30,39 @@ License: MIT
 Related Project: Digital Harvest (Uses similar Flask API architecture)
 """
 
-from flask import Flask, jsonify, request, send_from_directory, redirect, url_for, session
+from flask import Flask, jsonify, request, send_from_directory, redirect, url_for, session, make_response, g, stream_with_context
 from flask_cors import CORS
+import csv
+import io
 import json
 from decimal import Decimal
 import datetime
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 import os
+import time
 from dotenv import load_dotenv
 # Load environment variables (for SECRET_KEY, etc.)
 load_dotenv()
 
 # Import engine - handle both local dev and Railway deployment
 try:
-    from engine import BusinessSimulator
+    from engine import BusinessSimulator, DB_PATH
+    from db_pool import get_pool
+    from response_cache import ResponseCache, make_etag
+    from json_provider import get_json_provider_class
+    from description_index import DescriptionIndex
+    from query_profiler import profiler as query_profiler
+    from advance_jobs import AdvanceJobRunner
+    import metrics
 except ModuleNotFoundError:
-    from src.engine import BusinessSimulator
+    from src.engine import BusinessSimulator, DB_PATH
+    from src.db_pool import get_pool
+    from src.response_cache import ResponseCache, make_etag
+    from src.json_provider import get_json_provider_class
+    from src.description_index import DescriptionIndex
+    from src.query_profiler import profiler as query_profiler
+    from src.advance_jobs import AdvanceJobRunner
+    from src import metrics
 
 
 class CustomEncoder(json.JSONEncoder):
@@ -77,19 +94,8 @@ class CustomEncoder(json.JSONEncoder):
 app = Flask(__name__, static_url_path='', static_folder='../')
 
 # Configure Flask 3.0+ JSON encoder using the json provider interface
-from flask.json.provider import DefaultJSONProvider
-class CustomJSONProvider(DefaultJSONProvider):
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        if isinstance(obj, datetime.datetime):
-            return obj.isoformat()
-        if isinstance(obj, datetime.date):
-            # Append time to avoid UTC interpretation issues
-            return obj.isoformat() + 'T12:00:00'
-        return super().default(obj)
-
-app.json = CustomJSONProvider(app)
+# (orjson-backed when installed, same Decimal/date handling either way)
+app.json = get_json_provider_class()(app)
 
 # Security configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -102,13 +108,18 @@ CORS(app, supports_credentials=True)
 # Initialize database if it doesn't exist (for Railway deployment)
 try:
     from setup_sqlite import create_database, get_db_path
+    from migration_runner import run_all_pending
 except ModuleNotFoundError:
     from src.setup_sqlite import create_database, get_db_path
+    from src.migration_runner import run_all_pending
 
 if not get_db_path().exists():
     print("Database not found - creating fresh database...")
     create_database()
 
+# Apply schema migrations (gunicorn starts here directly, without start.py)
+run_all_pending()
+
 # Initialize the stateless business simulator
 try:
     sim = BusinessSimulator()
@@ -135,11 +146,10 @@ class User(UserMixin):
 @login_manager.user_loader
 def load_user(user_id):
     if not sim: return None
-    conn, cursor = sim._get_db_connection()
-    cursor.execute("SELECT user_id, username FROM users WHERE user_id = ?", (user_id,))
-    user_data = cursor.fetchone()
-    cursor.close()
-    conn.close()
+    with get_pool(DB_PATH).connection() as conn:
+        user_data = conn.execute(
+            "SELECT user_id, username FROM users WHERE user_id = ?", (user_id,)
+        ).fetchone()
     if user_data:
         return User(id=str(user_data['user_id']), username=user_data['username'])
     return None
@@ -152,6 +162,148 @@ def check_sim(func):
     wrapper.__name__ = func.__name__
     return wrapper
 
+# Usernames allowed to use the /api/admin endpoints (comma-separated)
+ADMIN_USERNAMES = {name.strip() for name in os.getenv('PERFECTBOOKS_ADMIN_USERS', '').split(',') if name.strip()}
+
+def admin_required(func):
+    """Goes below @login_required; answers 403 unless the user is listed in PERFECTBOOKS_ADMIN_USERS."""
+    def wrapper(*args, **kwargs):
+        if current_user.username not in ADMIN_USERNAMES:
+            return jsonify(success=False, message="Admin access required."), 403
+        return func(*args, **kwargs)
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+# Serialized GET responses, reused while the user's data version is unchanged
+response_cache = ResponseCache()
+
+# Per-user description autocomplete dictionaries, rebuilt when the data version changes
+description_index = DescriptionIndex(lambda user_id: sim.get_description_stats(user_id))
+
+# Catch-up advances run on a background thread so login doesn't wait on them
+advance_jobs = AdvanceJobRunner(sim)
+if sim and advance_jobs.enabled:
+    # Picks up jobs a previous process left unfinished
+    advance_jobs.start()
+
+def _request_version():
+    """(data version, cache key) for the current request, looked up once per request."""
+    if 'data_version' not in g:
+        g.data_version = sim.get_data_version(current_user.id)
+        g.cache_key = response_cache.make_key(current_user.id, request.endpoint, request.args)
+    return g.data_version, g.cache_key
+
+def conditional_get(func):
+    """
+    Tag a read endpoint's response with an ETag derived from the user's data
+    version and answer a matching If-None-Match with 304.
+
+    Goes below @login_required. A 304 skips both the engine call and JSON
+    encoding; "Cache-Control: no-cache" makes browsers revalidate every fetch
+    instead of reusing a stale body.
+    """
+    def wrapper(*args, **kwargs):
+        version, key = _request_version()
+        etag = make_etag(key, version)
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+        else:
+            response = make_response(func(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+def cached_response(func):
+    """
+    Serve a read endpoint from response_cache while the user's data is unchanged.
+
+    Goes below @login_required (and @conditional_get). Only 200 JSON responses
+    are stored; the key covers user, endpoint, query string and today's date.
+    """
+    def wrapper(*args, **kwargs):
+        if not response_cache.enabled:
+            return func(*args, **kwargs)
+        version, key = _request_version()
+        body = response_cache.get(key, version)
+        if body is not None:
+            return app.response_class(body, mimetype='application/json')
+
+        response = make_response(func(*args, **kwargs))
+        if response.status_code == 200 and response.mimetype == 'application/json':
+            response_cache.put(key, version, response.get_data())
+        return response
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+# =============================================================================
+# REQUEST METRICS (/metrics)
+# =============================================================================
+
+HTTP_REQUESTS = metrics.Counter(
+    'perfectbooks_http_requests_total', 'HTTP requests by route and status', ('method', 'route', 'status'))
+HTTP_LATENCY = metrics.Histogram(
+    'perfectbooks_http_request_duration_seconds', 'Time to build a response, by route', ('method', 'route'))
+HTTP_IN_FLIGHT = metrics.Gauge(
+    'perfectbooks_http_requests_in_flight', 'Requests currently being handled')
+
+def _pool_stats():
+    return get_pool(DB_PATH).stats
+
+metrics.Gauge('perfectbooks_db_connections_in_use', 'Pooled SQLite connections checked out',
+              callback=lambda: _pool_stats()['in_use'])
+metrics.Counter('perfectbooks_db_connection_events_total', 'Pooled SQLite connections created, reused and discarded',
+                ('event',), callback=lambda: {(event,): _pool_stats()[event] for event in ('created', 'reused', 'discarded')})
+metrics.Counter('perfectbooks_response_cache_lookups_total', 'Response cache lookups by result', ('result',),
+                callback=lambda: {(result,): response_cache.stats[result]
+                                  for result in ('hits', 'shared_hits', 'misses', 'stale')})
+metrics.Counter('perfectbooks_description_index_lookups_total', 'Description autocomplete lookups by result', ('result',),
+                callback=lambda: {(result,): description_index.stats[result] for result in ('hits', 'builds')})
+
+def _hit_ratio(hits, total):
+    return round(hits / total, 4) if total else 0
+
+metrics.Gauge('perfectbooks_cache_hit_ratio', 'Share of lookups answered from cache since start', ('cache',),
+              callback=lambda: {
+                  ('response',): _hit_ratio(response_cache.stats['hits'] + response_cache.stats['shared_hits'],
+                                            sum(response_cache.stats[key] for key in ('hits', 'shared_hits', 'misses', 'stale'))),
+                  ('description_index',): _hit_ratio(description_index.stats['hits'],
+                                                     description_index.stats['hits'] + description_index.stats['builds']),
+              })
+
+# Set to require "Authorization: Bearer <token>" on /metrics
+METRICS_TOKEN = os.getenv('PERFECTBOOKS_METRICS_TOKEN') or None
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        # The URL rule (e.g. /api/account/<int:account_id>) keeps label values bounded
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUESTS.inc(method=request.method, route=route, status=response.status_code)
+        HTTP_LATENCY.observe(time.perf_counter() - started, method=request.method, route=route)
+    return response
+
+@app.teardown_request
+def end_request_metrics(exc=None):
+    if g.pop('request_started', None) is not None:
+        HTTP_IN_FLIGHT.dec()
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus scrape endpoint (this worker's counters)."""
+    if METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {METRICS_TOKEN}":
+        return jsonify({"error": "Unauthorized"}), 401
+    return app.response_class(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 # --- HTML SERVING ROUTES ---
 @app.route('/')
 @login_required
@@ -207,9 +359,10 @@ def login_user_api():
         user = User(id=str(user_data['user_id']), username=user_data['username'])
         login_user(user)
 
-        # Auto-advance time to today's date if needed (using client's date for timezone accuracy)
+        # Auto-advance time to today's date if needed (using client's date for timezone accuracy);
+        # queued as a background job, so the login answers right away
         try:
-            result = sim.auto_advance_time(int(user.id), client_date=client_date)
+            result = advance_jobs.auto_advance(int(user.id), client_date=client_date)
         except Exception as e:
             print(f"[LOGIN] Auto-advance failed for user {user.id}: {e}")
             import traceback
@@ -387,6 +540,8 @@ def check_session():
 @app.route('/api/accounts', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_accounts():
     accounts = sim.get_accounts_list(user_id=current_user.id)
     return jsonify(accounts)
@@ -467,6 +622,7 @@ def manage_account_api(account_id):
 @app.route('/api/recurring_expenses', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_recurring_expenses_api():
     try:
         expenses = sim.get_recurring_expenses(user_id=current_user.id)
@@ -563,6 +719,7 @@ def manage_recurring_expense_api(expense_id):
 @app.route('/api/recurring_income', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_recurring_income_api():
     try:
         income = sim.get_recurring_income(user_id=current_user.id)
@@ -659,6 +816,8 @@ def manage_recurring_income_api(income_id):
 @app.route('/api/status', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_status():
     return jsonify(sim.get_status_summary(user_id=current_user.id))
 
@@ -666,11 +825,16 @@ def get_status():
 @check_sim
 @login_required
 def auto_advance():
-    """Auto-advance time to today's date if needed. Called on page load."""
+    """
+    Auto-advance time to today's date if needed. Called on page load.
+
+    The advance runs as a background job; result.job is set while one is
+    queued or running, and /api/advance_job/status reports its progress.
+    """
     try:
         data = request.get_json() or {}
         client_date = data.get('client_date')  # Client's local date for timezone handling
-        result = sim.auto_advance_time(int(current_user.id), client_date=client_date)
+        result = advance_jobs.auto_advance(int(current_user.id), client_date=client_date)
         return jsonify({"success": True, "result": result})
     except Exception as e:
         print(f"[AUTO-ADVANCE ERROR] {e}")
@@ -678,6 +842,22 @@ def auto_advance():
         traceback.print_exc()
         return jsonify({"success": False, "message": str(e)}), 500
 
+@app.route('/api/advance_job/status', methods=['GET'])
+@check_sim
+@login_required
+def advance_job_status():
+    """
+    Progress of the user's latest background advance (or ?job_id=).
+
+    job is null if the user has never had one; job.status is 'queued',
+    'running', 'done' or 'failed', with progress as a percentage.
+    """
+    job = advance_jobs.status(int(current_user.id), request.args.get('job_id', type=int))
+    if job:
+        job = {key: value for key, value in job.items() if key not in ('worker', 'heartbeat_at')}
+        job['catching_up'] = job['status'] in ('queued', 'running')
+    return jsonify({"success": True, "job": job})
+
 @app.route('/api/sync_balances', methods=['POST'])
 @check_sim
 @login_required
@@ -695,6 +875,7 @@ def sync_balances():
 @app.route('/api/ledger', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_ledger():
     account_filter = request.args.get('account')  # Optional query parameter
     limit = request.args.get('limit', 50, type=int)  # Default 50 (increased from 20)
@@ -702,35 +883,129 @@ def get_ledger():
     start_date = request.args.get('start_date')  # Optional start date (YYYY-MM-DD)
     end_date = request.args.get('end_date')  # Optional end date (YYYY-MM-DD)
     show_reversals = request.args.get('show_reversals', 'false', type=str).lower() == 'true'  # Default false (hide reversals)
-    search_query = request.args.get('search')  # Optional search query
+    search_query = request.args.get('search')  # Optional search: text, amount or range ("50..100", ">50")
     category_id = request.args.get('category_id', type=int)  # Optional category filter
-    return jsonify(sim.get_ledger_entries(
+    min_amount = request.args.get('min_amount', type=float)  # Optional transaction amount bounds
+    max_amount = request.args.get('max_amount', type=float)
+    # Optional keyset cursor: pass cursor= (empty) for the first page, then the returned
+    # next_cursor. Response becomes {"entries": [...], "next_cursor": ...}
+    page_cursor = request.args.get('cursor')
+    try:
+        return jsonify(sim.get_ledger_entries(
+            user_id=current_user.id,
+            transaction_limit=limit,
+            transaction_offset=offset,
+            account_filter=account_filter,
+            start_date=start_date,
+            end_date=end_date,
+            show_reversals=show_reversals,
+            search_query=search_query,
+            category_id=category_id,
+            page_cursor=page_cursor,
+            min_amount=min_amount,
+            max_amount=max_amount
+        ))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/export/ledger', methods=['GET'])
+@check_sim
+@login_required
+def export_ledger():
+    """
+    Stream the whole ledger as CSV (default) or NDJSON (?format=ndjson).
+
+    Accepts the same account/start_date/end_date/show_reversals/category_id
+    filters as /api/ledger. Rows are written as the engine cursor yields them,
+    so the export never holds the full ledger in memory.
+    """
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({"error": "format must be 'csv' or 'ndjson'"}), 400
+
+    rows = sim.iter_ledger_export(
         user_id=current_user.id,
-        transaction_limit=limit,
-        transaction_offset=offset,
-        account_filter=account_filter,
-        start_date=start_date,
-        end_date=end_date,
-        show_reversals=show_reversals,
-        search_query=search_query,
-        category_id=category_id
-    ))
+        account_filter=request.args.get('account'),
+        start_date=request.args.get('start_date'),
+        end_date=request.args.get('end_date'),
+        show_reversals=request.args.get('show_reversals', 'false', type=str).lower() == 'true',
+        category_id=request.args.get('category_id', type=int)
+    )
+    rows_per_chunk = 500
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=BusinessSimulator.LEDGER_EXPORT_COLUMNS)
+        writer.writeheader()
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+            if count % rows_per_chunk == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def generate_ndjson():
+        chunk = []
+        for row in rows:
+            chunk.append(app.json.dumps(row))
+            if len(chunk) == rows_per_chunk:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+
+    if export_format == 'csv':
+        body, mimetype = generate_csv(), 'text/csv'
+    else:
+        body, mimetype = generate_ndjson(), 'application/x-ndjson'
+    response = app.response_class(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="perfectbooks-ledger.{export_format}"'
+    return response
+
+# Descriptions returned by the list endpoints (the forms' fallback suggestions)
+DESCRIPTION_LIST_LIMIT = 200
+
+def _search_descriptions(kind, default_limit):
+    """Ranked descriptions of this kind starting with ?q= (all of them when q is empty)."""
+    version, _ = _request_version()
+    limit = max(1, min(request.args.get('limit', default_limit, type=int), 1000))
+    return description_index.search(current_user.id, version, kind, request.args.get('q', ''), limit)
 
 @app.route('/api/descriptions/income', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_income_descriptions():
-    return jsonify(sim.get_unique_descriptions(user_id=current_user.id, transaction_type='income'))
+    return jsonify([entry['description'] for entry in _search_descriptions('income', DESCRIPTION_LIST_LIMIT)])
 
 @app.route('/api/descriptions/expense', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_expense_descriptions():
-    return jsonify(sim.get_unique_descriptions(user_id=current_user.id, transaction_type='expense'))
+    return jsonify([entry['description'] for entry in _search_descriptions('expense', DESCRIPTION_LIST_LIMIT)])
+
+@app.route('/api/descriptions/<kind>/suggest', methods=['GET'])
+@check_sim
+@login_required
+def suggest_descriptions(kind):
+    """
+    Autocomplete ?q= against the user's income or expense descriptions.
+
+    Returns up to ?limit= (default 10) entries, best first, each with
+    description, use_count, last_used and the category_id and amount of its
+    last use so the form can prefill them.
+    """
+    if kind not in ('income', 'expense'):
+        return jsonify({"error": "Unknown description type."}), 404
+    return jsonify(_search_descriptions(kind, 10))
 
 @app.route('/api/meter/summary', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_meter_summary():
     try:
         conn, cursor = sim._get_db_connection()
@@ -746,6 +1021,8 @@ def get_meter_summary():
 @app.route('/api/meter/n_day_average', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_n_day_average():
     try:
         days = request.args.get('days', default=7, type=int)
@@ -764,6 +1041,7 @@ def get_n_day_average():
 @app.route('/api/expense_categories', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_expense_categories_api():
     categories = sim.get_expense_categories(user_id=current_user.id)
     return jsonify(categories)
@@ -829,6 +1107,7 @@ def manage_expense_category_api(category_id):
 @app.route('/api/expense_categories/<int:category_id>/transaction_count', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_expense_category_transaction_count_api(category_id):
     count = sim.get_category_transaction_count(user_id=current_user.id, category_id=category_id)
     return jsonify({"count": count})
@@ -838,6 +1117,7 @@ def get_expense_category_transaction_count_api(category_id):
 @app.route('/api/income_categories', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_income_categories_api():
     categories = sim.get_income_categories(user_id=current_user.id)
     return jsonify(categories)
@@ -909,6 +1189,7 @@ def manage_income_category_api(category_id):
 @app.route('/api/parent_categories', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_parent_categories_api():
     cat_type = request.args.get('type')  # Optional: 'income' or 'expense'
     categories = sim.get_parent_categories(cat_type=cat_type)
@@ -980,6 +1261,8 @@ def get_parent_category_usage_api(parent_id):
 @app.route('/api/expense_analysis', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_expense_analysis_api():
     try:
         start_date = request.args.get('start_date')
@@ -997,6 +1280,8 @@ def get_expense_analysis_api():
 @app.route('/api/expense_trends', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_expense_trends_api():
     try:
         start_date = request.args.get('start_date')
@@ -1014,6 +1299,7 @@ def get_expense_trends_api():
 @app.route('/api/transactions', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_transactions_by_category_api():
     """Get transactions filtered by category and date range."""
     try:
@@ -1114,7 +1400,12 @@ def update_transaction_business_api():
 @login_required
 def advance_time():
     try:
-        days = request.get_json().get('days', 1)
+        data = request.get_json()
+        days = data.get('days', 1)
+        if data.get('background'):
+            # Long advances can run as a job; poll /api/advance_job/status
+            job = advance_jobs.advance(int(current_user.id), int(days))
+            return jsonify({"success": True, "message": f"Advancing {days} days in the background.", "job": job}), 202
         result = sim.advance_time(user_id=current_user.id, days_to_advance=days)
         return jsonify({"success": True, "message": f"Time advanced by {days} days.", "result": result})
     except Exception as e:
@@ -1226,6 +1517,63 @@ def transfer_between_accounts_api():
     )
     return jsonify({"success": success, "message": message}), 200 if success else 400
 
+# --- BULK IMPORT ---
+
+IMPORT_MAX_ROWS = 100000
+
+# Bank CSV / OFX column names mapped onto import_transactions row keys
+IMPORT_COLUMN_ALIASES = {
+    'dtposted': 'date', 'posted date': 'date', 'transaction date': 'date', 'posting date': 'date',
+    'trnamt': 'amount', 'name': 'description', 'payee': 'description', 'memo': 'description',
+    'trntype': 'type', 'category name': 'category', 'account name': 'account',
+}
+
+@app.route('/api/import/transactions', methods=['POST'])
+@check_sim
+@login_required
+def import_transactions_api():
+    """
+    Bulk-import bank statement rows.
+
+    Send either JSON {"rows": [...], "account_id": 1, "dry_run": false} or a
+    CSV file (multipart field "file", or a text/csv body) with a header row;
+    for CSV, account_id and dry_run come from the form or query string.
+    Columns: date, description, amount (negative = money out) and optionally
+    type, account / account_id, category / category_id, is_business.
+    """
+    if request.is_json:
+        data = request.get_json()
+        rows = data.get('rows')
+        account_id = data.get('account_id')
+        dry_run = bool(data.get('dry_run', False))
+    else:
+        upload = request.files.get('file')
+        text = upload.read().decode('utf-8-sig') if upload else request.get_data(as_text=True)
+        reader = csv.DictReader(io.StringIO(text))
+        rows = [
+            {IMPORT_COLUMN_ALIASES.get(key.strip().lower(), key.strip().lower()): value
+             for key, value in row.items() if key}
+            for row in reader
+        ]
+        account_id = request.values.get('account_id', type=int)
+        dry_run = request.values.get('dry_run', 'false').lower() == 'true'
+
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"success": False, "message": "No rows to import."}), 400
+    if len(rows) > IMPORT_MAX_ROWS:
+        return jsonify({"success": False, "message": f"Too many rows (limit {IMPORT_MAX_ROWS})."}), 400
+
+    try:
+        result = sim.import_transactions(
+            user_id=current_user.id,
+            rows=rows,
+            account_id=account_id,
+            dry_run=dry_run
+        )
+    except Exception as e:
+        return jsonify({"success": False, "message": f"An error occurred: {e}"}), 500
+    return jsonify({"success": True, **result})
+
 # =============================================================================
 # PENDING TRANSACTIONS API (Variable Expenses & Interest Approval)
 # =============================================================================
@@ -1233,6 +1581,7 @@ def transfer_between_accounts_api():
 @app.route('/api/pending_transactions', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_pending_transactions_api():
     """Get all pending transaction approvals."""
     try:
@@ -1321,6 +1670,7 @@ def make_loan_payment_api(loan_id):
 @app.route('/api/loans/<int:loan_id>/payment_history', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
 def get_loan_payment_history_api(loan_id):
     """Get payment history for a loan."""
     history = sim.get_loan_payment_history(user_id=current_user.id, loan_id=loan_id)
@@ -1355,6 +1705,8 @@ def calculate_credit_card_interest_api(account_id):
 @app.route('/api/reports/income_statement', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_income_statement_api():
     """Get Income Statement (P&L) for a date range."""
     start_date = request.args.get('start_date')
@@ -1373,6 +1725,8 @@ def get_income_statement_api():
 @app.route('/api/reports/balance_sheet', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_balance_sheet_api():
     """Get Balance Sheet as of a specific date."""
     as_of_date = request.args.get('as_of_date')  # Optional, defaults to current date
@@ -1386,6 +1740,8 @@ def get_balance_sheet_api():
 @app.route('/api/reports/cash_flow', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_cash_flow_api():
     """Get Cash Flow Statement for a date range."""
     start_date = request.args.get('start_date')
@@ -1404,6 +1760,8 @@ def get_cash_flow_api():
 @app.route('/api/dashboard', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_dashboard_data():
     try:
         days = int(request.args.get('days', 30))
@@ -1416,6 +1774,31 @@ def get_dashboard_data():
             f.write(error_msg)
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
+# =============================================================================
+# ADMIN DIAGNOSTICS
+# =============================================================================
+
+@app.route('/api/admin/queries', methods=['GET'])
+@login_required
+@admin_required
+def get_query_profile_api():
+    """
+    SQL statements this worker has run, grouped by fingerprint, busiest first,
+    with the most recent slow queries. Needs PERFECTBOOKS_QUERY_PROFILE=1.
+
+    Query params: limit (default 50), sort (total_ms, calls, max_ms, mean_ms, rows)
+    """
+    limit = request.args.get('limit', default=50, type=int)
+    sort = request.args.get('sort', default='total_ms')
+    return jsonify(query_profiler.snapshot(limit=max(1, limit), sort=sort))
+
+@app.route('/api/admin/queries', methods=['DELETE'])
+@login_required
+@admin_required
+def reset_query_profile_api():
+    query_profiler.reset()
+    return jsonify({"success": True, "message": "Query profile cleared."})
+
 # =============================================================================
 # DATABASE INITIALIZATION (Railway only)
 # =============================================================================
@@ -1430,9 +1813,9 @@ def get_dashboard_data():
 def init_database():
     """Initialize database. For SQLite, the database is auto-created on startup."""
     try:
-        from setup_sqlite import create_database
         success = create_database()
         if success:
+            run_all_pending()
             return jsonify({"success": True, "message": "SQLite database initialized successfully!"})
         else:
             return jsonify({"success": False, "error": "Failed to create database"}), 500
@@ -1443,9 +1826,13 @@ def init_database():
 def rebuild_database():
     """DROP ALL tables and rebuild from scratch with correct schema (SQLite version)."""
     try:
-        from setup_sqlite import reset_database
+        try:
+            from setup_sqlite import reset_database
+        except ModuleNotFoundError:
+            from src.setup_sqlite import reset_database
         success = reset_database()
         if success:
+            run_all_pending()
             return jsonify({"success": True, "message": "SQLite database rebuilt successfully! All data cleared."})
         else:
             return jsonify({"success": False, "error": "Failed to rebuild database"}), 500
@@ -1456,11 +1843,12 @@ def rebuild_database():
 def migrate_database():
     """Run pending database migrations (SQLite version)."""
     try:
-        # For SQLite, migrations are handled by the migration_runner
-        # This endpoint is kept for backwards compatibility
+        # Migrations also run automatically on startup; this applies any that
+        # were added since (kept for backwards compatibility)
+        applied = run_all_pending()
         return jsonify({
             "success": True,
-            "message": "SQLite migrations are handled automatically on startup. No manual migration needed."
+            "message": f"Applied {applied} pending migration(s)." if applied else "No pending migrations."
         })
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -1470,6 +1858,8 @@ def migrate_database():
 @app.route('/api/budgets', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_budgets_api():
     budgets = sim.get_budgets(current_user.id)
     return jsonify(budgets)
@@ -1500,6 +1890,8 @@ def delete_budget_api(budget_id):
 @app.route('/api/goals', methods=['GET'])
 @check_sim
 @login_required
+@conditional_get
+@cached_response
 def get_goals_api():
     goals = sim.get_savings_goals(current_user.id)
     return jsonify(goals)
@@ -0,0 +1,355 @@
+"""
+Perfect Books - SQLite Connection Pool
+
+This module keeps SQLite connections open between engine calls instead of
+connecting, enabling foreign keys and closing again for every method.
+
+Each thread gets its own small stack of idle connections (sqlite3 connections
+are bound to the thread that created them), and the whole pool is reset after
+a fork so gunicorn workers never share a handle with their parent.
+
+Usage:
+    pool = get_pool(DB_PATH)
+
+    with pool.connection() as conn:
+        conn.execute("SELECT 1")
+
+    # Or the engine-style (connection, cursor) pair:
+    conn = pool.acquire()
+    try:
+        ...
+    finally:
+        conn.close()   # returns the connection to the pool
+
+Every new connection gets the PRAGMA profile below. WAL journaling lets
+readers (/api/ledger, /api/dashboard) keep working while advance_time or
+log_expense holds the write lock, which matters once gunicorn runs several
+workers against the same file.
+
+Configuration (environment variables):
+- PERFECTBOOKS_DB_POOL_SIZE: Idle connections kept per thread (default 4)
+- PERFECTBOOKS_DB_HEALTHCHECK_SECONDS: Idle time after which a connection is
+  pinged with SELECT 1 before reuse (default 30)
+- PERFECTBOOKS_DB_JOURNAL_MODE: journal_mode PRAGMA (default WAL)
+- PERFECTBOOKS_DB_SYNCHRONOUS: synchronous PRAGMA (default NORMAL)
+- PERFECTBOOKS_DB_CACHE_SIZE: cache_size PRAGMA, negative = KiB (default -32000)
+- PERFECTBOOKS_DB_MMAP_SIZE: mmap_size PRAGMA in bytes (default 268435456)
+- PERFECTBOOKS_DB_TEMP_STORE: temp_store PRAGMA (default MEMORY)
+- PERFECTBOOKS_DB_BUSY_TIMEOUT: busy_timeout PRAGMA in ms (default 5000)
+- PERFECTBOOKS_DB_CHECKPOINT_SECONDS: Minimum seconds between the passive WAL
+  checkpoints run when connections are returned (default 300, 0 disables)
+
+With PERFECTBOOKS_QUERY_PROFILE=1 new connections are ProfiledConnections,
+whose statements are timed by query_profiler.py.
+
+Author: Matthew Jenkins
+License: MIT
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    from query_profiler import ProfiledCursor, profiler
+except ModuleNotFoundError:
+    from src.query_profiler import ProfiledCursor, profiler
+
+
+DEFAULT_POOL_SIZE = int(os.getenv('PERFECTBOOKS_DB_POOL_SIZE', '4'))
+DEFAULT_HEALTHCHECK_SECONDS = float(os.getenv('PERFECTBOOKS_DB_HEALTHCHECK_SECONDS', '30'))
+CHECKPOINT_INTERVAL_SECONDS = float(os.getenv('PERFECTBOOKS_DB_CHECKPOINT_SECONDS', '300'))
+
+# Applied in this order to every new connection. journal_mode must come first:
+# it is persistent in the database file and the others only affect the handle.
+PRAGMA_PROFILE = {
+    'journal_mode': os.getenv('PERFECTBOOKS_DB_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('PERFECTBOOKS_DB_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': os.getenv('PERFECTBOOKS_DB_CACHE_SIZE', '-32000'),
+    'mmap_size': os.getenv('PERFECTBOOKS_DB_MMAP_SIZE', '268435456'),
+    'temp_store': os.getenv('PERFECTBOOKS_DB_TEMP_STORE', 'MEMORY'),
+    'busy_timeout': os.getenv('PERFECTBOOKS_DB_BUSY_TIMEOUT', '5000'),
+    'foreign_keys': 'ON',
+}
+
+
+def apply_pragmas(conn, profile=None):
+    """
+    Apply a PRAGMA profile to a connection.
+
+    Args:
+        conn: SQLite connection
+        profile (dict): PRAGMA name -> value (defaults to PRAGMA_PROFILE)
+    """
+    for name, value in (profile or PRAGMA_PROFILE).items():
+        if value is None or value == '':
+            continue
+        # PRAGMA values can't be bound as parameters; names/values come from
+        # this module or the server environment, never from requests.
+        conn.execute(f"PRAGMA {name} = {value};").fetchall()
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3.Connection whose close() hands the connection back to its pool.
+
+    Engine code keeps its existing try/finally conn.close() pattern; the pool
+    decides whether the handle is kept for reuse or really closed.
+    """
+
+    def close(self):
+        pool = getattr(self, '_pool', None)
+        if pool is None:
+            super().close()
+        else:
+            pool.release(self)
+
+    def _close_for_real(self):
+        self._pool = None
+        super().close()
+
+
+class ProfiledConnection(PooledConnection):
+    """PooledConnection whose cursors (and execute shortcuts) report to the query profiler."""
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+
+class ConnectionPool:
+    """
+    Per-thread, per-process pool of SQLite connections for one database file.
+
+    Args:
+        db_path (Path): Path to the SQLite database file
+        size (int): Maximum idle connections kept per thread
+        healthcheck_seconds (float): Ping connections idle for longer than this
+    """
+
+    def __init__(self, db_path, size=DEFAULT_POOL_SIZE, healthcheck_seconds=DEFAULT_HEALTHCHECK_SECONDS):
+        self.db_path = Path(db_path)
+        self.size = max(0, int(size))
+        self.healthcheck_seconds = healthcheck_seconds
+        self._stats_lock = threading.Lock()
+        self._last_checkpoint = time.monotonic()
+        self._generation = 0
+        self._reset_process_state()
+
+    def _reset_process_state(self):
+        """Forget every connection inherited from a parent process."""
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self.stats = {'created': 0, 'reused': 0, 'discarded': 0, 'in_use': 0}
+
+    def _idle(self):
+        if self._pid != os.getpid():
+            self._reset_process_state()
+        idle = getattr(self._local, 'idle', None)
+        if idle is None:
+            idle = self._local.idle = []
+        return idle
+
+    def _count(self, key, delta=1):
+        with self._stats_lock:
+            self.stats[key] += delta
+
+    def _connect(self):
+        # Create data directory if it doesn't exist (only paid once per connection)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        factory = ProfiledConnection if profiler.enabled else PooledConnection
+        conn = sqlite3.connect(str(self.db_path), factory=factory)
+
+        # WAL, cache sizing, busy timeout and foreign keys (CRITICAL for data integrity)
+        apply_pragmas(conn)
+
+        # Use Row factory for dictionary-style access (like MySQL dictionary cursor)
+        conn.row_factory = sqlite3.Row
+
+        conn._pool = self
+        conn._pool_pid = self._pid
+        conn._pool_generation = self._generation
+        conn._last_used = time.monotonic()
+        self._count('created')
+        return conn
+
+    def _is_healthy(self, conn):
+        if conn._pool_generation != self._generation:
+            return False
+        if time.monotonic() - conn._last_used < self.healthcheck_seconds:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        """
+        Check out a connection for the current thread.
+
+        Returns:
+            PooledConnection: Open connection; call close() to return it.
+        """
+        idle = self._idle()
+        while idle:
+            conn = idle.pop()
+            if self._is_healthy(conn):
+                self._count('reused')
+                self._count('in_use')
+                return self._apply_trace(conn)
+            self._discard(conn)
+
+        conn = self._connect()
+        self._count('in_use')
+        return self._apply_trace(conn)
+
+    def _apply_trace(self, conn):
+        trace = getattr(self._local, 'trace', None)
+        if getattr(conn, '_trace', None) is not trace:
+            conn.set_trace_callback(trace)
+            conn._trace = trace
+        return conn
+
+    @contextmanager
+    def traced(self, callback):
+        """
+        Context manager passing every statement this thread runs on the pool's
+        connections to callback(sql), with bound parameters expanded into the
+        text. maintenance.py check-indexes uses it to EXPLAIN what the engine
+        actually executes.
+        """
+        self._local.trace = callback
+        try:
+            yield
+        finally:
+            self._local.trace = None
+            for conn in self._idle():
+                self._apply_trace(conn)
+
+    def release(self, conn):
+        """Return a connection to the pool (or close it if the pool is full)."""
+        if getattr(conn, '_pool_pid', None) != os.getpid():
+            # Handle created in a parent process - never reuse it here
+            conn._close_for_real()
+            return
+
+        self._count('in_use', -1)
+        try:
+            # Anything the caller neither committed nor rolled back is abandoned
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        idle = self._idle()
+        if len(idle) >= self.size or conn._pool_generation != self._generation:
+            self._discard(conn)
+            return
+
+        conn._last_used = time.monotonic()
+        self._maybe_checkpoint(conn)
+        idle.append(conn)
+
+    def _maybe_checkpoint(self, conn):
+        """Run a passive WAL checkpoint at most once per CHECKPOINT_INTERVAL_SECONDS."""
+        if CHECKPOINT_INTERVAL_SECONDS <= 0:
+            return
+        if conn._last_used - self._last_checkpoint < CHECKPOINT_INTERVAL_SECONDS:
+            return
+        self._last_checkpoint = conn._last_used
+        try:
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE);").fetchall()
+        except sqlite3.Error:
+            # Another connection holds a lock; the next interval will retry
+            pass
+
+    def checkpoint(self, mode='PASSIVE'):
+        """
+        Copy WAL contents back into the main database file.
+
+        Args:
+            mode (str): PASSIVE, FULL, RESTART or TRUNCATE
+
+        Returns:
+            tuple: (busy, wal_pages, checkpointed_pages) as reported by SQLite
+        """
+        mode = mode.upper()
+        if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Unknown checkpoint mode: {mode}")
+        with self.connection() as conn:
+            row = conn.execute(f"PRAGMA wal_checkpoint({mode});").fetchone()
+        self._last_checkpoint = time.monotonic()
+        return tuple(row)
+
+    def _discard(self, conn):
+        self._count('discarded')
+        try:
+            conn._close_for_real()
+        except sqlite3.Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager yielding a pooled connection.
+
+        Commits on success, rolls back on error, and always returns the
+        connection to the pool.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def invalidate(self):
+        """
+        Retire every existing connection (e.g. after the database file was replaced).
+
+        Idle connections in this thread are closed now; connections held by
+        other threads are closed when they are next returned or checked out.
+        """
+        self._generation += 1
+        self.close_idle()
+
+    def close_idle(self):
+        """Close every idle connection owned by the current thread."""
+        idle = self._idle()
+        while idle:
+            self._discard(idle.pop())
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path):
+    """Return the process-wide pool for a database file, creating it on first use."""
+    key = str(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(db_path)
+    return pool
@@ -0,0 +1,169 @@
+"""
+Perfect Books - Description Autocomplete Index
+
+In-memory, per-user dictionaries of the expense and income descriptions a user
+has posted, built from the engine's ledger_descriptions table
+(BusinessSimulator.get_description_stats). The description fields in the web
+interface query it as the user types, so a lookup is a bisect over a sorted
+list instead of a SELECT DISTINCT over the ledger.
+
+Each description carries its use count, last-used date and the category and
+amount of its last use, which the forms use to prefill a familiar payee.
+
+Ranking: use count weighted by recency (the weight halves every
+RECENCY_HALF_LIFE_DAYS since the last use), so a weekly grocery run outranks a
+one-off purchase, and a payee used constantly last year fades behind this
+month's. Descriptions starting with the typed text come before ones where a
+later word starts with it ("whole" finds "Whole Foods", "foods" finds it too).
+
+A user's dictionary is built on first use and kept while their data version
+(BusinessSimulator.get_data_version) is unchanged and the date hasn't rolled
+over; any write makes the next lookup rebuild it from the table.
+
+Usage:
+    index = DescriptionIndex(sim.get_description_stats)
+    index.search(user_id, version, 'expense', 'saf')
+
+Configuration (environment variables):
+- PERFECTBOOKS_DESCRIPTION_INDEX_USERS: Users kept in memory (default 256)
+
+Author: Matthew Jenkins
+License: MIT
+"""
+
+import bisect
+import datetime
+import heapq
+import os
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_MAX_USERS = int(os.getenv('PERFECTBOOKS_DESCRIPTION_INDEX_USERS', '256'))
+
+# Days after which a description's last use counts half as much
+RECENCY_HALF_LIFE_DAYS = 90
+
+# Ledger account each transaction type's descriptions are posted against
+KIND_ACCOUNTS = {'expense': 'Expenses', 'income': 'Income'}
+
+
+class UserDescriptions:
+    """
+    One user's descriptions for one account, ranked and searchable by prefix.
+
+    Args:
+        rows (list): get_description_stats() rows for a single account
+        today (date): Date recency is measured from
+    """
+
+    def __init__(self, rows, today):
+        def score(row):
+            try:
+                last_used = datetime.date.fromisoformat(str(row['last_used'])[:10])
+                age = max(0, (today - last_used).days)
+            except ValueError:
+                age = 0
+            return row['use_count'] * 0.5 ** (age / RECENCY_HALF_LIFE_DAYS)
+
+        # Best first; the position in this list is a description's rank
+        self.entries = sorted(rows, key=lambda row: (-score(row), row['description'].casefold()))
+        self.prefixes = sorted((row['description'].casefold(), rank) for rank, row in enumerate(self.entries))
+        self.words = sorted(
+            (word, rank)
+            for rank, row in enumerate(self.entries)
+            for word in row['description'].casefold().split()[1:]
+        )
+
+    @staticmethod
+    def _ranks_starting_with(keys, prefix):
+        start = bisect.bisect_left(keys, (prefix,))
+        for key, rank in keys[start:]:
+            if not key.startswith(prefix):
+                break
+            yield rank
+
+    def search(self, prefix='', limit=10):
+        """
+        Return up to `limit` descriptions matching prefix, best first.
+
+        Returns:
+            list: Entry dicts (description, use_count, last_used, category_id, amount)
+        """
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            return self.entries[:limit]
+
+        ranks = heapq.nsmallest(limit, self._ranks_starting_with(self.prefixes, prefix))
+        if len(ranks) < limit:
+            seen = set(ranks)
+            ranks += heapq.nsmallest(
+                limit - len(ranks),
+                {rank for rank in self._ranks_starting_with(self.words, prefix) if rank not in seen}
+            )
+        return [self.entries[rank] for rank in ranks]
+
+
+class DescriptionIndex:
+    """
+    Bounded LRU of per-user description dictionaries, validated against a data version.
+
+    Args:
+        loader (callable): user_id -> get_description_stats() rows
+        max_users (int): Users kept in memory before the least recently used is dropped
+    """
+
+    def __init__(self, loader, max_users=DEFAULT_MAX_USERS):
+        self.loader = loader
+        self.max_users = max(1, int(max_users))
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'builds': 0}
+
+    def search(self, user_id, version, kind='expense', prefix='', limit=10):
+        """
+        Autocomplete a description for one user.
+
+        Args:
+            user_id: Logged-in user's ID
+            version (int): The user's current data version
+            kind (str): 'expense' or 'income'
+            prefix (str): Text typed so far ('' for the top descriptions)
+            limit (int): Maximum suggestions
+
+        Returns:
+            list: Entry dicts, best first
+        """
+        dictionaries = self._dictionaries(user_id, version)
+        return dictionaries[KIND_ACCOUNTS.get(kind, 'Expenses')].search(prefix, limit)
+
+    def _dictionaries(self, user_id, version):
+        today = datetime.date.today()
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is not None and cached[0] == version and cached[1] == today:
+                self._users.move_to_end(user_id)
+                self.stats['hits'] += 1
+                return cached[2]
+
+        # Build outside the lock; a concurrent build for the same user just wins or loses the race
+        rows = {account: [] for account in KIND_ACCOUNTS.values()}
+        for row in self.loader(user_id):
+            rows.setdefault(row['account'], []).append(row)
+        dictionaries = {account: UserDescriptions(account_rows, today) for account, account_rows in rows.items()}
+
+        with self._lock:
+            self._users[user_id] = (version, today, dictionaries)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+            self.stats['builds'] += 1
+        return dictionaries
+
+    def clear(self):
+        """Drop every user's dictionary."""
+        with self._lock:
+            self._users.clear()
+
+    def __len__(self):
+        return len(self._users)
@@ -26,13 +26,26 @@ Related Project: Digital Harvest (Business Simulation with similar accounting pr
 """
 
 import os
-import sqlite3
 import datetime
 import time
-from decimal import Decimal
+import heapq
+import threading
+import functools
+import inspect
+import json
+import base64
+import re
+from decimal import Decimal, ROUND_HALF_UP
 from pathlib import Path
 import bcrypt
 
+try:
+    from db_pool import get_pool
+    from metrics import ADVANCE_TIME_DAYS, ADVANCE_TIME_RUNS
+except ModuleNotFoundError:
+    from src.db_pool import get_pool
+    from src.metrics import ADVANCE_TIME_DAYS, ADVANCE_TIME_RUNS
+
 # --- DATABASE CONFIGURATION ---
 # SQLite database path (portable, no server needed)
 DB_PATH = Path(__file__).parent / "data" / "perfectbooks.db"
@@ -45,6 +58,37 @@ print(f"  Location: {DB_PATH}")
 print(f"  Exists: {DB_PATH.exists()}")
 print("=" * 60)
 
+# --- TIME ADVANCE CONFIGURATION ---
+# advance_time and background advance jobs commit a checkpoint every this many
+# days, releasing the write lock between chunks
+ADVANCE_CHUNK_DAYS = max(1, int(os.getenv('PERFECTBOOKS_ADVANCE_CHUNK_DAYS', '31')))
+# A running advance whose heartbeat is older than this was abandoned (its process died)
+ADVANCE_STALE_SECONDS = float(os.getenv('PERFECTBOOKS_ADVANCE_STALE_SECONDS', '120'))
+
+
+def writes_user_data(method):
+    """
+    Mark an engine method as changing data that a user's read endpoints return.
+
+    Once the method returns (or raises) the user's data version is bumped, so
+    response caches and ETags keyed on it stop serving the previous payload.
+    Methods without a user_id (parent categories) or called with user_id=None
+    bump every user. Calls that pass an outer cursor= run inside the caller's
+    transaction, and the caller bumps once it has committed.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        arguments = signature.bind(self, *args, **kwargs).arguments
+        if arguments.get('cursor') is not None:
+            return method(self, *args, **kwargs)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._bump_data_version(arguments.get('user_id'))
+    return wrapper
+
 
 class BusinessSimulator:
     """
@@ -100,6 +144,22 @@ class BusinessSimulator:
             return Decimal('0.00')
         return Decimal(str(value))
 
+    @staticmethod
+    def _to_cents(value):
+        """Convert a money value (Decimal, float, int or TEXT) to integer cents"""
+        if value is None or value == '':
+            return 0
+        if type(value) is int:
+            return value * 100
+        return int((Decimal(str(value)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+    @staticmethod
+    def _from_cents(cents):
+        """Convert integer cents from SQLite to an exact Decimal"""
+        if cents is None:
+            return Decimal('0.00')
+        return Decimal(int(cents)).scaleb(-2)
+
     @staticmethod
     def _to_bool_int(value):
         """Convert Python boolean to SQLite integer (0/1)"""
@@ -156,27 +216,19 @@ class BusinessSimulator:
 
     def _get_db_connection(self):
         """
-        Establish a new database connection.
+        Check out a database connection from the shared pool.
 
         Returns:
             tuple: (connection, cursor) - SQLite connection and cursor
 
         Note:
             Callers are responsible for closing the connection and cursor.
+            Closing a pooled connection returns it to the pool (rolling back
+            anything left uncommitted) rather than disconnecting.
             SQLite connections use Row factory for dictionary-style access.
         """
-        # Create data directory if it doesn't exist
-        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-        # Connect to SQLite database
-        conn = sqlite3.connect(str(DB_PATH))
-
-        # Enable foreign key constraints (CRITICAL for data integrity)
-        conn.execute("PRAGMA foreign_keys = ON;")
-
-        # Use Row factory for dictionary-style access (like MySQL dictionary cursor)
-        conn.row_factory = sqlite3.Row
-
+        # Looked up on every call so DB_PATH can be repointed (e.g. tests, tools)
+        conn = get_pool(DB_PATH).acquire()
         return conn, conn.cursor()
 
     def _get_user_current_date(self, cursor, user_id):
@@ -192,6 +244,701 @@ class BusinessSimulator:
         # Fallback to today's date if not set
         return datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
+    # =============================================================================
+    # DATA VERSIONS
+    # =============================================================================
+
+    def get_data_version(self, user_id):
+        """
+        Return the user's data version (bumped by every @writes_user_data method).
+
+        Two reads that see the same version saw the same data, which is what
+        the API's response cache and ETags rely on.
+
+        Returns:
+            int: Current version, 0 if the user has never written anything
+        """
+        with get_pool(DB_PATH).connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM user_data_versions WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return row['version'] if row else 0
+
+    def _bump_data_version(self, user_id=None):
+        """Increment one user's data version, or every user's if user_id is None."""
+        with get_pool(DB_PATH).connection() as conn:
+            if user_id is None:
+                conn.execute("""
+                    INSERT INTO user_data_versions (user_id, version)
+                    SELECT user_id, 1 FROM users WHERE true
+                    ON CONFLICT(user_id) DO UPDATE SET version = version + 1
+                """)
+            else:
+                conn.execute("""
+                    INSERT INTO user_data_versions (user_id, version) VALUES (?, 1)
+                    ON CONFLICT(user_id) DO UPDATE SET version = version + 1
+                """, (user_id,))
+
+    # =============================================================================
+    # LEDGER POSTING & ACCOUNT BALANCES
+    # =============================================================================
+
+    def _post_ledger_entries(self, cursor, user_id, entries, transaction_type='OTHER'):
+        """
+        Insert ledger lines, their transaction headers and account_balances
+        updates in the same transaction.
+
+        Every write path goes through here so the materialised balances and
+        headers can never drift from the ledger. The caller owns the
+        commit/rollback.
+
+        Args:
+            cursor: Cursor of the caller's open transaction
+            user_id (int): The user ID
+            entries (list): Dicts with transaction_uuid, transaction_date, account,
+                description, debit, credit and optionally category_id,
+                is_business, is_reversal, reversal_of_id, transaction_type and
+                debit_cents/credit_cents (when the caller already converted them)
+            transaction_type (str): Header type (INCOME, EXPENSE, TRANSFER, ...) for
+                entries that don't carry their own
+        """
+        rows = []
+        deltas = {}
+        headers = {}
+        rollups = {}
+        descriptions = {}
+        for entry in entries:
+            debit = entry.get('debit', '0.00')
+            credit = entry.get('credit', '0.00')
+            debit_cents = entry.get('debit_cents')
+            if debit_cents is None:
+                debit_cents = self._to_cents(debit)
+            credit_cents = entry.get('credit_cents')
+            if credit_cents is None:
+                credit_cents = self._to_cents(credit)
+            uuid = entry['transaction_uuid']
+            transaction_date = entry['transaction_date']
+            account = entry['account']
+            description = entry.get('description')
+            category_id = entry.get('category_id')
+            is_reversal = 1 if entry.get('is_reversal') else 0
+            is_business = 1 if entry.get('is_business') else 0
+            rows.append((
+                user_id,
+                uuid,
+                transaction_date,
+                account,
+                description,
+                debit,
+                credit,
+                category_id,
+                is_reversal,
+                entry.get('reversal_of_id'),
+                is_business,
+                debit_cents,
+                credit_cents,
+            ))
+            deltas[account] = deltas.get(account, 0) + debit_cents - credit_cents
+
+            rollup_key = (
+                str(transaction_date)[:10],
+                account,
+                category_id or 0,
+                is_reversal,
+                is_business,
+                1 if description is None or description in self._ROLLUP_SYSTEM_DESCRIPTIONS else 0,
+            )
+            rollup = rollups.get(rollup_key)
+            if rollup is None:
+                rollup = rollups[rollup_key] = [0, 0, 0]
+            rollup[0] += debit_cents
+            rollup[1] += credit_cents
+            rollup[2] += 1
+
+            header = headers.get(uuid)
+            if header is None:
+                header = headers[uuid] = {
+                    'transaction_date': transaction_date,
+                    'description': description,
+                    'type': entry.get('transaction_type', transaction_type),
+                    'category_id': None,
+                    'is_reversal': 0,
+                    'is_business': 0,
+                    'amount_cents': 0,
+                    'last_row': 0,
+                }
+            if header['category_id'] is None:
+                header['category_id'] = category_id
+            if is_reversal:
+                header['is_reversal'] = 1
+            if is_business:
+                header['is_business'] = 1
+            header['amount_cents'] += debit_cents
+            header['last_row'] = len(rows) - 1
+
+            if account in self._DESCRIBED_ACCOUNTS and not is_reversal and description:
+                # Later lines win: entries are posted in date order within a call
+                key = (account, description)
+                use = descriptions.get(key)
+                last_used = str(transaction_date)
+                if use is None:
+                    use = descriptions[key] = [0, last_used, 0, None, 0]
+                if last_used >= use[1]:
+                    use[1:] = [last_used, len(rows) - 1, category_id, abs(debit_cents - credit_cents)]
+                use[0] += 1
+
+        cursor.executemany(
+            "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description, "
+            "debit, credit, category_id, is_reversal, reversal_of_id, is_business, debit_cents, credit_cents) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        self._apply_balance_deltas(cursor, user_id, deltas)
+        self._apply_daily_rollups(cursor, user_id, rollups)
+
+        # The caller holds the write lock, so the new AUTOINCREMENT ids are contiguous
+        cursor.execute("SELECT last_insert_rowid()")
+        first_entry_id = cursor.fetchone()[0] - len(rows) + 1
+        cursor.executemany(
+            "INSERT INTO transactions (user_id, transaction_uuid, transaction_date, last_entry_id, description, "
+            "type, is_reversal, category_id, is_business, amount_cents) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(user_id, transaction_uuid) DO UPDATE SET "
+            "transaction_date = max(transaction_date, excluded.transaction_date), "
+            "last_entry_id = max(last_entry_id, excluded.last_entry_id), "
+            "is_reversal = max(is_reversal, excluded.is_reversal), "
+            "category_id = COALESCE(category_id, excluded.category_id), "
+            "is_business = max(is_business, excluded.is_business), "
+            "amount_cents = amount_cents + excluded.amount_cents",
+            [
+                (user_id, uuid, h['transaction_date'], first_entry_id + h['last_row'], h['description'],
+                 h['type'], h['is_reversal'], h['category_id'], h['is_business'], h['amount_cents'])
+                for uuid, h in headers.items()
+            ]
+        )
+        self._refresh_ledger_search(cursor, user_id, headers)
+
+        cursor.execute(
+            "SELECT account, MIN(transaction_date) AS from_date FROM financial_ledger "
+            "WHERE entry_id BETWEEN ? AND ? GROUP BY account",
+            (first_entry_id, first_entry_id + len(rows) - 1)
+        )
+        for row in cursor.fetchall():
+            self._refresh_running_balances(cursor, user_id, row['account'], row['from_date'])
+
+        self._apply_description_uses(cursor, user_id, descriptions, first_entry_id)
+
+    def _apply_balance_deltas(self, cursor, user_id, deltas):
+        """Add per-account cent deltas to account_balances (upsert)."""
+        cursor.executemany(
+            "INSERT INTO account_balances (user_id, account, balance_cents) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id, account) DO UPDATE SET balance_cents = balance_cents + excluded.balance_cents",
+            [(user_id, account, cents) for account, cents in deltas.items() if cents]
+        )
+
+    # Descriptions the analytics exclude; NULL descriptions are excluded too
+    _ROLLUP_SYSTEM_DESCRIPTIONS = ('Time Advanced', 'Initial Balance')
+
+    # ledger_daily_rollups rows recomputed from financial_ledger ({where} narrows it)
+    _DAILY_ROLLUP_SELECT = """
+        SELECT user_id, substr(transaction_date, 1, 10) AS transaction_date, account,
+               COALESCE(category_id, 0),
+               COALESCE(is_reversal, 0),
+               COALESCE(is_business, 0),
+               COALESCE(description IN ('Time Advanced', 'Initial Balance'), 1),
+               SUM(debit_cents), SUM(credit_cents), COUNT(*)
+        FROM financial_ledger
+        {where}
+        GROUP BY 1, 2, 3, 4, 5, 6, 7
+    """
+
+    def _apply_daily_rollups(self, cursor, user_id, rollups):
+        """Add new ledger lines to ledger_daily_rollups (upsert per day/account/category/flags)."""
+        cursor.executemany(
+            "INSERT INTO ledger_daily_rollups (user_id, transaction_date, account, category_id, is_reversal, "
+            "is_business, is_system, debit_cents, credit_cents, line_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(user_id, transaction_date, account, category_id, is_reversal, is_business, is_system) "
+            "DO UPDATE SET debit_cents = debit_cents + excluded.debit_cents, "
+            "credit_cents = credit_cents + excluded.credit_cents, "
+            "line_count = line_count + excluded.line_count",
+            [(user_id, *key, *totals) for key, totals in rollups.items()]
+        )
+
+    def _refresh_daily_rollups(self, cursor, user_id, transaction_dates=None):
+        """
+        Recompute ledger_daily_rollups for the days of some of a user's dates (or
+        all of them) after ledger lines were updated in place.
+
+        Args:
+            cursor: Cursor of the caller's open transaction
+            user_id (int): The user ID
+            transaction_dates (iterable, optional): Dates or transaction_date values
+                whose days to redo
+        """
+        insert = (
+            "INSERT INTO ledger_daily_rollups (user_id, transaction_date, account, category_id, is_reversal, "
+            "is_business, is_system, debit_cents, credit_cents, line_count) "
+        )
+        if transaction_dates is None:
+            cursor.execute("DELETE FROM ledger_daily_rollups WHERE user_id = ?", (user_id,))
+            cursor.execute(insert + self._DAILY_ROLLUP_SELECT.format(where="WHERE user_id = ?"), (user_id,))
+            return
+
+        # One day at a time, so each recompute is a range seek on the ledger's
+        # (user_id, transaction_date) index rather than a scan of the user's lines
+        days = sorted({str(d)[:10] for d in transaction_dates})
+        cursor.executemany(
+            "DELETE FROM ledger_daily_rollups WHERE user_id = ? AND transaction_date = ?",
+            [(user_id, day) for day in days]
+        )
+        cursor.executemany(
+            insert + self._DAILY_ROLLUP_SELECT.format(
+                where="WHERE user_id = ? AND transaction_date >= ? AND transaction_date < DATE(?, '+1 day')"),
+            [(user_id, day, day) for day in days]
+        )
+
+    def _get_transaction_days(self, cursor, user_id, where, params):
+        """Distinct days (YYYY-MM-DD) of the user's ledger lines matching `where`."""
+        cursor.execute(
+            f"SELECT DISTINCT substr(transaction_date, 1, 10) AS day FROM financial_ledger WHERE user_id = ? AND {where}",
+            (user_id, *params)
+        )
+        return [row['day'] for row in cursor.fetchall()]
+
+    # ledger_search rows recomputed from financial_ledger ({where} narrows the headers)
+    _LEDGER_SEARCH_SELECT = """
+        SELECT t.rowid, '<' || t.user_id || '>',
+               (SELECT group_concat(DISTINCT l.description) FROM financial_ledger l
+                WHERE l.user_id = t.user_id AND l.transaction_uuid = t.transaction_uuid),
+               (SELECT group_concat(DISTINCT l.account) FROM financial_ledger l
+                WHERE l.user_id = t.user_id AND l.transaction_uuid = t.transaction_uuid)
+        FROM transactions t
+        {where}
+    """
+
+    def _refresh_ledger_search(self, cursor, user_id, transaction_uuids=None):
+        """
+        Recompute the ledger_search (FTS) rows of some of a user's transactions
+        (or all of them) from their ledger lines.
+
+        Args:
+            cursor: Cursor of the caller's open transaction
+            user_id (int): The user ID
+            transaction_uuids (iterable, optional): transaction_uuid values to redo
+        """
+        if transaction_uuids is None:
+            uuid_clause, params = "", (user_id,)
+        else:
+            transaction_uuids = sorted(set(transaction_uuids))
+            if not transaction_uuids:
+                return
+            uuid_clause = " AND t.transaction_uuid IN (SELECT value FROM json_each(?))"
+            params = (user_id, json.dumps(transaction_uuids))
+
+        cursor.execute(
+            "INSERT OR REPLACE INTO ledger_search (rowid, owner, descriptions, accounts) "
+            + self._LEDGER_SEARCH_SELECT.format(where="WHERE t.user_id = ?" + uuid_clause),
+            params
+        )
+
+    # ledger_running_balances rows recomputed from financial_ledger ({where} narrows
+    # the lines; the two ? are the balances carried in from before the first line)
+    _RUNNING_BALANCE_SELECT = """
+        SELECT user_id, account, transaction_date, entry_id,
+               ? + SUM(debit_cents - credit_cents) OVER running,
+               ? + SUM(CASE WHEN is_reversal THEN 0 ELSE debit_cents - credit_cents END) OVER running
+        FROM financial_ledger
+        {where}
+        WINDOW running AS (PARTITION BY user_id, account ORDER BY transaction_date, entry_id)
+    """
+
+    def _refresh_running_balances(self, cursor, user_id, account, from_date=None):
+        """
+        Recompute ledger_running_balances for one account from a date onward
+        (or its whole history).
+
+        Lines posted after the account's last line only redo their own day; a
+        back-dated line redoes every later line of the account.
+
+        Args:
+            cursor: Cursor of the caller's open transaction
+            user_id (int): The user ID
+            account (str): Account name
+            from_date (str, optional): First transaction_date to redo
+        """
+        if from_date is None:
+            cursor.execute(
+                "DELETE FROM ledger_running_balances WHERE user_id = ? AND account = ?",
+                (user_id, account)
+            )
+            base = (0, 0)
+            date_clause, params = "", (user_id, account)
+        else:
+            cursor.execute(
+                "SELECT balance_cents, non_reversal_balance_cents FROM ledger_running_balances "
+                "WHERE user_id = ? AND account = ? AND transaction_date < ? "
+                "ORDER BY transaction_date DESC, entry_id DESC LIMIT 1",
+                (user_id, account, from_date)
+            )
+            base = tuple(cursor.fetchone() or (0, 0))
+            date_clause, params = " AND transaction_date >= ?", (user_id, account, from_date)
+
+        cursor.execute(
+            "INSERT OR REPLACE INTO ledger_running_balances (user_id, account, transaction_date, entry_id, "
+            "balance_cents, non_reversal_balance_cents) "
+            + self._RUNNING_BALANCE_SELECT.format(where="WHERE user_id = ? AND account = ?" + date_clause),
+            base + params
+        )
+
+    # Accounts whose line descriptions feed the autocomplete dictionary
+    _DESCRIBED_ACCOUNTS = ('Expenses', 'Income')
+
+    def _apply_description_uses(self, cursor, user_id, descriptions, first_entry_id):
+        """
+        Add newly posted description uses to ledger_descriptions (upsert).
+
+        Args:
+            descriptions (dict): (account, description) -> [uses, last_used,
+                row index of the last use, its category_id, its amount_cents]
+            first_entry_id (int): entry_id of row index 0
+        """
+        cursor.executemany(
+            "INSERT INTO ledger_descriptions (user_id, account, description, use_count, last_used, last_entry_id, "
+            "category_id, amount_cents) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(user_id, account, description) DO UPDATE SET "
+            "use_count = use_count + excluded.use_count, "
+            "category_id = CASE WHEN excluded.last_used >= last_used THEN excluded.category_id ELSE category_id END, "
+            "amount_cents = CASE WHEN excluded.last_used >= last_used THEN excluded.amount_cents ELSE amount_cents END, "
+            "last_entry_id = CASE WHEN excluded.last_used >= last_used THEN excluded.last_entry_id ELSE last_entry_id END, "
+            "last_used = max(last_used, excluded.last_used)",
+            [
+                (user_id, account, description, uses, last_used, first_entry_id + last_row, category_id, amount_cents)
+                for (account, description), (uses, last_used, last_row, category_id, amount_cents) in descriptions.items()
+            ]
+        )
+
+    # ledger_descriptions rows recomputed from financial_ledger ({where} narrows the lines)
+    _LEDGER_DESCRIPTION_SELECT = """
+        SELECT user_id, account, description, use_count, transaction_date, entry_id, category_id, amount_cents
+        FROM (
+            SELECT user_id, account, description, transaction_date, entry_id, category_id,
+                   ABS(debit_cents - credit_cents) AS amount_cents,
+                   COUNT(*) OVER uses AS use_count,
+                   ROW_NUMBER() OVER (uses ORDER BY transaction_date DESC, entry_id DESC) AS recency
+            FROM financial_ledger
+            WHERE account IN ('Expenses', 'Income') AND is_reversal = 0 AND description != '' {where}
+            WINDOW uses AS (PARTITION BY user_id, account, description)
+        )
+        WHERE recency = 1
+    """
+
+    def _refresh_ledger_descriptions(self, cursor, user_id, keys):
+        """
+        Recompute ledger_descriptions rows from the ledger after lines were
+        updated in place (reversed or recategorised).
+
+        Args:
+            cursor: Cursor of the caller's open transaction
+            user_id (int): The user ID
+            keys (iterable): (account, description) pairs to redo
+        """
+        for account, description in set(keys):
+            if account not in self._DESCRIBED_ACCOUNTS:
+                continue
+            params = (user_id, account, description)
+            cursor.execute(
+                "DELETE FROM ledger_descriptions WHERE user_id = ? AND account = ? AND description = ?", params
+            )
+            cursor.execute(
+                "INSERT INTO ledger_descriptions (user_id, account, description, use_count, last_used, "
+                "last_entry_id, category_id, amount_cents) "
+                + self._LEDGER_DESCRIPTION_SELECT.format(where="AND user_id = ? AND account = ? AND description = ?"),
+                params
+            )
+
+    def _get_transaction_uuids(self, cursor, user_id, where, params):
+        """Distinct transaction_uuid values of the user's ledger lines matching `where`."""
+        cursor.execute(
+            f"SELECT DISTINCT transaction_uuid FROM financial_ledger WHERE user_id = ? AND {where}",
+            (user_id, *params)
+        )
+        return [row['transaction_uuid'] for row in cursor.fetchall()]
+
+    def _get_account_balances(self, cursor, user_id, as_of_date=None):
+        """
+        Balances of every ledger account for a user, in one query.
+
+        Without a date the materialised account_balances table answers directly;
+        with one, a single grouped aggregate replays the ledger up to that date.
+
+        Args:
+            cursor: Open cursor
+            user_id (int): The user ID
+            as_of_date (str/date, optional): Include entries dated on or before this
+
+        Returns:
+            dict: account name -> balance in integer cents
+        """
+        if as_of_date is None:
+            cursor.execute("SELECT account, balance_cents FROM account_balances WHERE user_id = ?", (user_id,))
+        else:
+            cursor.execute("""
+                SELECT account, SUM(debit_cents - credit_cents) AS balance_cents
+                FROM financial_ledger
+                WHERE user_id = ? AND transaction_date <= ?
+                GROUP BY account
+            """, (user_id, as_of_date))
+        return {row['account']: row['balance_cents'] for row in cursor.fetchall()}
+
+    def _get_account_balance(self, cursor, user_id, account_name):
+        """Return the current ledger balance of one account from account_balances."""
+        cursor.execute(
+            "SELECT balance_cents FROM account_balances WHERE user_id = ? AND account = ?",
+            (user_id, account_name)
+        )
+        row = cursor.fetchone()
+        return row['balance_cents'] / 100 if row else 0.0
+
+    def _rebuild_account_balances(self, cursor, user_id):
+        """Recompute account_balances for a user from financial_ledger."""
+        cursor.execute("DELETE FROM account_balances WHERE user_id = ?", (user_id,))
+        cursor.execute("""
+            INSERT INTO account_balances (user_id, account, balance_cents)
+            SELECT user_id, account,
+                   SUM(debit_cents - credit_cents)
+            FROM financial_ledger
+            WHERE user_id = ?
+            GROUP BY user_id, account
+        """, (user_id,))
+
+    def verify_account_balances(self, user_id=None):
+        """
+        Compare account_balances against a full recomputation from the ledger.
+
+        Args:
+            user_id (int, optional): Limit the check to one user
+
+        Returns:
+            list: Mismatches as dicts (user_id, account, stored_cents, ledger_cents)
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            user_clause = "WHERE user_id = ?" if user_id is not None else ""
+            params = (user_id,) if user_id is not None else ()
+            cursor.execute(f"""
+                SELECT user_id, account,
+                       SUM(debit_cents - credit_cents) AS ledger_cents
+                FROM financial_ledger
+                {user_clause}
+                GROUP BY user_id, account
+            """, params)
+            expected = {(r['user_id'], r['account']): r['ledger_cents'] for r in cursor.fetchall()}
+
+            cursor.execute(f"SELECT user_id, account, balance_cents FROM account_balances {user_clause}", params)
+            stored = {(r['user_id'], r['account']): r['balance_cents'] for r in cursor.fetchall()}
+
+            mismatches = []
+            for key in sorted(set(expected) | set(stored), key=lambda k: (k[0], k[1])):
+                if expected.get(key, 0) != stored.get(key, 0):
+                    mismatches.append({
+                        'user_id': key[0],
+                        'account': key[1],
+                        'stored_cents': stored.get(key, 0),
+                        'ledger_cents': expected.get(key, 0),
+                    })
+            return mismatches
+        finally:
+            cursor.close()
+            conn.close()
+
+    @writes_user_data
+    def rebuild_account_balances(self, user_id=None):
+        """
+        Rebuild account_balances from the ledger for one user (or everyone).
+
+        Returns:
+            int: Number of users rebuilt
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            if user_id is not None:
+                user_ids = [user_id]
+            else:
+                cursor.execute("SELECT user_id FROM users")
+                user_ids = [r['user_id'] for r in cursor.fetchall()]
+            for uid in user_ids:
+                self._rebuild_account_balances(cursor, uid)
+            conn.commit()
+            return len(user_ids)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def verify_daily_rollups(self, user_id=None):
+        """
+        Compare ledger_daily_rollups against a full recomputation from the ledger.
+
+        Args:
+            user_id (int, optional): Limit the check to one user
+
+        Returns:
+            list: (user_id, transaction_date, account) of every day/account that differs
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            user_clause = "WHERE user_id = ?" if user_id is not None else ""
+            params = (user_id,) if user_id is not None else ()
+            stored = f"""
+                SELECT user_id, transaction_date, account, category_id, is_reversal, is_business,
+                       is_system, debit_cents, credit_cents, line_count
+                FROM ledger_daily_rollups {user_clause}
+            """
+            expected = self._DAILY_ROLLUP_SELECT.format(where=user_clause)
+            cursor.execute(f"""
+                SELECT DISTINCT user_id, transaction_date, account FROM (
+                    SELECT * FROM (SELECT * FROM ({expected}) EXCEPT SELECT * FROM ({stored}))
+                    UNION ALL
+                    SELECT * FROM (SELECT * FROM ({stored}) EXCEPT SELECT * FROM ({expected}))
+                )
+                ORDER BY 1, 2, 3
+            """, params * 4)
+            return [tuple(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+
+    @writes_user_data
+    def rebuild_daily_rollups(self, user_id=None):
+        """
+        Rebuild ledger_daily_rollups from the ledger for one user (or everyone).
+
+        Returns:
+            int: Number of users rebuilt
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            if user_id is not None:
+                user_ids = [user_id]
+            else:
+                cursor.execute("SELECT user_id FROM users")
+                user_ids = [r['user_id'] for r in cursor.fetchall()]
+            for uid in user_ids:
+                self._refresh_daily_rollups(cursor, uid)
+            conn.commit()
+            return len(user_ids)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def verify_running_balances(self, user_id=None):
+        """
+        Compare ledger_running_balances against a full recomputation from the ledger.
+
+        Args:
+            user_id (int, optional): Limit the check to one user
+
+        Returns:
+            list: (user_id, account, transaction_date, entry_id) of every line that differs
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            user_clause = "WHERE user_id = ?" if user_id is not None else ""
+            user_params = (user_id,) if user_id is not None else ()
+            stored = f"""
+                SELECT user_id, account, transaction_date, entry_id, balance_cents, non_reversal_balance_cents
+                FROM ledger_running_balances {user_clause}
+            """
+            expected = self._RUNNING_BALANCE_SELECT.format(where=user_clause)
+            expected_params = (0, 0) + user_params
+            cursor.execute(f"""
+                SELECT DISTINCT user_id, account, transaction_date, entry_id FROM (
+                    SELECT * FROM (SELECT * FROM ({expected}) EXCEPT SELECT * FROM ({stored}))
+                    UNION ALL
+                    SELECT * FROM (SELECT * FROM ({stored}) EXCEPT SELECT * FROM ({expected}))
+                )
+                ORDER BY 1, 2, 3, 4
+            """, (expected_params + user_params) * 2)
+            return [tuple(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+
+    @writes_user_data
+    def rebuild_running_balances(self, user_id=None):
+        """
+        Rebuild ledger_running_balances from the ledger for one user (or everyone).
+
+        Returns:
+            int: Number of users rebuilt
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            if user_id is not None:
+                cursor.execute("DELETE FROM ledger_running_balances WHERE user_id = ?", (user_id,))
+                where, params = "WHERE user_id = ?", (0, 0, user_id)
+                user_count = 1
+            else:
+                cursor.execute("DELETE FROM ledger_running_balances")
+                where, params = "", (0, 0)
+                cursor.execute("SELECT COUNT(*) FROM users")
+                user_count = cursor.fetchone()[0]
+            cursor.execute(
+                "INSERT INTO ledger_running_balances (user_id, account, transaction_date, entry_id, "
+                "balance_cents, non_reversal_balance_cents) "
+                + self._RUNNING_BALANCE_SELECT.format(where=where),
+                params
+            )
+            conn.commit()
+            return user_count
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    @writes_user_data
+    def rebuild_ledger_search(self, user_id=None):
+        """
+        Rebuild the ledger_search full-text index from the ledger for one user
+        (or everyone, which also drops rows left behind by deleted headers).
+
+        Returns:
+            int: Number of transactions indexed
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            if user_id is not None:
+                cursor.execute(
+                    "DELETE FROM ledger_search WHERE rowid IN (SELECT rowid FROM transactions WHERE user_id = ?)",
+                    (user_id,)
+                )
+                self._refresh_ledger_search(cursor, user_id)
+                cursor.execute("SELECT COUNT(*) FROM transactions WHERE user_id = ?", (user_id,))
+            else:
+                cursor.execute("DELETE FROM ledger_search")
+                cursor.execute(
+                    "INSERT INTO ledger_search (rowid, owner, descriptions, accounts) "
+                    + self._LEDGER_SEARCH_SELECT.format(where="")
+                )
+                cursor.execute("SELECT COUNT(*) FROM transactions")
+            count = cursor.fetchone()[0]
+            conn.commit()
+            return count
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
     # =============================================================================
     # USER AUTHENTICATION METHODS
     # =============================================================================
@@ -359,6 +1106,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def initialize_default_categories(self, user_id):
         """Create default expense categories and parent groups for a new user."""
         conn, cursor = self._get_db_connection()
@@ -434,8 +1182,13 @@ class BusinessSimulator:
     def get_status_summary(self, user_id):
         conn, cursor = self._get_db_connection()
         try:
-            accounts = self.get_accounts_list(user_id)
-            total_cash = sum(self._from_money_str(acc['balance']) for acc in accounts if acc['type'] in ['CHECKING', 'SAVINGS', 'CASH'])
+            cursor.execute(
+                "SELECT name FROM accounts WHERE user_id = ? AND type IN ('CHECKING', 'SAVINGS', 'CASH')",
+                (user_id,)
+            )
+            cash_accounts = [row['name'] for row in cursor.fetchall()]
+            balances = self._get_account_balances(cursor, user_id)
+            total_cash = sum(self._from_cents(balances.get(name, 0)) for name in cash_accounts)
             current_date = self._get_user_current_date(cursor, user_id)
             summary = { 'cash': float(total_cash), 'date': current_date }
             return summary
@@ -449,40 +1202,134 @@ class BusinessSimulator:
             cursor.execute("SELECT * FROM accounts WHERE user_id = ? AND type != 'EQUITY' ORDER BY name", (user_id,))
             accounts = self._rows_to_dicts(cursor.fetchall())
 
-            # Calculate balance from ledger for each account
+            balances = self._get_account_balances(cursor, user_id)
             for account in accounts:
-                cursor.execute(
-                    "SELECT COALESCE(SUM(debit), 0) - COALESCE(SUM(credit), 0) as ledger_balance "
-                    "FROM financial_ledger WHERE user_id = ? AND account = ?",
-                    (user_id, account['name'])
-                )
-                ledger_balance = float(self._row_to_dict(cursor.fetchone())['ledger_balance'] or 0)
-                account['balance'] = ledger_balance
+                account['balance'] = balances.get(account['name'], 0) / 100
 
             return accounts
         finally:
             cursor.close()
             conn.close()
 
-    def get_ledger_entries(self, user_id, transaction_limit=20, transaction_offset=0, account_filter=None, start_date=None, end_date=None, show_reversals=True, search_query=None, category_id=None):
+    @staticmethod
+    def _encode_ledger_cursor(max_date, max_id):
+        """Encode a ledger page position as an opaque URL-safe token"""
+        raw = json.dumps([str(max_date), int(max_id)]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def _decode_ledger_cursor(token):
+        """Decode a ledger page token into (max_date, max_id); raises ValueError if malformed"""
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            max_date, max_id = json.loads(raw)
+            return str(max_date), int(max_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid ledger cursor.") from e
+
+    # Amount searches: "42.50", "$1,200", "50..100", ">50", ">=50", "<50", "<=50"
+    _AMOUNT_SEARCH = re.compile(
+        r'^(?P<op>[<>]=?)?\s*(?P<low>\$?\d[\d,]*(?:\.\d{1,2})?)'
+        r'(?:\s*\.\.\s*(?P<high>\$?\d[\d,]*(?:\.\d{1,2})?))?$'
+    )
+
+    @classmethod
+    def _parse_amount_search(cls, query):
         """
-        Get ledger entries for a user, optionally filtered to a specific account and/or date range.
+        Parse a ledger search string as a transaction amount or amount range.
 
-        Args:
-            user_id: The user ID
-            transaction_limit: Maximum number of transactions to return
-            transaction_offset: Number of transactions to skip (for pagination)
-            account_filter: Optional account name to filter by. If provided, only shows
-                          transactions that involve this account.
-            start_date: Optional start date (YYYY-MM-DD format) for date range filtering
-            end_date: Optional end date (YYYY-MM-DD format) for date range filtering
+        Returns:
+            tuple: (min_cents, max_cents, is_range) with None for an open end, or
+                   None if the query isn't an amount. is_range is False for a
+                   plain number, which is also searched as text.
+        """
+        match = cls._AMOUNT_SEARCH.match(query)
+        if not match or (match.group('op') and match.group('high')):
+            return None
+        low = cls._to_cents(match.group('low').replace('$', '').replace(',', ''))
+        op, high = match.group('op'), match.group('high')
+        if high:
+            high = cls._to_cents(high.replace('$', '').replace(',', ''))
+            return min(low, high), max(low, high), True
+        if op == '>':
+            return low + 1, None, True
+        if op == '>=':
+            return low, None, True
+        if op == '<':
+            return None, low - 1, True
+        if op == '<=':
+            return None, low, True
+        return low, low, False
+
+    @staticmethod
+    def _ledger_text_search_clause(user_id, text, amount_cents=None):
+        """
+        SQL condition (on transactions t) matching transactions whose lines
+        contain `text` in a description or account name, case insensitively,
+        or (if amount_cents is given) whose amount is exactly that.
+
+        Three or more characters are looked up in the ledger_search trigram
+        index, restricted to the user's rows by their owner token, and the
+        matching rowids drive the query. Shorter strings can't be (a trigram
+        needs three characters), so they fall back to LIKE over the user's lines.
+
+        Returns:
+            tuple: (sql, params, indexed) - indexed is True for the FTS lookup
+        """
+        if len(text) >= 3:
+            # Quote as an FTS phrase so operators in the text are matched literally
+            phrase = '"' + text.replace('"', '""') + '"'
+            sql = "SELECT rowid FROM ledger_search WHERE ledger_search MATCH ?"
+            params = [f'owner:"<{int(user_id)}>" AND {{descriptions accounts}}:{phrase}']
+            if amount_cents is not None:
+                sql += " UNION ALL SELECT rowid FROM transactions WHERE user_id = ? AND amount_cents = ?"
+                params += [user_id, amount_cents]
+            return f"t.rowid IN ({sql})", params, True
+
+        term = f"%{text}%"
+        sql = (
+            "EXISTS (SELECT 1 FROM financial_ledger f"
+            " WHERE f.user_id = t.user_id AND f.transaction_uuid = t.transaction_uuid"
+            " AND (f.description LIKE ? OR f.account LIKE ?))"
+        )
+        params = [term, term]
+        if amount_cents is not None:
+            sql = f"({sql} OR t.amount_cents = ?)"
+            params.append(amount_cents)
+        return sql, params, False
+
+    def get_ledger_entries(self, user_id, transaction_limit=20, transaction_offset=0, account_filter=None, start_date=None, end_date=None, show_reversals=True, search_query=None, category_id=None, page_cursor=None, min_amount=None, max_amount=None):
+        """
+        Get ledger entries for a user, optionally filtered to a specific account and/or date range.
+
+        Args:
+            user_id: The user ID
+            transaction_limit: Maximum number of transactions to return
+            transaction_offset: Number of transactions to skip (for pagination)
+            account_filter: Optional account name to filter by. If provided, only shows
+                          transactions that involve this account.
+            start_date: Optional start date (YYYY-MM-DD format) for date range filtering
+            end_date: Optional end date (YYYY-MM-DD format) for date range filtering
             show_reversals: Whether to include reversal transactions (default True)
-            search_query: Optional search string to filter by description or account
+            search_query: Optional search string to filter by description or account.
+                        A number also matches transactions of exactly that amount;
+                        "50..100", ">50", ">=50", "<50" and "<=50" match amount ranges.
             category_id: Optional category ID to filter by
+            page_cursor: Optional keyset cursor. When given (use '' for the first page),
+                       transaction_offset is ignored and the page starts right after the
+                       transaction the cursor points at.
+            min_amount: Optional lower bound (inclusive) on the transaction amount
+            max_amount: Optional upper bound (inclusive) on the transaction amount
 
         Returns:
-            List of ledger entries with running balance if filtered to one account
+            List of ledger entries with running balance if filtered to one account.
+            In cursor mode: {'entries': [...], 'next_cursor': str or None}
+
+        Raises:
+            ValueError: If page_cursor is not a cursor returned by this method
         """
+        keyset = self._decode_ledger_cursor(page_cursor) if page_cursor else None
+
         conn, cursor = self._get_db_connection()
         try:
             # Build date filter conditions
@@ -499,13 +1346,44 @@ class BusinessSimulator:
             # Build reversal filter condition
             reversal_filter = "" if show_reversals else " AND is_reversal = 0"
 
-            # Build search filter condition
+            user_filter = "t.user_id = ?"
+
+            # Build amount filter conditions (transaction amount = sum of its debits)
+            amount_bounds = [
+                None if min_amount in (None, '') else self._to_cents(min_amount),
+                None if max_amount in (None, '') else self._to_cents(max_amount),
+            ]
+
+            # Build search filter condition (matches any line of the transaction)
             search_filter = ""
             search_params = []
             if search_query and search_query.strip():
-                search_term = f"%{search_query.strip()}%"
-                search_filter = " AND (description LIKE ? OR account LIKE ? OR CAST(debit AS TEXT) LIKE ? OR CAST(credit AS TEXT) LIKE ?)"
-                search_params = [search_term, search_term, search_term, search_term]
+                search_text = search_query.strip()
+                amount_search = self._parse_amount_search(search_text)
+                if amount_search and amount_search[2]:
+                    # Range searches only narrow the amount bounds
+                    low, high = amount_search[0], amount_search[1]
+                    if low is not None:
+                        amount_bounds[0] = low if amount_bounds[0] is None else max(low, amount_bounds[0])
+                    if high is not None:
+                        amount_bounds[1] = high if amount_bounds[1] is None else min(high, amount_bounds[1])
+                else:
+                    text_clause, search_params, indexed = self._ledger_text_search_clause(
+                        user_id, search_text, amount_search[0] if amount_search else None)
+                    search_filter = " AND " + text_clause
+                    if indexed:
+                        # Seek the matching rowids and sort them rather than walk the
+                        # user's whole history in date order looking for matches
+                        user_filter = "+t.user_id = ?"
+
+            amount_filter = ""
+            amount_params = []
+            if amount_bounds[0] is not None:
+                amount_filter += " AND t.amount_cents >= ?"
+                amount_params.append(amount_bounds[0])
+            if amount_bounds[1] is not None:
+                amount_filter += " AND t.amount_cents <= ?"
+                amount_params.append(amount_bounds[1])
 
             # Build category filter condition
             category_filter = ""
@@ -514,121 +1392,164 @@ class BusinessSimulator:
                 category_filter = " AND category_id = ?"
                 category_params = [category_id]
 
+            # When filtering by account, keep transactions with a line on that account
+            account_clause = ""
+            account_params = []
             if account_filter:
-                # When filtering by account, get all entries for transactions involving that account
-                query = (
-                    "SELECT l.entry_id, l.transaction_uuid, l.transaction_date, l.description, l.account, l.debit, l.credit, "
-                    "l.category_id, c.name as category_name, c.color as category_color, l.is_business "
-                    "FROM financial_ledger l "
-                    "LEFT JOIN expense_categories c ON l.category_id = c.category_id "
-                    "JOIN ( "
-                    "    SELECT DISTINCT transaction_uuid, MAX(transaction_date) as max_date, MAX(entry_id) as max_id "
-                    "    FROM financial_ledger "
-                    "    WHERE user_id = ? AND description != 'Time Advanced' AND description != 'Initial Balance' " + date_filter + reversal_filter + search_filter + category_filter +
-                    "      AND transaction_uuid IN ( "
-                    "        SELECT transaction_uuid FROM financial_ledger WHERE user_id = ? AND account = ? " + date_filter + reversal_filter +
-                    "      ) "
-                    "    GROUP BY transaction_uuid "
-                    "    ORDER BY max_date DESC, max_id DESC "
-                    "    LIMIT ? OFFSET ? "
-                    ") AS recent_t "
-                    "ON l.transaction_uuid = recent_t.transaction_uuid "
-                    "WHERE l.user_id = ? ORDER BY l.transaction_date DESC, l.entry_id DESC"
+                account_clause = (
+                    " AND EXISTS (SELECT 1 FROM financial_ledger a"
+                    " WHERE a.user_id = t.user_id AND a.transaction_uuid = t.transaction_uuid AND a.account = ?)"
                 )
-                params = [user_id] + date_params + search_params + category_params + [user_id, account_filter] + date_params + [transaction_limit, transaction_offset, user_id]
-                cursor.execute(query, params)
-            else:
-                # Original query - no account filter
-                query = (
-                    "SELECT l.entry_id, l.transaction_uuid, l.transaction_date, l.description, l.account, l.debit, l.credit, "
-                    "l.category_id, c.name as category_name, c.color as category_color, l.is_business "
-                    "FROM financial_ledger l "
-                    "LEFT JOIN expense_categories c ON l.category_id = c.category_id "
-                    "JOIN ( "
-                    "    SELECT transaction_uuid, MAX(transaction_date) as max_date, MAX(entry_id) as max_id "
-                    "    FROM financial_ledger "
-                    "    WHERE user_id = ? AND description != 'Time Advanced' AND description != 'Initial Balance' " + date_filter + reversal_filter + search_filter + category_filter +
-                    "    GROUP BY transaction_uuid "
-                    "    ORDER BY max_date DESC, max_id DESC "
-                    "    LIMIT ? OFFSET ? "
-                    ") AS recent_t "
-                    "ON l.transaction_uuid = recent_t.transaction_uuid "
-                    "WHERE l.user_id = ? ORDER BY l.transaction_date DESC, l.entry_id DESC"
+                account_params = [account_filter]
+
+            # Keyset pagination seeks straight into idx_transactions_user_order;
+            # OFFSET stays as the fallback.
+            keyset_clause = ""
+            keyset_params = []
+            if keyset:
+                keyset_clause = " AND (transaction_date, last_entry_id) < (?, ?)"
+                keyset_params = list(keyset)
+                transaction_offset = 0
+
+            # When filtering by account, read each line's stored running balance with it
+            balance_select = ""
+            balance_join = ""
+            if account_filter:
+                balance_column = "balance_cents" if show_reversals else "non_reversal_balance_cents"
+                balance_select = f", rb.{balance_column} AS line_balance_cents"
+                balance_join = (
+                    "LEFT JOIN ledger_running_balances rb ON rb.user_id = l.user_id AND rb.account = l.account "
+                    "AND rb.transaction_date = l.transaction_date AND rb.entry_id = l.entry_id "
                 )
-                params = [user_id] + date_params + search_params + category_params + [transaction_limit, transaction_offset, user_id]
-                cursor.execute(query, params)
+
+            # Page through transaction headers, then fetch all lines of those transactions
+            query = (
+                "SELECT l.entry_id, l.transaction_uuid, l.transaction_date, l.description, l.account, l.debit, l.credit, "
+                "l.category_id, c.name as category_name, c.color as category_color, l.is_business, "
+                "recent_t.transaction_date AS page_max_date, recent_t.last_entry_id AS page_max_id"
+                + balance_select + " "
+                "FROM ( "
+                "    SELECT t.user_id, t.transaction_uuid, t.transaction_date, t.last_entry_id "
+                "    FROM transactions t "
+                "    WHERE " + user_filter + " AND description != 'Time Advanced' AND description != 'Initial Balance' "
+                + date_filter + reversal_filter + category_filter + keyset_clause + account_clause + search_filter
+                + amount_filter +
+                "    ORDER BY t.transaction_date DESC, t.last_entry_id DESC "
+                "    LIMIT ? OFFSET ? "
+                ") AS recent_t "
+                "JOIN financial_ledger l ON l.user_id = recent_t.user_id AND l.transaction_uuid = recent_t.transaction_uuid "
+                "LEFT JOIN expense_categories c ON l.category_id = c.category_id "
+                + balance_join +
+                "ORDER BY l.transaction_date DESC, l.entry_id DESC"
+            )
+            params = ([user_id] + date_params + category_params + keyset_params + account_params + search_params
+                      + amount_params + [transaction_limit, transaction_offset])
+            cursor.execute(query, params)
 
             entries = self._rows_to_dicts(cursor.fetchall())
 
-            # If filtering by account, calculate running balance
-            if account_filter and entries:
-                # Sort entries by date DESCENDING (newest first)
-                sorted_entries = sorted(entries, key=lambda x: (x['transaction_date'], x['entry_id']), reverse=True)
+            # Page positions of the returned transactions (used for the next cursor)
+            page_keys = set()
+            for entry in entries:
+                page_keys.add((entry.pop('page_max_date'), entry.pop('page_max_id')))
 
-                # Get the most recent transaction date shown
-                most_recent_date = sorted_entries[0]['transaction_date']
-                most_recent_entry_id = sorted_entries[0]['entry_id']
+            # If filtering by account, show each transaction with the account's balance
+            # after it: the stored balance of its last line on the account. Lines come
+            # newest first, so that is the first one seen for each transaction.
+            if account_filter:
+                transaction_balances = {}
+                for entry in entries:
+                    line_balance_cents = entry.pop('line_balance_cents')
+                    if entry['account'] == account_filter and entry['transaction_uuid'] not in transaction_balances:
+                        transaction_balances[entry['transaction_uuid']] = line_balance_cents
 
-                # Calculate balance UP TO the most recent transaction shown (not all time)
-                # This ensures the running balance matches what's visible in the ledger
-                # Exclude reversals from balance calculation if show_reversals is False
-                balance_reversal_filter = "" if show_reversals else " AND is_reversal = 0"
-                cursor.execute(
-                    "SELECT COALESCE(SUM(debit), 0) - COALESCE(SUM(credit), 0) as balance "
-                    "FROM financial_ledger "
-                    "WHERE user_id = ? AND account = ? " + balance_reversal_filter +
-                    " AND (transaction_date < ? OR (transaction_date = ? AND entry_id <= ?))",
-                    (user_id, account_filter, most_recent_date, most_recent_date, most_recent_entry_id)
-                )
-                current_balance = float(self._row_to_dict(cursor.fetchone())['balance'] or 0)
-
-                running_balance = current_balance
-                balance_map = {}  # Map entry_id to running balance
-
-                # Group entries by transaction to process them together
-                from collections import defaultdict
-                transactions = defaultdict(list)
-                for entry in sorted_entries:
-                    transactions[entry['transaction_uuid']].append(entry)
-
-                # Process transactions in reverse chronological order (newest to oldest)
-                for tx_uuid in sorted(transactions.keys(), key=lambda uuid: max(e['transaction_date'] for e in transactions[uuid]), reverse=True):
-                    tx_entries = transactions[tx_uuid]
-
-                    # Assign the CURRENT running balance to all entries in this transaction FIRST
-                    # (so all sides of the transaction show the same balance - the balance AFTER this transaction)
-                    for entry in tx_entries:
-                        balance_map[entry['entry_id']] = running_balance
-
-                    # Then update the running balance by reversing this transaction
-                    # (subtracting debits, adding back credits to go backwards in time)
-                    filtered_entry_found = False
-                    for entry in tx_entries:
-                        if entry['account'] == account_filter:
-                            filtered_entry_found = True
-                            debit_val = float(entry['debit']) if entry['debit'] else 0
-                            credit_val = float(entry['credit']) if entry['credit'] else 0
-                            if debit_val > 0:
-                                running_balance -= debit_val  # Reverse: subtract debits
-                            if credit_val > 0:
-                                running_balance += credit_val  # Reverse: add back credits
-                            break
-
-                    # Safety check: if no entry matched the filter, don't update running balance
-                    # This shouldn't happen based on the query, but prevents calculation errors
-                    if not filtered_entry_found:
-                        print(f"[WARNING] Transaction {tx_uuid} has no entry for account '{account_filter}'")
-
-
-                # Add running balance to each entry
                 for entry in entries:
-                    entry['running_balance'] = balance_map.get(entry['entry_id'])
+                    balance_cents = transaction_balances.get(entry['transaction_uuid'])
+                    entry['running_balance'] = None if balance_cents is None else float(self._from_cents(balance_cents))
+
+            if page_cursor is not None:
+                next_cursor = None
+                if len(page_keys) >= transaction_limit:
+                    next_cursor = self._encode_ledger_cursor(*min(page_keys))
+                return {'entries': entries, 'next_cursor': next_cursor}
 
             return entries
         finally:
             cursor.close()
             conn.close()
-    
+
+    LEDGER_EXPORT_COLUMNS = (
+        'entry_id', 'transaction_uuid', 'transaction_date', 'description', 'account',
+        'debit', 'credit', 'category_id', 'category_name', 'is_business', 'is_reversal',
+    )
+
+    def iter_ledger_export(self, user_id, account_filter=None, start_date=None, end_date=None,
+                           show_reversals=True, category_id=None, batch_size=500):
+        """
+        Stream every ledger line for a user, oldest first, for bulk export.
+
+        Takes the same filters as get_ledger_entries (a transaction is kept if
+        its header matches; account_filter keeps all lines of transactions that
+        touch the account) but has no page size. Rows are fetched batch_size at
+        a time from one open cursor, in index order, so memory use does not grow
+        with the size of the ledger.
+
+        Args:
+            user_id: The user ID
+            account_filter: Optional account name
+            start_date: Optional start date (inclusive, compared like get_ledger_entries)
+            end_date: Optional end date (inclusive)
+            show_reversals: Whether to include reversal transactions (default True)
+            category_id: Optional category ID
+            batch_size: Rows fetched per round trip
+
+        Yields:
+            dict: One ledger line with the LEDGER_EXPORT_COLUMNS keys
+        """
+        conditions = ["t.user_id = ?", "t.description != 'Time Advanced'", "t.description != 'Initial Balance'"]
+        params = [user_id]
+        if start_date:
+            conditions.append("t.transaction_date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("t.transaction_date <= ?")
+            params.append(end_date)
+        if not show_reversals:
+            conditions.append("t.is_reversal = 0")
+        if category_id is not None:
+            conditions.append("t.category_id = ?")
+            params.append(category_id)
+        if account_filter:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM financial_ledger a"
+                " WHERE a.user_id = t.user_id AND a.transaction_uuid = t.transaction_uuid AND a.account = ?)"
+            )
+            params.append(account_filter)
+
+        conn, cursor = self._get_db_connection()
+        try:
+            cursor.arraysize = batch_size
+            cursor.execute(f"""
+                SELECT l.entry_id, l.transaction_uuid, l.transaction_date, l.description, l.account,
+                       printf('%.2f', l.debit_cents / 100.0) AS debit,
+                       printf('%.2f', l.credit_cents / 100.0) AS credit,
+                       l.category_id, c.name AS category_name, l.is_business, l.is_reversal
+                FROM transactions t
+                JOIN financial_ledger l ON l.user_id = t.user_id AND l.transaction_uuid = t.transaction_uuid
+                LEFT JOIN expense_categories c ON l.category_id = c.category_id
+                WHERE {' AND '.join(conditions)}
+                ORDER BY t.transaction_date, t.last_entry_id, l.entry_id
+            """, params)
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+            conn.close()
+
     # =============================================================================
     # RECURRING EXPENSES METHODS
     # =============================================================================
@@ -688,23 +1609,45 @@ class BusinessSimulator:
             thirty_days_ago = current_date - datetime.timedelta(days=30)
             thirty_days_ago_str = self._to_datetime_str(thirty_days_ago)
 
-            base_query = """
-                SELECT DISTINCT description
-                FROM financial_ledger
-                WHERE user_id = ?
-                    AND description != ''
-                    AND is_reversal = 0
-                    AND transaction_date >= ?
-            """
+            account = 'Income' if transaction_type == 'income' else 'Expenses'
+            cursor.execute(
+                "SELECT description FROM ledger_descriptions "
+                "WHERE user_id = ? AND account = ? AND last_used >= ? ORDER BY description",
+                (user_id, account, thirty_days_ago_str)
+            )
+            return [row['description'] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
 
-            if transaction_type == 'income':
-                query = f"{base_query} AND account = 'Income' ORDER BY description"
-                cursor.execute(query, (user_id, thirty_days_ago_str))
-            else:
-                query = f"{base_query} AND account = 'Expenses' ORDER BY description"
-                cursor.execute(query, (user_id, thirty_days_ago_str))
+    def get_description_stats(self, user_id):
+        """
+        Get every expense and income description the user has posted, with usage.
+
+        Feeds the in-memory autocomplete dictionary (description_index.py).
 
-            return [row['description'] for row in self._rows_to_dicts(cursor.fetchall())]
+        Returns:
+            list: Dicts with account ('Expenses' or 'Income'), description,
+                  use_count, last_used, category_id and amount (of the last use)
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            cursor.execute(
+                "SELECT account, description, use_count, last_used, category_id, amount_cents "
+                "FROM ledger_descriptions WHERE user_id = ?",
+                (user_id,)
+            )
+            return [
+                {
+                    'account': row['account'],
+                    'description': row['description'],
+                    'use_count': row['use_count'],
+                    'last_used': row['last_used'],
+                    'category_id': row['category_id'],
+                    'amount': float(self._from_cents(row['amount_cents'])),
+                }
+                for row in cursor.fetchall()
+            ]
         finally:
             cursor.close()
             conn.close()
@@ -755,6 +1698,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def add_expense_category(self, user_id, name, color='#6366f1'):
         """Add a new expense category."""
         conn, cursor = self._get_db_connection()
@@ -774,6 +1718,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def update_expense_category(self, user_id, category_id, name, color, is_monthly=False, parent_id=None):
         """Update an expense category."""
         conn, cursor = self._get_db_connection()
@@ -804,7 +1749,7 @@ class BusinessSimulator:
         conn, cursor = self._get_db_connection()
         try:
             cursor.execute(
-                "SELECT COUNT(DISTINCT transaction_uuid) FROM financial_ledger WHERE user_id = ? AND category_id = ?",
+                "SELECT COUNT(*) FROM transactions WHERE user_id = ? AND category_id = ?",
                 (user_id, category_id)
             )
             count = cursor.fetchone()[0]
@@ -813,6 +1758,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def delete_expense_category(self, user_id, category_id):
         """Delete an expense category (reassign to default first)."""
         conn, cursor = self._get_db_connection()
@@ -834,10 +1780,20 @@ class BusinessSimulator:
             default_category_id = self.get_default_category_id(user_id)
 
             # Reassign all transactions to default category
+            affected_days = self._get_transaction_days(cursor, user_id, "category_id = ?", (category_id,))
             cursor.execute(
                 "UPDATE financial_ledger SET category_id = ? WHERE user_id = ? AND category_id = ?",
                 (default_category_id, user_id, category_id)
             )
+            self._refresh_daily_rollups(cursor, user_id, affected_days)
+            cursor.execute(
+                "UPDATE transactions SET category_id = ? WHERE user_id = ? AND category_id = ?",
+                (default_category_id, user_id, category_id)
+            )
+            cursor.execute(
+                "UPDATE ledger_descriptions SET category_id = ? WHERE user_id = ? AND category_id = ?",
+                (default_category_id, user_id, category_id)
+            )
 
             # Delete the category
             cursor.execute(
@@ -860,6 +1816,7 @@ class BusinessSimulator:
         # Return empty list for now to prevent crashes
         return []
 
+    @writes_user_data
     def add_income_category(self, user_id, name, color='#10b981', parent_id=None, description=None):
         """Add a new income category."""
         conn, cursor = self._get_db_connection()
@@ -879,6 +1836,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def update_income_category(self, user_id, category_id, name, color, parent_id=None, description=None):
         """Update an income category."""
         conn, cursor = self._get_db_connection()
@@ -904,6 +1862,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def delete_income_category(self, user_id, category_id):
         """Delete an income category."""
         conn, cursor = self._get_db_connection()
@@ -952,6 +1911,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def add_parent_category(self, name, cat_type, display_order=None):
         """Add a new parent category."""
         conn, cursor = self._get_db_connection()
@@ -977,6 +1937,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def update_parent_category(self, parent_id, name, cat_type, display_order=None):
         """Update a parent category."""
         conn, cursor = self._get_db_connection()
@@ -1000,6 +1961,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def delete_parent_category(self, parent_id):
         """Delete a parent category (only if no children)."""
         conn, cursor = self._get_db_connection()
@@ -1047,13 +2009,14 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def update_transaction_category(self, user_id, transaction_uuid, category_id):
         """Update the category for an expense transaction."""
         conn, cursor = self._get_db_connection()
         try:
             # Verify the transaction belongs to the user and is an expense (has debit entry)
             cursor.execute(
-                "SELECT entry_id FROM financial_ledger WHERE user_id = ? AND transaction_uuid = ? AND debit > 0 LIMIT 1",
+                "SELECT entry_id FROM financial_ledger WHERE user_id = ? AND transaction_uuid = ? AND debit_cents > 0 LIMIT 1",
                 (user_id, transaction_uuid)
             )
             result = self._row_to_dict(cursor.fetchone())
@@ -1063,9 +2026,20 @@ class BusinessSimulator:
 
             # Update the category for all expense entries with this transaction_uuid
             cursor.execute(
-                "UPDATE financial_ledger SET category_id = ? WHERE user_id = ? AND transaction_uuid = ? AND debit > 0",
+                "UPDATE financial_ledger SET category_id = ? WHERE user_id = ? AND transaction_uuid = ? AND debit_cents > 0",
                 (category_id, user_id, transaction_uuid)
             )
+            self._refresh_daily_rollups(cursor, user_id, self._get_transaction_days(
+                cursor, user_id, "transaction_uuid = ?", (transaction_uuid,)))
+            cursor.execute(
+                "UPDATE transactions SET category_id = ? WHERE user_id = ? AND transaction_uuid = ?",
+                (category_id, user_id, transaction_uuid)
+            )
+            cursor.execute(
+                "SELECT account, description FROM financial_ledger WHERE user_id = ? AND transaction_uuid = ?",
+                (user_id, transaction_uuid)
+            )
+            self._refresh_ledger_descriptions(cursor, user_id, [tuple(row) for row in cursor.fetchall()])
 
             conn.commit()
             return True, "Category updated successfully."
@@ -1076,13 +2050,14 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def update_transaction_business(self, user_id, transaction_uuid, is_business):
         """Update the business flag for an expense or income transaction."""
         conn, cursor = self._get_db_connection()
         try:
             # Verify the transaction belongs to the user
             cursor.execute(
-                "SELECT entry_id FROM financial_ledger WHERE user_id = ? AND transaction_uuid = ? LIMIT 1",
+                "SELECT transaction_uuid FROM transactions WHERE user_id = ? AND transaction_uuid = ?",
                 (user_id, transaction_uuid)
             )
             result = self._row_to_dict(cursor.fetchone())
@@ -1095,6 +2070,12 @@ class BusinessSimulator:
                 "UPDATE financial_ledger SET is_business = ? WHERE user_id = ? AND transaction_uuid = ?",
                 (1 if is_business else 0, user_id, transaction_uuid)
             )
+            self._refresh_daily_rollups(cursor, user_id, self._get_transaction_days(
+                cursor, user_id, "transaction_uuid = ?", (transaction_uuid,)))
+            cursor.execute(
+                "UPDATE transactions SET is_business = ? WHERE user_id = ? AND transaction_uuid = ?",
+                (1 if is_business else 0, user_id, transaction_uuid)
+            )
 
             conn.commit()
             return True, "Business flag updated successfully."
@@ -1125,15 +2106,15 @@ class BusinessSimulator:
                     c.name,
                     c.color,
                     p.name as parent_name,
-                    SUM(l.debit) as total_amount,
-                    COUNT(DISTINCT l.transaction_uuid) as transaction_count
-                FROM financial_ledger l
+                    SUM(l.debit_cents) / 100.0 as total_amount,
+                    SUM(l.line_count) as transaction_count
+                FROM ledger_daily_rollups l
                 LEFT JOIN expense_categories c ON l.category_id = c.category_id
                 LEFT JOIN parent_categories p ON c.parent_id = p.parent_id
                 WHERE l.user_id = ?
                     AND l.account = 'Expenses'
-                    AND l.transaction_date BETWEEN ? AND ?
-                    AND l.category_id IS NOT NULL
+                    AND l.transaction_date BETWEEN DATE(?) AND DATE(?)
+                    AND l.category_id != 0
                     AND l.is_reversal = 0
                 GROUP BY c.category_id, c.name, c.color, p.name
                 ORDER BY total_amount DESC
@@ -1190,19 +2171,19 @@ class BusinessSimulator:
 
             query = """
                 SELECT
-                    DATE(l.transaction_date) as date,
+                    l.transaction_date as date,
                     c.category_id,
                     c.name as category_name,
                     c.color as category_color,
-                    SUM(l.debit) as amount
-                FROM financial_ledger l
+                    SUM(l.debit_cents) / 100.0 as amount
+                FROM ledger_daily_rollups l
                 LEFT JOIN expense_categories c ON l.category_id = c.category_id
                 WHERE l.user_id = ?
                     AND l.account = 'Expenses'
-                    AND l.transaction_date BETWEEN ? AND ?
-                    AND l.category_id IS NOT NULL
+                    AND l.transaction_date BETWEEN DATE(?) AND DATE(?)
+                    AND l.category_id != 0
                     AND l.is_reversal = 0
-                GROUP BY DATE(l.transaction_date), c.category_id, c.name, c.color
+                GROUP BY l.transaction_date, c.category_id, c.name, c.color
                 ORDER BY date, c.name
             """
             cursor.execute(query, (user_id, start_date, end_date))
@@ -1220,11 +2201,12 @@ class BusinessSimulator:
 
             query = """
                 SELECT
-                    SUM(CASE WHEN account = 'Income' THEN credit ELSE 0 END) AS total_income,
-                    SUM(CASE WHEN account = 'Expenses' THEN debit ELSE 0 END) AS total_expenses
-                FROM financial_ledger
-                WHERE user_id = ? AND DATE(transaction_date) = ?
+                    SUM(CASE WHEN account = 'Income' THEN credit_cents ELSE 0 END) / 100.0 AS total_income,
+                    SUM(CASE WHEN account = 'Expenses' THEN debit_cents ELSE 0 END) / 100.0 AS total_expenses
+                FROM ledger_daily_rollups
+                WHERE user_id = ? AND transaction_date = DATE(?)
             """
+            # One day's rollup rows: a seek on ledger_daily_rollups' (user_id, transaction_date, ...) primary key
             cursor.execute(query, (user_id, for_date))
             result = self._row_to_dict(cursor.fetchone())
             total_income = float(result['total_income'] or 0)
@@ -1251,16 +2233,15 @@ class BusinessSimulator:
 
             query = """
                 SELECT
-                    DATE(transaction_date) as day,
-                    SUM(CASE WHEN account = 'Income' THEN credit ELSE 0 END) AS total_income,
-                    SUM(CASE WHEN account = 'Expenses' THEN debit ELSE 0 END) AS total_expenses
-                FROM financial_ledger
+                    transaction_date as day,
+                    SUM(CASE WHEN account = 'Income' THEN credit_cents ELSE 0 END) / 100.0 AS total_income,
+                    SUM(CASE WHEN account = 'Expenses' THEN debit_cents ELSE 0 END) / 100.0 AS total_expenses
+                FROM ledger_daily_rollups
                 WHERE user_id = ?
-                    AND DATE(transaction_date) BETWEEN ? AND ?
+                    AND transaction_date BETWEEN DATE(?) AND DATE(?)
                     AND is_reversal = 0
-                    AND description != 'Time Advanced'
-                    AND description != 'Initial Balance'
-                GROUP BY DATE(transaction_date)
+                    AND is_system = 0
+                GROUP BY transaction_date
             """
             cursor.execute(query, (user_id, start_date_str, current_date_str_for_query))
             results = self._rows_to_dicts(cursor.fetchall())
@@ -1306,6 +2287,7 @@ class BusinessSimulator:
 
     # --- ACTION METHODS ---
 
+    @writes_user_data
     def setup_initial_accounts(self, user_id, accounts):
         conn, cursor = self._get_db_connection()
         try:
@@ -1337,6 +2319,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def add_single_account(self, user_id, name, acc_type, balance, credit_limit=None):
         conn, cursor = self._get_db_connection()
         try:
@@ -1359,19 +2342,22 @@ class BusinessSimulator:
             conn.close()
 
     def _create_initial_balance_entry(self, cursor, user_id, uuid, transaction_date, account_name, balance):
-        fin_query = "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description, debit, credit) VALUES (?, ?, ?, ?, ?, ?, ?)"
-
         # Convert Decimal to float for SQLite compatibility
         balance_float = float(balance) if isinstance(balance, Decimal) else balance
 
+        line = {'transaction_uuid': uuid, 'transaction_date': transaction_date, 'description': 'Initial Balance'}
         if balance >= 0:
             # Asset: Debit the asset account, Credit Equity
-            cursor.execute(fin_query, (user_id, uuid, transaction_date, account_name, 'Initial Balance', balance_float, 0))
-            cursor.execute(fin_query, (user_id, uuid, transaction_date, 'Equity', 'Initial Balance', 0, balance_float))
+            self._post_ledger_entries(cursor, user_id, [
+                {**line, 'account': account_name, 'debit': balance_float, 'credit': 0},
+                {**line, 'account': 'Equity', 'debit': 0, 'credit': balance_float},
+            ], transaction_type='OPENING_BALANCE')
         else:
             # Liability: Debit Equity, Credit the liability account
-            cursor.execute(fin_query, (user_id, uuid, transaction_date, 'Equity', 'Initial Balance', abs(balance_float), 0))
-            cursor.execute(fin_query, (user_id, uuid, transaction_date, account_name, 'Initial Balance', 0, abs(balance_float)))
+            self._post_ledger_entries(cursor, user_id, [
+                {**line, 'account': 'Equity', 'debit': abs(balance_float), 'credit': 0},
+                {**line, 'account': account_name, 'debit': 0, 'credit': abs(balance_float)},
+            ], transaction_type='OPENING_BALANCE')
 
         # Update the balance of the single Equity account
         cursor.execute(
@@ -1380,6 +2366,7 @@ class BusinessSimulator:
         )
 
 
+    @writes_user_data
     def update_account_name(self, user_id, account_id, new_name):
         conn, cursor = self._get_db_connection()
         try:
@@ -1391,6 +2378,17 @@ class BusinessSimulator:
 
             cursor.execute("UPDATE accounts SET name = ? WHERE account_id = ?", (new_name, account_id))
             cursor.execute("UPDATE financial_ledger SET account = ? WHERE user_id = ? AND account = ?", (new_name, user_id, old_name))
+            self._refresh_daily_rollups(cursor, user_id, self._get_transaction_days(
+                cursor, user_id, "account = ?", (new_name,)))
+            self._refresh_ledger_search(cursor, user_id, self._get_transaction_uuids(
+                cursor, user_id, "account = ?", (new_name,)))
+            cursor.execute("DELETE FROM ledger_running_balances WHERE user_id = ? AND account = ?", (user_id, old_name))
+            self._refresh_running_balances(cursor, user_id, new_name)
+
+            # Move the materialised balance to the new name
+            old_balance_cents = self._to_cents(self._get_account_balance(cursor, user_id, old_name))
+            cursor.execute("DELETE FROM account_balances WHERE user_id = ? AND account = ?", (user_id, old_name))
+            self._apply_balance_deltas(cursor, user_id, {new_name: old_balance_cents})
 
             conn.commit()
             return True, f"Account '{old_name}' has been renamed to '{new_name}'."
@@ -1401,6 +2399,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def delete_account(self, user_id, account_id):
         conn, cursor = self._get_db_connection()
         try:
@@ -1437,6 +2436,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def revalue_asset(self, user_id, account_id, new_value, description="Asset Revaluation"):
         conn, cursor = self._get_db_connection()
         try:
@@ -1465,26 +2465,19 @@ class BusinessSimulator:
             current_date = self._get_user_current_date(cursor, user_id)
             uuid = f"revalue-{user_id}-{int(time.time())}"
 
+            line = {'transaction_uuid': uuid, 'transaction_date': current_date, 'description': description}
             if difference > 0:
                 # Asset increased in value: Debit Asset, Credit Unrealized Gain (Equity)
-                cursor.execute(
-                    "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description, debit, credit) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (user_id, uuid, current_date, account_name, description, abs(difference), 0)
-                )
-                cursor.execute(
-                    "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description, debit, credit) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (user_id, uuid, current_date, 'Unrealized Gain', description, 0, abs(difference))
-                )
+                self._post_ledger_entries(cursor, user_id, [
+                    {**line, 'account': account_name, 'debit': abs(difference), 'credit': 0},
+                    {**line, 'account': 'Unrealized Gain', 'debit': 0, 'credit': abs(difference)},
+                ], transaction_type='REVALUATION')
             else:
                 # Asset decreased in value: Credit Asset, Debit Unrealized Loss (Equity)
-                cursor.execute(
-                    "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description, debit, credit) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (user_id, uuid, current_date, 'Unrealized Loss', description, abs(difference), 0)
-                )
-                cursor.execute(
-                    "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description, debit, credit) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (user_id, uuid, current_date, account_name, description, 0, abs(difference))
-                )
+                self._post_ledger_entries(cursor, user_id, [
+                    {**line, 'account': 'Unrealized Loss', 'debit': abs(difference), 'credit': 0},
+                    {**line, 'account': account_name, 'debit': 0, 'credit': abs(difference)},
+                ], transaction_type='REVALUATION')
 
             # Update account balance
             cursor.execute(
@@ -1502,49 +2495,55 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def reverse_transaction(self, user_id, transaction_uuid):
         conn, cursor = self._get_db_connection()
         try:
-            # Get all entries for this transaction
+            # Check the transaction header first (ownership and reversal state)
             cursor.execute(
-                "SELECT * FROM financial_ledger WHERE user_id = ? AND transaction_uuid = ? ORDER BY entry_id",
+                "SELECT description, is_reversal FROM transactions WHERE user_id = ? AND transaction_uuid = ?",
                 (user_id, transaction_uuid)
             )
-            entries = self._rows_to_dicts(cursor.fetchall())
+            header = self._row_to_dict(cursor.fetchone())
 
-            if not entries:
+            if not header:
                 return False, "Transaction not found or you do not have permission to reverse it."
 
-            # Check if already reversed using the new is_reversal field
-            if entries[0]['is_reversal']:
+            # Check if already reversed using the is_reversal flag
+            if header['is_reversal']:
                 return False, "This transaction has already been reversed or is itself a reversal."
 
+            # Get all entries for this transaction
+            cursor.execute(
+                "SELECT * FROM financial_ledger WHERE user_id = ? AND transaction_uuid = ? ORDER BY entry_id",
+                (user_id, transaction_uuid)
+            )
+            entries = self._rows_to_dicts(cursor.fetchall())
+
             # Create reversal entries (swap debits and credits)
             # Use the original transaction's date for the reversal
             original_transaction_date = entries[0]['transaction_date']
             reversal_uuid = f"reversal-{user_id}-{int(time.time())}"
-            original_description = entries[0]['description']
+            original_description = header['description']
 
+            reversal_entries = []
             for entry in entries:
                 # Convert debit/credit to float to avoid Decimal issues
                 new_debit = float(entry['credit']) if entry['credit'] else 0
                 new_credit = float(entry['debit']) if entry['debit'] else 0
 
-                cursor.execute(
-                    "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id, is_reversal, reversal_of_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        user_id,
-                        reversal_uuid,
-                        original_transaction_date,  # Use original transaction's date
-                        entry['account'],
-                        f"REVERSAL OF: {entry['description']}",
-                        new_debit,  # Swap: old credit becomes new debit
-                        new_credit,   # Swap: old debit becomes new credit
-                        entry['category_id'],  # Preserve category for analytics
-                        True,             # Mark as reversal
-                        entry['entry_id'] # Link to original entry
-                    )
-                )
+                reversal_entries.append({
+                    'transaction_uuid': reversal_uuid,
+                    'transaction_date': original_transaction_date,  # Use original transaction's date
+                    'account': entry['account'],
+                    'description': f"REVERSAL OF: {entry['description']}",
+                    'debit': new_debit,    # Swap: old credit becomes new debit
+                    'credit': new_credit,  # Swap: old debit becomes new credit
+                    'category_id': entry['category_id'],  # Preserve category for analytics
+                    'is_reversal': True,                  # Mark as reversal
+                    'reversal_of_id': entry['entry_id'],  # Link to original entry
+                })
+            self._post_ledger_entries(cursor, user_id, reversal_entries, transaction_type='REVERSAL')
 
             # Mark the original transaction as reversed
             for entry in entries:
@@ -1552,10 +2551,22 @@ class BusinessSimulator:
                     "UPDATE financial_ledger SET description = ?, is_reversal = ? WHERE entry_id = ? AND user_id = ?",
                     (f"REVERSED: {entry['description']}", True, entry['entry_id'], user_id)
                 )
+            cursor.execute(
+                "UPDATE transactions SET description = ?, is_reversal = 1 WHERE user_id = ? AND transaction_uuid = ?",
+                (f"REVERSED: {original_description}", user_id, transaction_uuid)
+            )
+            self._refresh_daily_rollups(cursor, user_id, {entry['transaction_date'] for entry in entries})
+            self._refresh_ledger_search(cursor, user_id, [transaction_uuid])
+            self._refresh_ledger_descriptions(cursor, user_id, [(entry['account'], entry['description']) for entry in entries])
+
+            # The original's lines left the non-reversal balances from their date on
+            first_date = min(entry['transaction_date'] for entry in entries)
+            for account in {entry['account'] for entry in entries}:
+                self._refresh_running_balances(cursor, user_id, account, first_date)
 
             # Note: We don't manually update account balances here because the reversal
-            # ledger entries (with swapped debits/credits) automatically reverse the effect
-            # when the balance is calculated from the ledger.
+            # ledger entries (with swapped debits/credits) already reversed the effect
+            # in account_balances via _post_ledger_entries.
             # Manual updates would double-count the reversal.
 
             conn.commit()
@@ -1567,25 +2578,24 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def sync_account_balances(self, user_id):
         """Recalculate all account balances from ledger entries to fix any discrepancies"""
         conn, cursor = self._get_db_connection()
         try:
+            # Rebuild the materialised balances from the ledger in one pass
+            self._rebuild_account_balances(cursor, user_id)
+
             # Get all user accounts
             cursor.execute("SELECT account_id, name FROM accounts WHERE user_id = ?", (user_id,))
             accounts = self._rows_to_dicts(cursor.fetchall())
 
+            balances = self._get_account_balances(cursor, user_id)
+
             updated = []
             for account in accounts:
                 account_name = account['name']
-
-                # Calculate balance from ledger
-                cursor.execute(
-                    "SELECT COALESCE(SUM(debit), 0) - COALESCE(SUM(credit), 0) as ledger_balance "
-                    "FROM financial_ledger WHERE user_id = ? AND account = ?",
-                    (user_id, account_name)
-                )
-                ledger_balance = float(self._row_to_dict(cursor.fetchone())['ledger_balance'] or 0)
+                ledger_balance = balances.get(account_name, 0) / 100
 
                 # Update account balance
                 cursor.execute(
@@ -1603,6 +2613,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def log_income(self, user_id, account_id, description, amount, transaction_date=None, category_id=None, is_business=False, cursor=None):
         conn = None
         if not cursor:
@@ -1634,11 +2645,14 @@ class BusinessSimulator:
             uuid = f"income-{user_id}-{int(time.time())}-{time.time()}"
             is_biz = 1 if is_business else 0
 
-            fin_query = "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id, is_business) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
-            cursor.execute(fin_query, (user_id, uuid, current_date, account['name'], description, amount, 0, category_id, is_biz))
-            cursor.execute(fin_query, (user_id, uuid, current_date, 'Income', description, 0, amount, category_id, is_biz))
+            line = {'transaction_uuid': uuid, 'transaction_date': current_date, 'description': description,
+                    'category_id': category_id, 'is_business': is_biz}
+            self._post_ledger_entries(cursor, user_id, [
+                {**line, 'account': account['name'], 'debit': amount, 'credit': 0},
+                {**line, 'account': 'Income', 'debit': 0, 'credit': amount},
+            ], transaction_type='INCOME')
 
-            # Balance is now calculated from ledger - no manual update needed
+            # Balance is maintained in account_balances - no manual update needed
             if conn: conn.commit()
             return True, f"Successfully logged income to '{account['name']}'."
 
@@ -1651,6 +2665,7 @@ class BusinessSimulator:
                 if conn: conn.close()
 
 
+    @writes_user_data
     def add_recurring_expense(self, user_id, description, amount, payment_account_id, due_day_of_month, category_id=None, frequency='MONTHLY', is_variable=False, estimated_amount=None):
         """
         Add a new recurring expense with optional category and frequency.
@@ -1728,6 +2743,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
     
+    @writes_user_data
     def delete_recurring_expense(self, user_id, expense_id):
         conn, cursor = self._get_db_connection()
         try:
@@ -1771,6 +2787,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def add_recurring_income(self, user_id, name, amount, destination_account_id, frequency='MONTHLY', due_day_of_month=1, description=None, category_id=None, is_variable=False, estimated_amount=None):
         """Add a new recurring income entry."""
         conn, cursor = self._get_db_connection()
@@ -1803,6 +2820,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def delete_recurring_income(self, user_id, income_id):
         """Delete a recurring income entry."""
         conn, cursor = self._get_db_connection()
@@ -1820,6 +2838,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def update_recurring_income(self, user_id, income_id, description, amount, deposit_day_of_month, frequency='MONTHLY', category_id=None, is_variable=False, estimated_amount=None):
         """Update a recurring income entry."""
         valid_frequencies = ('DAILY', 'WEEKLY', 'BI_WEEKLY', 'MONTHLY', 'QUARTERLY', 'YEARLY')
@@ -1862,6 +2881,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def update_recurring_expense(self, user_id, expense_id, description, amount, due_day_of_month, category_id=None, frequency='MONTHLY', is_variable=False, estimated_amount=None):
         valid_frequencies = ('DAILY', 'WEEKLY', 'BI_WEEKLY', 'MONTHLY', 'QUARTERLY', 'YEARLY')
         if frequency not in valid_frequencies:
@@ -1916,6 +2936,7 @@ class BusinessSimulator:
             conn.close()
 
 
+    @writes_user_data
     def transfer_between_accounts(self, user_id, from_account_id, to_account_id, amount, description="Account Transfer", transaction_date=None):
         """Transfer money between two accounts."""
         conn, cursor = self._get_db_connection()
@@ -1937,13 +2958,8 @@ class BusinessSimulator:
             from_account = next((acc for acc in accounts if acc['account_id'] == from_account_id), None)
             to_account = next((acc for acc in accounts if acc['account_id'] == to_account_id), None)
 
-            # Calculate actual balance from ledger (not the cached balance)
-            cursor.execute(
-                "SELECT COALESCE(SUM(debit), 0) - COALESCE(SUM(credit), 0) as balance "
-                "FROM financial_ledger WHERE user_id = ? AND account = ?",
-                (user_id, from_account['name'])
-            )
-            from_balance = float(self._row_to_dict(cursor.fetchone())['balance'] or 0)
+            # Actual ledger balance (account_balances, not accounts.balance)
+            from_balance = self._get_account_balance(cursor, user_id, from_account['name'])
 
             # Check if from_account has sufficient balance
             # LINE_OF_CREDIT and CREDIT_CARD can draw against a credit limit
@@ -1970,11 +2986,13 @@ class BusinessSimulator:
             uuid = f"transfer-{user_id}-{int(time.time())}-{time.time()}"
 
             # Record the transfer in the ledger (debit to_account, credit from_account)
-            fin_query = "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description, debit, credit) VALUES (?, ?, ?, ?, ?, ?, ?)"
-            cursor.execute(fin_query, (user_id, uuid, current_date, to_account['name'], description, amount, 0))
-            cursor.execute(fin_query, (user_id, uuid, current_date, from_account['name'], description, 0, amount))
+            line = {'transaction_uuid': uuid, 'transaction_date': current_date, 'description': description}
+            self._post_ledger_entries(cursor, user_id, [
+                {**line, 'account': to_account['name'], 'debit': amount, 'credit': 0},
+                {**line, 'account': from_account['name'], 'debit': 0, 'credit': amount},
+            ], transaction_type='TRANSFER')
 
-            # Balance is now calculated from ledger - no manual update needed
+            # Balance is maintained in account_balances - no manual update needed
 
             conn.commit()
             return True, f"Successfully transferred {amount} from '{from_account['name']}' to '{to_account['name']}'."
@@ -1986,6 +3004,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def log_expense(self, user_id, account_id, description, amount, transaction_date=None, category_id=None, is_business=False, cursor=None):
         conn = None
         if not cursor:
@@ -1998,13 +3017,8 @@ class BusinessSimulator:
             account = self._row_to_dict(cursor.fetchone())
             if not account: return False, "Invalid account specified."
 
-            # Calculate actual balance from ledger (not the cached balance)
-            cursor.execute(
-                "SELECT COALESCE(SUM(debit), 0) - COALESCE(SUM(credit), 0) as balance "
-                "FROM financial_ledger WHERE user_id = ? AND account = ?",
-                (user_id, account['name'])
-            )
-            balance = float(self._row_to_dict(cursor.fetchone())['balance'] or 0)
+            # Actual ledger balance (account_balances, not accounts.balance)
+            balance = self._get_account_balance(cursor, user_id, account['name'])
 
             # LINE_OF_CREDIT and CREDIT_CARD can draw against a credit limit
             if account['type'] in ('CREDIT_CARD', 'LINE_OF_CREDIT'):
@@ -2034,11 +3048,14 @@ class BusinessSimulator:
             uuid = f"expense-{user_id}-{int(time.time())}-{time.time()}"
             is_biz = 1 if is_business else 0
 
-            fin_query = "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id, is_business) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
-            cursor.execute(fin_query, (user_id, uuid, current_date, 'Expenses', description, amount, 0, category_id, is_biz))
-            cursor.execute(fin_query, (user_id, uuid, current_date, account['name'], description, 0, amount, None, is_biz))
+            line = {'transaction_uuid': uuid, 'transaction_date': current_date, 'description': description,
+                    'is_business': is_biz}
+            self._post_ledger_entries(cursor, user_id, [
+                {**line, 'account': 'Expenses', 'debit': amount, 'credit': 0, 'category_id': category_id},
+                {**line, 'account': account['name'], 'debit': 0, 'credit': amount},
+            ], transaction_type='EXPENSE')
 
-            # Balance is now calculated from ledger - no manual update needed
+            # Balance is maintained in account_balances - no manual update needed
 
             if conn: # Only commit if this function owns the connection
                 conn.commit()
@@ -2091,6 +3108,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def approve_pending_transaction(self, user_id, pending_id, actual_amount):
         """
         Approve a pending transaction and process the payment.
@@ -2157,20 +3175,14 @@ class BusinessSimulator:
                              (pending['related_account_id'],))
                 card_account = self._row_to_dict(cursor.fetchone())
 
-                # DR Interest Expense
-                cursor.execute("""
-                    INSERT INTO financial_ledger
-                    (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id)
-                    VALUES (?, ?, ?, 'Interest Expense', ?, ?, 0, NULL)
-                """, (user_id, txn_uuid, pending['due_date'], pending['description'], actual_amount))
-
-                # CR Credit Card (increases debt)
-                cursor.execute("""
-                    INSERT INTO financial_ledger
-                    (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id)
-                    VALUES (?, ?, ?, ?, ?, 0, ?, NULL)
-                """, (user_id, txn_uuid, pending['due_date'], card_account['name'],
-                     pending['description'], actual_amount))
+                line = {'transaction_uuid': txn_uuid, 'transaction_date': pending['due_date'],
+                        'description': pending['description']}
+                self._post_ledger_entries(cursor, user_id, [
+                    # DR Interest Expense
+                    {**line, 'account': 'Interest Expense', 'debit': actual_amount, 'credit': 0},
+                    # CR Credit Card (increases debt)
+                    {**line, 'account': card_account['name'], 'debit': 0, 'credit': actual_amount},
+                ], transaction_type='INTEREST')
 
                 # Update account balance
                 cursor.execute("""
@@ -2204,6 +3216,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def reject_pending_transaction(self, user_id, pending_id):
         """
         Reject/dismiss a pending transaction without processing it.
@@ -2239,6 +3252,7 @@ class BusinessSimulator:
     # LOAN PAYMENT METHODS (Principal vs Interest Split)
     # =============================================================================
 
+    @writes_user_data
     def make_loan_payment(self, user_id, loan_id, interest_amount, principal_amount, payment_account_id,
                           payment_date=None, escrow_amount=None, other_amounts=None):
         """
@@ -2311,41 +3325,29 @@ class BusinessSimulator:
             # Create ledger entries - each component gets its own UUID for independent ledger display
             # 1. Interest Expense transaction (DR Expenses, CR Payment Account)
             if interest_amount > 0:
-                interest_uuid = str(uuid4())
-                # DR Interest Expense
-                cursor.execute("""
-                    INSERT INTO financial_ledger
-                    (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id)
-                    VALUES (?, ?, ?, 'Expenses', ?, ?, 0, ?)
-                """, (user_id, interest_uuid, payment_date, f"{loan_account['name']} - Interest",
-                      interest_amount, interest_category_id))
-                # CR Payment Account
-                cursor.execute("""
-                    INSERT INTO financial_ledger
-                    (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id)
-                    VALUES (?, ?, ?, ?, ?, 0, ?, NULL)
-                """, (user_id, interest_uuid, payment_date, payment_acct['name'],
-                      f"{loan_account['name']} - Interest", interest_amount))
+                line = {'transaction_uuid': str(uuid4()), 'transaction_date': payment_date,
+                        'description': f"{loan_account['name']} - Interest"}
+                self._post_ledger_entries(cursor, user_id, [
+                    # DR Interest Expense
+                    {**line, 'account': 'Expenses', 'debit': interest_amount, 'credit': 0,
+                     'category_id': interest_category_id},
+                    # CR Payment Account
+                    {**line, 'account': payment_acct['name'], 'debit': 0, 'credit': interest_amount},
+                ], transaction_type='LOAN_PAYMENT')
 
             # 2. Principal Payment transaction (DR Loan Account, CR Payment Account)
             if principal_amount > 0:
-                principal_uuid = str(uuid4())
-                # DR Loan/Credit Card (reduces liability)
-                cursor.execute("""
-                    INSERT INTO financial_ledger
-                    (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id)
-                    VALUES (?, ?, ?, ?, 'Payment - Principal', ?, 0, NULL)
-                """, (user_id, principal_uuid, payment_date, loan_account['name'], principal_amount))
-                # CR Payment Account
-                cursor.execute("""
-                    INSERT INTO financial_ledger
-                    (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id)
-                    VALUES (?, ?, ?, ?, 'Payment - Principal', 0, ?, NULL)
-                """, (user_id, principal_uuid, payment_date, payment_acct['name'], principal_amount))
+                line = {'transaction_uuid': str(uuid4()), 'transaction_date': payment_date,
+                        'description': 'Payment - Principal'}
+                self._post_ledger_entries(cursor, user_id, [
+                    # DR Loan/Credit Card (reduces liability)
+                    {**line, 'account': loan_account['name'], 'debit': principal_amount, 'credit': 0},
+                    # CR Payment Account
+                    {**line, 'account': payment_acct['name'], 'debit': 0, 'credit': principal_amount},
+                ], transaction_type='LOAN_PAYMENT')
 
             # 3. Escrow transaction (DR Expenses, CR Payment Account)
             if escrow_amount > 0:
-                escrow_uuid = str(uuid4())
                 # Get or create Escrow/Housing category
                 cursor.execute("""
                     SELECT category_id FROM expense_categories
@@ -2361,20 +3363,15 @@ class BusinessSimulator:
                 else:
                     escrow_category_id = escrow_cat['category_id']
 
-                # DR Escrow Expense
-                cursor.execute("""
-                    INSERT INTO financial_ledger
-                    (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id)
-                    VALUES (?, ?, ?, 'Expenses', ?, ?, 0, ?)
-                """, (user_id, escrow_uuid, payment_date, f"{loan_account['name']} - Escrow",
-                      escrow_amount, escrow_category_id))
-                # CR Payment Account
-                cursor.execute("""
-                    INSERT INTO financial_ledger
-                    (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id)
-                    VALUES (?, ?, ?, ?, ?, 0, ?, NULL)
-                """, (user_id, escrow_uuid, payment_date, payment_acct['name'],
-                      f"{loan_account['name']} - Escrow", escrow_amount))
+                line = {'transaction_uuid': str(uuid4()), 'transaction_date': payment_date,
+                        'description': f"{loan_account['name']} - Escrow"}
+                self._post_ledger_entries(cursor, user_id, [
+                    # DR Escrow Expense
+                    {**line, 'account': 'Expenses', 'debit': escrow_amount, 'credit': 0,
+                     'category_id': escrow_category_id},
+                    # CR Payment Account
+                    {**line, 'account': payment_acct['name'], 'debit': 0, 'credit': escrow_amount},
+                ], transaction_type='LOAN_PAYMENT')
 
             # 4. Other amounts (fees, etc.) - each gets its own transaction
             if other_amounts:
@@ -2396,31 +3393,20 @@ class BusinessSimulator:
                 for item in other_amounts:
                     amount = float(item['amount'])
                     if amount > 0:
-                        fee_uuid = str(uuid4())
-                        # DR Fee Expense
-                        cursor.execute("""
-                            INSERT INTO financial_ledger
-                            (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id)
-                            VALUES (?, ?, ?, 'Expenses', ?, ?, 0, ?)
-                        """, (user_id, fee_uuid, payment_date, f"{loan_account['name']} - {item['label']}",
-                              amount, fees_category_id))
-                        # CR Payment Account
-                        cursor.execute("""
-                            INSERT INTO financial_ledger
-                            (user_id, transaction_uuid, transaction_date, account, description, debit, credit, category_id)
-                            VALUES (?, ?, ?, ?, ?, 0, ?, NULL)
-                        """, (user_id, fee_uuid, payment_date, payment_acct['name'],
-                              f"{loan_account['name']} - {item['label']}", amount))
-
-            # Balance is now calculated from ledger - no manual update needed
-
-            # Fetch new loan balance (calculated from ledger)
-            cursor.execute(
-                "SELECT COALESCE(SUM(debit), 0) - COALESCE(SUM(credit), 0) as ledger_balance "
-                "FROM financial_ledger WHERE user_id = ? AND account = ?",
-                (user_id, loan_account['name'])
-            )
-            new_balance = abs(float(self._row_to_dict(cursor.fetchone())['ledger_balance'] or 0))
+                        line = {'transaction_uuid': str(uuid4()), 'transaction_date': payment_date,
+                                'description': f"{loan_account['name']} - {item['label']}"}
+                        self._post_ledger_entries(cursor, user_id, [
+                            # DR Fee Expense
+                            {**line, 'account': 'Expenses', 'debit': amount, 'credit': 0,
+                             'category_id': fees_category_id},
+                            # CR Payment Account
+                            {**line, 'account': payment_acct['name'], 'debit': 0, 'credit': amount},
+                        ], transaction_type='LOAN_PAYMENT')
+
+            # Balance is maintained in account_balances - no manual update needed
+
+            # Fetch new loan balance
+            new_balance = abs(self._get_account_balance(cursor, user_id, loan_account['name']))
 
             conn.commit()
 
@@ -2479,6 +3465,7 @@ class BusinessSimulator:
     # CREDIT CARD INTEREST METHODS
     # =============================================================================
 
+    @writes_user_data
     def calculate_credit_card_interest(self, user_id, card_account_id):
         """
         Calculate pending credit card interest (creates pending transaction for approval).
@@ -2554,305 +3541,499 @@ class BusinessSimulator:
     # TIME SIMULATION METHODS
     # =============================================================================
 
-    def advance_time(self, user_id, days_to_advance=1):
+    @staticmethod
+    def _to_schedule_date(value):
+        """Normalise a date, datetime or stored date string to a date (None if unparseable)."""
+        if not value:
+            return None
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        if isinstance(value, datetime.date):
+            return value
+        try:
+            return datetime.datetime.strptime(str(value).split(' ')[0], '%Y-%m-%d').date()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _next_due_date(frequency, due_day, last_processed, after, until):
+        """
+        Return the first day in (after, until] on which a recurring item is due.
+
+        Mirrors the day-by-day rules advance_time has always applied:
+        - DAILY: any day after last_processed
+        - WEEKLY / BI_WEEKLY: on weekday (due_day - 1) % 7 (0=Mon), at least
+          7 / 14 days after last_processed
+        - MONTHLY: on due_day (clamped to the month's length) in a later
+          month than last_processed
+        - QUARTERLY: as MONTHLY, but at least 3 months after last_processed
+        - YEARLY: as MONTHLY, but in a later year and not an earlier month
+          than last_processed (due every month until first processed)
+
+        Args:
+            frequency (str): DAILY, WEEKLY, BI_WEEKLY, MONTHLY, QUARTERLY or YEARLY
+            due_day (int): due_day_of_month (day of week 1-7 for weekly items)
+            last_processed (date): Last day the item was processed, or None
+            after (date): Exclusive lower bound
+            until (date): Inclusive upper bound
+
+        Returns:
+            date: Next due day, or None if nothing is due by `until`
+        """
         import calendar
-        conn, cursor = self._get_db_connection()
+        first = after + datetime.timedelta(days=1)
+
+        if frequency == 'DAILY':
+            if last_processed and last_processed >= first:
+                first = last_processed + datetime.timedelta(days=1)
+            return first if first <= until else None
+
+        if frequency in ('WEEKLY', 'BI_WEEKLY'):
+            gap = 7 if frequency == 'WEEKLY' else 14
+            if last_processed:
+                first = max(first, last_processed + datetime.timedelta(days=gap))
+            due_weekday = (due_day - 1) % 7
+            candidate = first + datetime.timedelta(days=(due_weekday - first.weekday()) % 7)
+            return candidate if candidate <= until else None
+
+        if frequency not in ('MONTHLY', 'QUARTERLY', 'YEARLY'):
+            return None
+
+        year, month = first.year, first.month
+        if last_processed and frequency == 'QUARTERLY':
+            # Skip straight to the first month 3 months after last_processed
+            earliest = last_processed.year * 12 + last_processed.month - 1 + 3
+            if earliest > year * 12 + month - 1:
+                year, month = divmod(earliest, 12)
+                month += 1
+
+        while (year, month) <= (until.year, until.month):
+            effective_due_day = min(due_day, calendar.monthrange(year, month)[1])
+            if effective_due_day < 1:
+                return None
+            candidate = datetime.date(year, month, effective_due_day)
+
+            if not last_processed:
+                eligible = True
+            elif frequency == 'MONTHLY':
+                eligible = (year, month) > (last_processed.year, last_processed.month)
+            elif frequency == 'QUARTERLY':
+                eligible = (year - last_processed.year) * 12 + (month - last_processed.month) >= 3
+            else:
+                eligible = year > last_processed.year and month >= last_processed.month
+
+            if eligible and first <= candidate:
+                return candidate if candidate <= until else None
+
+            if frequency == 'YEARLY' and last_processed and year <= last_processed.year:
+                # Nothing qualifies until last_processed's month next year
+                year, month = last_processed.year + 1, last_processed.month
+                continue
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        return None
+
+    def _start_posting_batch(self, cursor, user_id):
+        """
+        Pre-load what recurring postings need so advance_time can validate them
+        in memory instead of querying per payment.
+
+        Returns:
+            dict: accounts by id, balances by account name (cents), the default
+            category and the queued ledger/pending/last_processed writes
+        """
+        cursor.execute("SELECT * FROM accounts WHERE user_id = ?", (user_id,))
+        accounts = {row['account_id']: row for row in self._rows_to_dicts(cursor.fetchall())}
+
+        cursor.execute(
+            "SELECT category_id FROM expense_categories WHERE user_id = ? AND is_default = 1 LIMIT 1",
+            (user_id,)
+        )
+        default_category = self._row_to_dict(cursor.fetchone())
+
+        stamp = time.time()
+        return {
+            'user_id': user_id,
+            'accounts': accounts,
+            'balances': self._get_account_balances(cursor, user_id),
+            'default_category_id': default_category['category_id'] if default_category else None,
+            'uuid_stamp': f"{int(stamp)}-{stamp}",
+            'sequence': 0,
+            'entries': [],
+            'pending': [],
+            'expense_updates': {},
+            'income_updates': {},
+        }
+
+    def _queue_batch_transaction(self, batch, prefix, transaction_type, lines):
+        """Queue one balanced transaction and apply it to the in-memory balances."""
+        batch['sequence'] += 1
+        uuid = f"{prefix}-{batch['user_id']}-{batch['uuid_stamp']}-{batch['sequence']}"
+        balances = batch['balances']
+        for line in lines:
+            line['transaction_uuid'] = uuid
+            line['transaction_type'] = transaction_type
+            if 'debit_cents' not in line:
+                line['debit_cents'] = self._to_cents(line['debit'])
+                line['credit_cents'] = self._to_cents(line['credit'])
+            balances[line['account']] = balances.get(line['account'], 0) + line['debit_cents'] - line['credit_cents']
+            batch['entries'].append(line)
+
+    def _flush_posting_batch(self, cursor, batch):
+        """Write every queued ledger line, pending approval and last_processed_date in bulk."""
+        user_id = batch['user_id']
+        if batch['entries']:
+            self._post_ledger_entries(cursor, user_id, batch['entries'])
+        if batch['pending']:
+            cursor.executemany("""
+                INSERT INTO pending_transactions
+                (user_id, recurring_expense_id, recurring_income_id, description, estimated_amount,
+                 due_date, payment_account_id, category_id, status, transaction_type)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'PENDING', ?)
+            """, batch['pending'])
+        if batch['expense_updates']:
+            cursor.executemany(
+                "UPDATE recurring_expenses SET last_processed_date = ? WHERE expense_id = ?",
+                [(day, expense_id) for expense_id, day in batch['expense_updates'].items()]
+            )
+        if batch['income_updates']:
+            cursor.executemany(
+                "UPDATE recurring_income SET last_processed_date = ? WHERE income_id = ?",
+                [(day, income_id) for income_id, day in batch['income_updates'].items()]
+            )
+        batch['entries'], batch['pending'] = [], []
+        batch['expense_updates'], batch['income_updates'] = {}, {}
+
+    @staticmethod
+    def _check_batch_expense(batch, account, amount):
+        """
+        Apply log_expense's checks to a payment against the batch's in-memory balances.
+
+        Returns:
+            str: The message log_expense would fail with, or None if the payment is allowed
+        """
+        if amount <= 0:
+            return "Expense amount must be positive."
+        if not account:
+            return "Invalid account specified."
+        balance = batch['balances'].get(account['name'], 0) / 100
+        # LINE_OF_CREDIT and CREDIT_CARD can draw against a credit limit
+        if account['type'] in ('CREDIT_CARD', 'LINE_OF_CREDIT'):
+            credit_limit = float(account['credit_limit']) if account['credit_limit'] is not None else None
+            if credit_limit is not None and (balance - amount) < -credit_limit:
+                return "Transaction declined. Exceeds credit limit."
+        elif balance < amount:
+            return "Insufficient funds."
+        return None
+
+    def _process_recurring_expense(self, batch, expense, current_day, processing_log):
+        """
+        Queue payment (or approval) of one recurring expense on current_day.
+
+        Applies the same checks as log_expense against the batch's in-memory
+        balances.
+
+        Returns:
+            bool: True if last_processed_date was moved to current_day
+        """
+        current_day_str = self._to_datetime_str(current_day)
+
+        # Check if this is a variable expense
+        if expense.get('is_variable'):
+            # CREATE PENDING TRANSACTION instead of auto-paying
+            batch['pending'].append((
+                batch['user_id'],
+                expense['expense_id'],
+                None,
+                expense['description'],
+                expense.get('estimated_amount') or expense['amount'],
+                current_day_str,
+                expense['payment_account_id'],
+                expense.get('category_id'),
+                'EXPENSE'
+            ))
+
+            # Update last_processed_date so it doesn't create duplicate pending transactions
+            batch['expense_updates'][expense['expense_id']] = current_day_str
+            expense['last_processed_date'] = current_day_str
+            processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: {expense['description']} requires approval (variable expense)")
+            return True
+
+        # AUTO-PAY
         try:
-            simulation_start_date = self._get_user_current_date(cursor, user_id)
-            processing_log = []
+            amount = float(expense['amount'])
+            account = batch['accounts'].get(expense['payment_account_id'])
+            message = self._check_batch_expense(batch, account, amount)
+        except Exception as e:
+            message = f"An error occurred: {e}"
+
+        if message:
+            processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: FAILED to pay {expense['description']} - {message}")
+            return False
+
+        category_id = expense.get('category_id')
+        if category_id is None:
+            category_id = batch['default_category_id']
+        line = {'transaction_date': current_day_str, 'description': expense['description'], 'is_business': 0}
+        self._queue_batch_transaction(batch, 'expense', 'EXPENSE', [
+            {**line, 'account': 'Expenses', 'debit': amount, 'credit': 0, 'category_id': category_id},
+            {**line, 'account': account['name'], 'debit': 0, 'credit': amount},
+        ])
+
+        batch['expense_updates'][expense['expense_id']] = current_day_str
+        # Update the in-memory record to prevent re-payment in the same run
+        expense['last_processed_date'] = current_day_str
+        processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: Paid {expense['description']} (${expense['amount']}).")
+        return True
+
+    def _process_recurring_income(self, batch, income, current_day, processing_log):
+        """
+        Queue deposit (or approval) of one recurring income on current_day.
+
+        Returns:
+            bool: True if last_processed_date was moved to current_day
+        """
+        current_day_str = self._to_datetime_str(current_day)
+
+        # Check if this is a variable income
+        if income.get('is_variable'):
+            # CREATE PENDING TRANSACTION instead of auto-depositing
+            batch['pending'].append((
+                batch['user_id'],
+                None,
+                income['income_id'],
+                income['description'],
+                income.get('estimated_amount') or income['amount'],
+                current_day_str,
+                income['destination_account_id'],
+                None,
+                'INCOME'
+            ))
+
+            # Update last_processed_date so it doesn't create duplicate pending transactions
+            batch['income_updates'][income['income_id']] = current_day_str
+            income['last_processed_date'] = current_day_str
+            processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: {income['description']} requires approval (variable income)")
+            return True
+
+        # AUTO-DEPOSIT
+        try:
+            amount = float(income['amount'])
+            account = batch['accounts'].get(income['destination_account_id'])
+            if amount <= 0:
+                message = "Income amount must be positive."
+            elif not account:
+                message = "Invalid account specified."
+            else:
+                message = None
+        except Exception as e:
+            message = f"An error occurred: {e}"
+
+        if message:
+            processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: FAILED to deposit {income['description']} - {message}")
+            return False
+
+        line = {'transaction_date': current_day_str, 'description': income['description'],
+                'category_id': None, 'is_business': 0}
+        self._queue_batch_transaction(batch, 'income', 'INCOME', [
+            {**line, 'account': account['name'], 'debit': amount, 'credit': 0},
+            {**line, 'account': 'Income', 'debit': 0, 'credit': amount},
+        ])
+
+        batch['income_updates'][income['income_id']] = current_day_str
+        income['last_processed_date'] = current_day_str
+        processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: Deposited {income['description']} (${income['amount']}).")
+        return True
+
+    def _advance_range(self, cursor, user_id, after_date, final_date, processing_log, mark_time=True):
+        """
+        Post every recurring expense and income due in (after_date, final_date]
+        on the caller's cursor, without committing.
+
+        Instead of checking every item on every day, each item's next due date
+        is computed from its frequency and the items are popped from a priority
+        queue in (day, expenses-before-income, list order) order - the same order
+        the original day-by-day loop posted them in.
+
+        Args:
+            cursor: Cursor of the caller's transaction
+            user_id (int): The ID of the user
+            after_date (date): Last day already processed (exclusive)
+            final_date (date): Last day to process (inclusive)
+            processing_log (list): Appended with what was paid, deposited or queued
+            mark_time (bool): Post the 'Time Advanced' marker at final_date if
+                the ledger ends before it
+        """
+        # Fetch recurring expenses and income ONCE before scheduling
+        cursor.execute("SELECT * FROM recurring_expenses WHERE user_id = ?", (user_id,))
+        recurring_expenses = self._rows_to_dicts(cursor.fetchall())
+
+        cursor.execute("SELECT * FROM recurring_income WHERE user_id = ?", (user_id,))
+        recurring_income = self._rows_to_dicts(cursor.fetchall())
 
-            # Fetch recurring expenses and income ONCE before the loop
-            cursor.execute("SELECT * FROM recurring_expenses WHERE user_id = ?", (user_id,))
-            recurring_expenses = self._rows_to_dicts(cursor.fetchall())
-
-            cursor.execute("SELECT * FROM recurring_income WHERE user_id = ?", (user_id,))
-            recurring_income = self._rows_to_dicts(cursor.fetchall())
-
-            for i in range(days_to_advance):
-                current_day = simulation_start_date + datetime.timedelta(days=i + 1)
-                days_in_month = calendar.monthrange(current_day.year, current_day.month)[1]
-
-                for expense in recurring_expenses:
-                    frequency = expense.get('frequency', 'MONTHLY')
-                    is_due_for_payment = False
-                    last_processed = expense.get('last_processed_date')
-
-                    # Ensure last_processed is a date object (not datetime)
-                    if last_processed and isinstance(last_processed, datetime.datetime):
-                        last_processed = last_processed.date()
-                    elif last_processed and isinstance(last_processed, str):
-                        try:
-                            last_processed = datetime.datetime.strptime(last_processed.split(' ')[0], '%Y-%m-%d').date()
-                        except ValueError:
-                            last_processed = None
-
-                    # Determine if payment is due based on frequency
-                    if frequency == 'DAILY':
-                        # Due every day
-                        if not last_processed or current_day > last_processed:
-                            is_due_for_payment = True
-
-                    elif frequency == 'WEEKLY':
-                        # Due every 7 days from due_day_of_month (treated as day of week: 1=Mon, 7=Sun)
-                        due_weekday = (expense['due_day_of_month'] - 1) % 7  # Convert to Python weekday (0=Mon)
-                        if current_day.weekday() == due_weekday:
-                            if not last_processed or (current_day - last_processed).days >= 7:
-                                is_due_for_payment = True
-
-                    elif frequency == 'BI_WEEKLY':
-                        # Due every 14 days from due_day_of_month (treated as day of week)
-                        due_weekday = (expense['due_day_of_month'] - 1) % 7
-                        if current_day.weekday() == due_weekday:
-                            if not last_processed or (current_day - last_processed).days >= 14:
-                                is_due_for_payment = True
-
-                    elif frequency == 'MONTHLY':
-                        # Handle bills due on days that don't exist in current month
-                        effective_due_day = min(expense['due_day_of_month'], days_in_month)
-                        if current_day.day == effective_due_day:
-                            if not last_processed:
-                                is_due_for_payment = True
-                            elif (current_day.year, current_day.month) > (last_processed.year, last_processed.month):
-                                is_due_for_payment = True
-
-                    elif frequency == 'QUARTERLY':
-                        # Due every 3 months on due_day_of_month
-                        effective_due_day = min(expense['due_day_of_month'], days_in_month)
-                        if current_day.day == effective_due_day:
-                            if not last_processed:
-                                is_due_for_payment = True
-                            else:
-                                months_diff = (current_day.year - last_processed.year) * 12 + (current_day.month - last_processed.month)
-                                if months_diff >= 3:
-                                    is_due_for_payment = True
-
-                    elif frequency == 'YEARLY':
-                        # Due once a year on due_day_of_month in the same month as first payment
-                        effective_due_day = min(expense['due_day_of_month'], days_in_month)
-                        if current_day.day == effective_due_day:
-                            if not last_processed:
-                                is_due_for_payment = True
-                            elif current_day.year > last_processed.year and current_day.month >= last_processed.month:
-                                is_due_for_payment = True
-
-                    if is_due_for_payment:
-                            # Check if this is a variable expense
-                            if expense.get('is_variable'):
-                                # CREATE PENDING TRANSACTION instead of auto-paying
-                                cursor.execute("""
-                                    INSERT INTO pending_transactions
-                                    (user_id, recurring_expense_id, description, estimated_amount,
-                                     due_date, payment_account_id, category_id, status, transaction_type)
-                                    VALUES (?, ?, ?, ?, ?, ?, ?, 'PENDING', 'EXPENSE')
-                                """, (
-                                    user_id,
-                                    expense['expense_id'],
-                                    expense['description'],
-                                    expense.get('estimated_amount') or expense['amount'],
-                                    self._to_datetime_str(current_day),
-                                    expense['payment_account_id'],
-                                    expense.get('category_id')
-                                ))
-
-                                # Update last_processed_date so it doesn't create duplicate pending transactions
-                                current_day_str = self._to_datetime_str(current_day)
-                                cursor.execute(
-                                    "UPDATE recurring_expenses SET last_processed_date = ? WHERE expense_id = ?",
-                                    (current_day_str, expense['expense_id'])
-                                )
-                                expense['last_processed_date'] = current_day_str
-                                processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: {expense['description']} requires approval (variable expense)")
-                            else:
-                                # AUTO-PAY as before (existing code)
-                                success, message = self.log_expense(
-                                    user_id,
-                                    expense['payment_account_id'],
-                                    expense['description'],
-                                    expense['amount'],
-                                    transaction_date=current_day,
-                                    category_id=expense.get('category_id'),  # Pass category from recurring expense
-                                    cursor=cursor # Pass the existing cursor
-                                )
-
-                                if success:
-                                    current_day_str = self._to_datetime_str(current_day)
-                                    cursor.execute(
-                                        "UPDATE recurring_expenses SET last_processed_date = ? WHERE expense_id = ?",
-                                        (current_day_str, expense['expense_id'])
-                                    )
-                                    # Update the in-memory record to prevent re-payment in the same run
-                                    expense['last_processed_date'] = current_day_str
-                                    processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: Paid {expense['description']} (${expense['amount']}).")
-                                else:
-                                    processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: FAILED to pay {expense['description']} - {message}")
-
-                # Process recurring income
-                for income in recurring_income:
-                    frequency = income.get('frequency', 'MONTHLY')
-                    is_due_for_deposit = False
-                    last_processed = income.get('last_processed_date')
-
-                    # Ensure last_processed is a date object
-                    if last_processed and isinstance(last_processed, datetime.datetime):
-                        last_processed = last_processed.date()
-                    elif last_processed and isinstance(last_processed, str):
-                        try:
-                            last_processed = datetime.datetime.strptime(last_processed.split(' ')[0], '%Y-%m-%d').date()
-                        except ValueError:
-                            last_processed = None
-
-                    due_day = income.get('deposit_day_of_month') or income.get('due_day_of_month', 1)
-
-                    # Determine if income is due based on frequency
-                    if frequency == 'DAILY':
-                        if not last_processed or current_day > last_processed:
-                            is_due_for_deposit = True
-
-                    elif frequency == 'WEEKLY':
-                        due_weekday = (due_day - 1) % 7
-                        if current_day.weekday() == due_weekday:
-                            if not last_processed or (current_day - last_processed).days >= 7:
-                                is_due_for_deposit = True
-
-                    elif frequency == 'BI_WEEKLY':
-                        due_weekday = (due_day - 1) % 7
-                        if current_day.weekday() == due_weekday:
-                            if not last_processed or (current_day - last_processed).days >= 14:
-                                is_due_for_deposit = True
-
-                    elif frequency == 'MONTHLY':
-                        effective_due_day = min(due_day, days_in_month)
-                        if current_day.day == effective_due_day:
-                            if not last_processed:
-                                is_due_for_deposit = True
-                            elif (current_day.year, current_day.month) > (last_processed.year, last_processed.month):
-                                is_due_for_deposit = True
-
-                    elif frequency == 'QUARTERLY':
-                        effective_due_day = min(due_day, days_in_month)
-                        if current_day.day == effective_due_day:
-                            if not last_processed:
-                                is_due_for_deposit = True
-                            else:
-                                months_diff = (current_day.year - last_processed.year) * 12 + (current_day.month - last_processed.month)
-                                if months_diff >= 3:
-                                    is_due_for_deposit = True
-
-                    elif frequency == 'YEARLY':
-                        effective_due_day = min(due_day, days_in_month)
-                        if current_day.day == effective_due_day:
-                            if not last_processed:
-                                is_due_for_deposit = True
-                            elif current_day.year > last_processed.year and current_day.month >= last_processed.month:
-                                is_due_for_deposit = True
-
-                    if is_due_for_deposit:
-                            # Check if this is a variable income
-                            if income.get('is_variable'):
-                                # CREATE PENDING TRANSACTION instead of auto-depositing
-                                cursor.execute("""
-                                    INSERT INTO pending_transactions
-                                    (user_id, recurring_income_id, description, estimated_amount,
-                                     due_date, payment_account_id, status, transaction_type)
-                                    VALUES (?, ?, ?, ?, ?, ?, 'PENDING', 'INCOME')
-                                """, (
-                                    user_id,
-                                    income['income_id'],
-                                    income['description'],
-                                    income.get('estimated_amount') or income['amount'],
-                                    self._to_datetime_str(current_day),
-                                    income['deposit_account_id']
-                                ))
-
-                                # Update last_processed_date so it doesn't create duplicate pending transactions
-                                current_day_str = self._to_datetime_str(current_day)
-                                cursor.execute(
-                                    "UPDATE recurring_income SET last_processed_date = ? WHERE income_id = ?",
-                                    (current_day_str, income['income_id'])
-                                )
-                                income['last_processed_date'] = current_day_str
-                                processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: {income['description']} requires approval (variable income)")
-                            else:
-                                # AUTO-DEPOSIT as before
-                                success, message = self.log_income(
-                                    user_id,
-                                    income['deposit_account_id'],
-                                    income['description'],
-                                    income['amount'],
-                                    transaction_date=current_day,
-                                    cursor=cursor
-                                )
-
-                                if success:
-                                    current_day_str = self._to_datetime_str(current_day)
-                                    cursor.execute(
-                                        "UPDATE recurring_income SET last_processed_date = ? WHERE income_id = ?",
-                                        (current_day_str, income['income_id'])
-                                    )
-                                    income['last_processed_date'] = current_day_str
-                                    processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: Deposited {income['description']} (${income['amount']}).")
-                                else:
-                                    processing_log.append(f"On {current_day.strftime('%Y-%m-%d')}: FAILED to deposit {income['description']} - {message}")
+        # Accounts, balances and the default category are loaded once; postings
+        # are validated in memory and written in bulk below
+        batch = self._start_posting_batch(cursor, user_id)
+
+        # (kind, items, processor); kind orders expenses before income on the same day
+        schedules = (
+            (0, recurring_expenses, self._process_recurring_expense),
+            (1, recurring_income, self._process_recurring_income),
+        )
 
+        due_events = []
+        last_processed = {}
+        for kind, items, _ in schedules:
+            for index, item in enumerate(items):
+                last = self._to_schedule_date(item.get('last_processed_date'))
+                last_processed[(kind, index)] = last
+                due = self._next_due_date(item.get('frequency'), item['due_day_of_month'],
+                                          last, after_date, final_date)
+                if due:
+                    due_events.append((due, kind, index))
+        heapq.heapify(due_events)
+
+        while due_events:
+            current_day, kind, index = heapq.heappop(due_events)
+            _, items, process = schedules[kind]
+            item = items[index]
+
+            if process(batch, item, current_day, processing_log):
+                last_processed[(kind, index)] = current_day
+
+            due = self._next_due_date(item.get('frequency'), item['due_day_of_month'],
+                                      last_processed[(kind, index)], current_day, final_date)
+            if due:
+                heapq.heappush(due_events, (due, kind, index))
+
+        self._flush_posting_batch(cursor, batch)
+
+        if not mark_time:
+            return
+
+        # Check if we need to insert a time marker using the existing cursor
+        cursor.execute(
+            "SELECT transaction_date FROM financial_ledger WHERE user_id = ? ORDER BY transaction_date DESC, entry_id DESC LIMIT 1",
+            (user_id,)
+        )
+        last_entry = self._row_to_dict(cursor.fetchone())
+        last_transaction_date = self._to_schedule_date(last_entry['transaction_date']) if last_entry else None
+
+        if not last_transaction_date or last_transaction_date < final_date:
+            uuid = f"time-adv-{user_id}-{int(time.time())}"
+            self._post_ledger_entries(cursor, user_id, [{
+                'transaction_uuid': uuid,
+                'transaction_date': final_date,
+                'account': 'System',
+                'description': 'Time Advanced',
+            }], transaction_type='SYSTEM')
+
+    def _advance_in_one_transaction(self, user_id, days_to_advance):
+        """advance_time for a run of at most one chunk: post and commit in a single transaction."""
+        conn, cursor = self._get_db_connection()
+        try:
+            simulation_start_date = self._to_schedule_date(self._get_user_current_date(cursor, user_id))
             final_date = simulation_start_date + datetime.timedelta(days=days_to_advance)
-            # Check if we need to insert a time marker using the existing cursor
-            cursor.execute(
-                "SELECT transaction_date FROM financial_ledger WHERE user_id = ? ORDER BY transaction_date DESC, entry_id DESC LIMIT 1",
-                (user_id,)
-            )
-            last_entry = self._row_to_dict(cursor.fetchone())
+            processing_log = []
 
-            # Convert last transaction_date to date for comparison (it's a datetime in DB)
-            last_transaction_date = None
-            if last_entry and last_entry['transaction_date']:
-                if isinstance(last_entry['transaction_date'], datetime.datetime):
-                    last_transaction_date = last_entry['transaction_date'].date()
-                else:
-                    last_transaction_date = last_entry['transaction_date']
+            self._advance_range(cursor, user_id, simulation_start_date, final_date, processing_log)
 
-            if not last_transaction_date or last_transaction_date < final_date:
-                uuid = f"time-adv-{user_id}-{int(time.time())}"
-                cursor.execute(
-                    "INSERT INTO financial_ledger (user_id, transaction_uuid, transaction_date, account, description) VALUES (?, ?, ?, 'System', 'Time Advanced')",
-                    (user_id, uuid, final_date)
-                )
-            
             if not processing_log and days_to_advance > 0:
                 processing_log.append(f"Time advanced to {final_date.strftime('%Y-%m-%d')}. No bills were due.")
 
             conn.commit()
+            ADVANCE_TIME_RUNS.inc(result='ok')
+            ADVANCE_TIME_DAYS.inc(max(0, days_to_advance))
             return {'log': processing_log}
         except Exception as e:
             conn.rollback()
+            ADVANCE_TIME_RUNS.inc(result='error')
             return {'log': [f"An error occurred during time advance: {e}"]}
         finally:
             cursor.close()
             conn.close()
 
-    def auto_advance_time(self, user_id, client_date=None):
+    @writes_user_data
+    def advance_time(self, user_id, days_to_advance=1, chunk_days=None):
         """
-        Automatically advance time to today's date if the user's last transaction
-        is in the past. This is called on login to keep the simulation current.
+        Advance the simulation, posting every recurring expense and income that
+        falls due on the way (see _advance_range).
+
+        Runs longer than chunk_days are an advance job (see ADVANCE JOBS)
+        processed on this thread: every chunk_days days the postings commit
+        together with the job's checkpoint, so the write lock is released
+        between chunks and an error only rolls back the chunk it happened in.
+        Calling again after an error resumes from the checkpoint instead of
+        repeating committed chunks. Shorter runs commit once, as before.
 
         Args:
             user_id (int): The ID of the user
-            client_date (str, optional): Client's current date in YYYY-MM-DD format.
-                                         Used to handle timezone differences between
-                                         client and server.
+            days_to_advance (int): Number of days to move forward
+            chunk_days (int, optional): Days per commit (default ADVANCE_CHUNK_DAYS)
 
         Returns:
-            dict: Result with log messages from the advance
+            dict: {'log': [str]} describing what was paid, deposited or queued
         """
-        conn, cursor = self._get_db_connection()
-        try:
-            # Get the user's current date (last transaction date)
-            current_date_raw = self._get_user_current_date(cursor, user_id)
-            cursor.close()
-            conn.close()
+        chunk_days = chunk_days or ADVANCE_CHUNK_DAYS
+        busy = {'log': ["A time advance is already running for this user. Try again once it finishes."]}
 
-            # Convert to date object if it's a string
-            if isinstance(current_date_raw, str):
-                current_date = self._from_datetime_str(current_date_raw)
+        # A background job still being worked on keeps going; don't race it
+        active = self.get_advance_job(user_id)
+        if (active and active['status'] == 'running'
+                and (active['heartbeat_at'] or 0) >= time.time() - ADVANCE_STALE_SECONDS):
+            return busy
+
+        # A run that fits in one chunk has no checkpoint to keep, unless it has
+        # to pick up a queued job or a failed one's checkpoint
+        if days_to_advance <= chunk_days and not (active and active['status'] in ('queued', 'running', 'failed')):
+            return self._advance_in_one_transaction(user_id, days_to_advance)
+
+        worker = f"advance_time:{os.getpid()}:{threading.get_ident()}"
+        try:
+            job = self.start_advance_job(user_id, days_to_advance)
+            if not self.claim_advance_job(job['job_id'], worker, ADVANCE_STALE_SECONDS):
+                return busy
+            while True:
+                job = self.run_advance_job_chunk(job['job_id'], worker, chunk_days)
+                if job is None:
+                    return busy
+                if job['status'] != 'running':
+                    break
+        except Exception as e:
+            ADVANCE_TIME_RUNS.inc(result='error')
+            return {'log': [f"An error occurred during time advance: {e}"]}
+
+        if job['status'] == 'failed':
+            return {'log': job['log'] + [f"An error occurred during time advance: {job['error']}"]}
+        return {'log': job['log']}
+
+    def auto_advance_time(self, user_id, client_date=None, background=False):
+        """
+        Automatically advance time to today's date if the user's last transaction
+        is in the past. This is called on login to keep the simulation current.
+
+        Args:
+            user_id (int): The ID of the user
+            client_date (str, optional): Client's current date in YYYY-MM-DD format.
+                                         Used to handle timezone differences between
+                                         client and server.
+            background (bool): Queue an advance job (start_advance_job) instead of
+                               advancing before returning
+
+        Returns:
+            dict: Result with log messages from the advance, plus 'job' when
+                  one was queued
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            # Get the user's current date (last transaction date)
+            current_date_raw = self._get_user_current_date(cursor, user_id)
+            cursor.close()
+            conn.close()
+
+            # Convert to date object if it's a string
+            if isinstance(current_date_raw, str):
+                current_date = self._from_datetime_str(current_date_raw)
                 if isinstance(current_date, datetime.datetime):
                     current_date = current_date.date()
             else:
@@ -2872,6 +4053,9 @@ class BusinessSimulator:
             if current_date < today:
                 days_to_advance = (today - current_date).days
                 print(f"[AUTO-ADVANCE] User {user_id}: Advancing {days_to_advance} day(s) from {current_date} to {today}")
+                if background:
+                    job = self.start_advance_job(user_id, days_to_advance)
+                    return {'log': [f"Catching up {days_to_advance} day(s) in the background"], 'job': job}
                 return self.advance_time(user_id, days_to_advance)
             else:
                 print(f"[AUTO-ADVANCE] User {user_id}: Already at current date ({current_date})")
@@ -2881,6 +4065,440 @@ class BusinessSimulator:
             print(f"[AUTO-ADVANCE ERROR] User {user_id}: {e}")
             return {'log': [f"Auto-advance failed: {e}"]}
 
+    # =============================================================================
+    # ADVANCE JOBS (background time advance)
+    # =============================================================================
+    # A job advances one user from start_date to target_date a chunk at a time.
+    # processed_through is the last fully processed day; each chunk's postings
+    # and the new processed_through commit together, so a job interrupted by a
+    # crash resumes after the last committed chunk. Workers (src/advance_jobs.py)
+    # claim a job and keep its heartbeat_at fresh; a running job whose heartbeat
+    # went stale can be claimed by another worker.
+
+    @staticmethod
+    def _advance_job_dict(row):
+        """advance_jobs row as returned to callers, with the log decoded and progress added."""
+        job = dict(row)
+        job['log'] = json.loads(job['log'] or '[]')
+        start = datetime.date.fromisoformat(job['start_date'])
+        days_total = (datetime.date.fromisoformat(job['target_date']) - start).days
+        days_done = (datetime.date.fromisoformat(job['processed_through']) - start).days
+        job['days_total'] = days_total
+        job['days_done'] = days_done
+        job['progress'] = 100 if days_total <= 0 else min(100, int(days_done * 100 / days_total))
+        return job
+
+    def start_advance_job(self, user_id, days_to_advance):
+        """
+        Queue a background advance of days_to_advance days from the user's current date.
+
+        A user has at most one queued or running job; asking again extends its
+        target date instead of starting another. If the user's last job failed
+        part-way through the same days, the new one starts from its checkpoint.
+
+        Returns:
+            dict: The queued or running job (see get_advance_job)
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            start_date = self._to_schedule_date(self._get_user_current_date(cursor, user_id))
+            target_date = start_date + datetime.timedelta(days=days_to_advance)
+
+            # Extending an active job also takes the write lock, so the check and
+            # the insert below can't interleave with another request's
+            cursor.execute("""
+                UPDATE advance_jobs SET target_date = MAX(target_date, ?), updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = ? AND status IN ('queued', 'running')
+            """, (target_date.isoformat(), user_id))
+            if cursor.rowcount == 0:
+                cursor.execute(
+                    "SELECT status, start_date, processed_through FROM advance_jobs WHERE user_id = ? ORDER BY job_id DESC LIMIT 1",
+                    (user_id,)
+                )
+                last_job = self._row_to_dict(cursor.fetchone())
+                if (last_job and last_job['status'] == 'failed'
+                        and last_job['start_date'] <= start_date.isoformat() < last_job['processed_through']):
+                    # Days up to the failed job's checkpoint were committed; carry on from there
+                    start_date = min(target_date, datetime.date.fromisoformat(last_job['processed_through']))
+                # Finished jobs are only kept until the user's next one
+                cursor.execute(
+                    "DELETE FROM advance_jobs WHERE user_id = ? AND status IN ('done', 'failed')", (user_id,)
+                )
+                cursor.execute("""
+                    INSERT INTO advance_jobs (user_id, status, start_date, target_date, processed_through)
+                    VALUES (?, 'queued', ?, ?, ?)
+                """, (user_id, start_date.isoformat(), target_date.isoformat(), start_date.isoformat()))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+        return self.get_advance_job(user_id)
+
+    def get_advance_job(self, user_id, job_id=None):
+        """
+        Return one of the user's advance jobs (their latest if job_id is None).
+
+        Returns:
+            dict: Job row with 'log' as a list and days_total, days_done and
+                  progress (percent) added, or None if there is no such job
+        """
+        with get_pool(DB_PATH).connection() as conn:
+            if job_id is None:
+                row = conn.execute(
+                    "SELECT * FROM advance_jobs WHERE user_id = ? ORDER BY job_id DESC LIMIT 1", (user_id,)
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT * FROM advance_jobs WHERE user_id = ? AND job_id = ?", (user_id, job_id)
+                ).fetchone()
+        return self._advance_job_dict(row) if row else None
+
+    def list_resumable_advance_jobs(self, stale_seconds):
+        """
+        Return the ids of jobs no live worker is running: queued ones, and
+        running ones whose heartbeat is older than stale_seconds.
+        """
+        with get_pool(DB_PATH).connection() as conn:
+            rows = conn.execute("""
+                SELECT job_id FROM advance_jobs
+                WHERE status = 'queued' OR (status = 'running' AND heartbeat_at < ?)
+                ORDER BY job_id
+            """, (time.time() - stale_seconds,)).fetchall()
+        return [row['job_id'] for row in rows]
+
+    def claim_advance_job(self, job_id, worker, stale_seconds):
+        """
+        Mark a job as running under `worker` if it is queued, or running with a
+        heartbeat older than stale_seconds (its worker died).
+
+        Returns:
+            bool: True if this worker now owns the job
+        """
+        now = time.time()
+        with get_pool(DB_PATH).connection() as conn:
+            claimed = conn.execute("""
+                UPDATE advance_jobs
+                SET status = 'running', worker = ?, heartbeat_at = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = ? AND (status = 'queued' OR (status = 'running' AND heartbeat_at < ?))
+            """, (worker, now, job_id, now - stale_seconds)).rowcount
+        return claimed == 1
+
+    def run_advance_job_chunk(self, job_id, worker, max_days):
+        """
+        Advance a claimed job by up to max_days past its processed_through.
+
+        The postings, the job's new processed_through and its log are committed
+        in one transaction. The last chunk also posts the 'Time Advanced' marker
+        and marks the job done; an error rolls the chunk back and marks the job
+        failed.
+
+        Args:
+            job_id (int): Job claimed by worker (claim_advance_job)
+            worker (str): The claiming worker's id
+            max_days (int): Days to process in this chunk
+
+        Returns:
+            dict: The job after this chunk, or None if worker no longer owns it
+        """
+        conn, cursor = self._get_db_connection()
+        user_id = None
+        try:
+            # Refreshing the heartbeat first takes the write lock for the whole chunk
+            cursor.execute(
+                "UPDATE advance_jobs SET heartbeat_at = ? WHERE job_id = ? AND worker = ? AND status = 'running'",
+                (time.time(), job_id, worker)
+            )
+            if cursor.rowcount != 1:
+                conn.rollback()
+                return None
+
+            cursor.execute("SELECT * FROM advance_jobs WHERE job_id = ?", (job_id,))
+            job = self._row_to_dict(cursor.fetchone())
+            user_id = job['user_id']
+            processed_through = datetime.date.fromisoformat(job['processed_through'])
+            target_date = datetime.date.fromisoformat(job['target_date'])
+            chunk_end = min(target_date, processed_through + datetime.timedelta(days=max(1, max_days)))
+            finished = chunk_end >= target_date
+
+            processing_log = json.loads(job['log'] or '[]')
+            chunk_log = []
+            self._advance_range(cursor, user_id, processed_through, chunk_end, chunk_log, mark_time=finished)
+            processing_log.extend(chunk_log)
+            if finished and not processing_log and job['start_date'] < job['target_date']:
+                processing_log.append(f"Time advanced to {target_date.strftime('%Y-%m-%d')}. No bills were due.")
+
+            cursor.execute("""
+                UPDATE advance_jobs
+                SET processed_through = ?, log = ?, status = ?, heartbeat_at = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+            """, (chunk_end.isoformat(), json.dumps(processing_log), 'done' if finished else 'running',
+                  time.time(), job_id))
+            conn.commit()
+            ADVANCE_TIME_DAYS.inc(max(0, (chunk_end - processed_through).days))
+            if finished:
+                ADVANCE_TIME_RUNS.inc(result='ok')
+        except Exception as e:
+            conn.rollback()
+            ADVANCE_TIME_RUNS.inc(result='error')
+            print(f"[ADVANCE JOB ERROR] Job {job_id}: {e}")
+            cursor.execute("""
+                UPDATE advance_jobs SET status = 'failed', error = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE job_id = ? AND worker = ?
+            """, (str(e), job_id, worker))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+        if user_id is not None:
+            self._bump_data_version(user_id)
+        with get_pool(DB_PATH).connection() as conn:
+            row = conn.execute("SELECT * FROM advance_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._advance_job_dict(row) if row else None
+
+    # =============================================================================
+    # BULK IMPORT (Bank Statements)
+    # =============================================================================
+
+    # Date layouts seen in bank CSV exports and OFX <DTPOSTED> values
+    IMPORT_DATE_FORMATS = ('%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S',
+                           '%Y%m%d', '%Y%m%d%H%M%S', '%m/%d/%Y', '%m/%d/%y')
+
+    @classmethod
+    def _parse_import_date(cls, value):
+        """Parse a statement date into a datetime, or raise ValueError."""
+        if isinstance(value, datetime.datetime):
+            return value
+        if isinstance(value, datetime.date):
+            return datetime.datetime.combine(value, datetime.time())
+        text = str(value or '').strip()
+        # OFX appends fractional seconds and a zone, e.g. 20250114120000.000[-5:EST]
+        text = text.split('[')[0].split('.')[0] if text[:8].isdigit() else text
+        for fmt in cls.IMPORT_DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+        raise ValueError(f"Invalid date '{value}'.")
+
+    @staticmethod
+    def _parse_import_amount(value):
+        """Parse a statement amount ('$1,234.50', '(12.00)', -5) into a Decimal, or raise ValueError."""
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            amount = Decimal(str(value))
+        else:
+            text = str(value or '').strip().replace('$', '').replace(',', '').replace(' ', '')
+            negative = text.startswith('(') and text.endswith(')')
+            try:
+                amount = Decimal(text.strip('()'))
+            except ArithmeticError:
+                raise ValueError(f"Invalid amount '{value}'.")
+            amount = -amount if negative else amount
+        # Decimal accepts 'NaN' and 'Infinity', which no statement amount can be
+        if not amount.is_finite():
+            raise ValueError(f"Invalid amount '{value}'.")
+        return amount
+
+    @writes_user_data
+    def import_transactions(self, user_id, rows, account_id=None, dry_run=False):
+        """
+        Import bank statement rows as expenses and income in one database transaction.
+
+        Each row is a dict with:
+            - date: Transaction date (YYYY-MM-DD, MM/DD/YYYY or OFX YYYYMMDD[HHMMSS])
+            - description: Payee / memo
+            - amount: Signed amount; negative is money out (expense), positive is
+              money in (income), as in OFX TRNAMT. '$1,234.50' and '(12.00)' are accepted.
+            - type (optional): 'expense' or 'income' to override the sign
+            - account_id or account (optional): Account to post against; defaults
+              to the account_id argument
+            - category_id or category (optional): Category ID or name. When absent,
+              the category last used for the same description is applied
+              (Uncategorized for new expense descriptions).
+            - is_business (optional): true/false
+
+        Rows are validated and categorised in memory and posted in date order
+        with the same checks as log_expense / log_income (a payment that would
+        overdraw the account or exceed a credit limit is rejected). Every valid
+        row is then written with executemany in one commit; invalid rows are
+        reported and skipped.
+
+        Args:
+            user_id (int): The user ID
+            rows (list): Statement rows as described above
+            account_id (int, optional): Default account for rows without one
+            dry_run (bool): Validate and report without writing anything
+
+        Returns:
+            dict: {'imported': int, 'failed': int,
+                   'errors': [{'row': 1-based row number, 'error': str}, ...]}
+        """
+        conn, cursor = self._get_db_connection()
+        try:
+            batch = self._start_posting_batch(cursor, user_id)
+            context = self._start_import_context(cursor, user_id, batch, account_id)
+
+            errors = []
+            parsed = []
+            for number, row in enumerate(rows, 1):
+                try:
+                    parsed.append(self._parse_import_row(row, number, context))
+                except (ValueError, TypeError) as e:
+                    errors.append({'row': number, 'error': str(e)})
+                except ArithmeticError:
+                    # e.g. 1e400, which overflows the context when rounded to cents
+                    errors.append({'row': number, 'error': f"Invalid amount '{row.get('amount')}'."})
+
+            # Post in date order so balance checks see the statement as it happened
+            parsed.sort(key=lambda item: item['transaction_date'])
+            imported = 0
+            for item in parsed:
+                account = item['account']
+                amount = item['amount']
+                cents = item['amount_cents']
+                line = {'transaction_date': item['transaction_date'],
+                        'description': item['description'], 'is_business': item['is_business']}
+                if item['type'] == 'EXPENSE':
+                    message = self._check_batch_expense(batch, account, amount)
+                    if message:
+                        errors.append({'row': item['row'], 'error': message})
+                        continue
+                    self._queue_batch_transaction(batch, 'import', 'EXPENSE', [
+                        {**line, 'account': 'Expenses', 'debit': amount, 'credit': 0,
+                         'debit_cents': cents, 'credit_cents': 0, 'category_id': item['category_id']},
+                        {**line, 'account': account['name'], 'debit': 0, 'credit': amount,
+                         'debit_cents': 0, 'credit_cents': cents},
+                    ])
+                else:
+                    line['category_id'] = item['category_id']
+                    self._queue_batch_transaction(batch, 'import', 'INCOME', [
+                        {**line, 'account': account['name'], 'debit': amount, 'credit': 0,
+                         'debit_cents': cents, 'credit_cents': 0},
+                        {**line, 'account': 'Income', 'debit': 0, 'credit': amount,
+                         'debit_cents': 0, 'credit_cents': cents},
+                    ])
+                imported += 1
+
+            if not dry_run:
+                self._flush_posting_batch(cursor, batch)
+                conn.commit()
+
+            errors.sort(key=lambda error: error['row'])
+            return {'imported': imported, 'failed': len(errors), 'errors': errors}
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _start_import_context(self, cursor, user_id, batch, default_account_id):
+        """
+        Load the lookups import rows are validated and categorised against.
+
+        Returns:
+            dict: accounts by id and lowercase name, category ids and names, the
+            category last used per (type, description), and a per-import cache
+            of parsed dates
+        """
+        cursor.execute("SELECT category_id, name FROM expense_categories WHERE user_id = ?", (user_id,))
+        category_rows = cursor.fetchall()
+
+        # Most recent category per (type, description), oldest first so the latest wins
+        cursor.execute("""
+            SELECT type, description, category_id FROM transactions
+            WHERE user_id = ? AND category_id IS NOT NULL AND is_reversal = 0
+              AND type IN ('EXPENSE', 'INCOME')
+            ORDER BY transaction_date, last_entry_id
+        """, (user_id,))
+        remembered = {(row['type'], (row['description'] or '').strip().lower()): row['category_id']
+                      for row in cursor.fetchall()}
+
+        return {
+            'accounts': batch['accounts'],
+            'accounts_by_name': {a['name'].lower(): a for a in batch['accounts'].values()},
+            'default_account_id': default_account_id,
+            'category_ids': {row['category_id'] for row in category_rows},
+            'categories_by_name': {row['name'].lower(): row['category_id'] for row in category_rows},
+            'remembered_categories': remembered,
+            'default_category_id': batch['default_category_id'],
+            'dates': {},
+        }
+
+    def _parse_import_row(self, row, number, context):
+        """Validate and categorise one import row; raise ValueError with the reason it can't be posted."""
+        if not isinstance(row, dict):
+            raise ValueError("Row must be an object with date, description and amount.")
+        description = str(row.get('description') or '').strip()
+        if not description:
+            raise ValueError("Missing description.")
+        raw_date = row.get('date')
+        if raw_date in (None, ''):
+            raise ValueError("Missing date.")
+        # Statements repeat the same few hundred dates; parse each once
+        dates = context['dates']
+        date_key = raw_date if isinstance(raw_date, str) else str(raw_date)
+        transaction_date = dates.get(date_key)
+        if transaction_date is None:
+            transaction_date = dates[date_key] = self._to_datetime_str(self._parse_import_date(raw_date))
+        amount = self._parse_import_amount(row.get('amount'))
+
+        row_type = str(row.get('type') or '').strip().upper()
+        if row_type in ('EXPENSE', 'DEBIT'):
+            row_type = 'EXPENSE'
+        elif row_type in ('INCOME', 'CREDIT'):
+            row_type = 'INCOME'
+        elif row_type:
+            raise ValueError(f"Invalid type '{row.get('type')}'.")
+        else:
+            row_type = 'EXPENSE' if amount < 0 else 'INCOME'
+            amount = abs(amount)
+        # Validate the posted value, so '-0.001' (0 cents) is rejected like 0
+        amount_cents = self._to_cents(amount)
+        if amount_cents <= 0:
+            raise ValueError(f"{'Expense' if row_type == 'EXPENSE' else 'Income'} amount must be positive.")
+
+        accounts = context['accounts']
+        if row.get('account_id') not in (None, ''):
+            account = accounts.get(int(row['account_id']))
+        elif row.get('account'):
+            account = context['accounts_by_name'].get(str(row['account']).strip().lower())
+        elif context['default_account_id'] not in (None, ''):
+            account = accounts.get(int(context['default_account_id']))
+        else:
+            account = None
+        if not account:
+            raise ValueError("Invalid account specified.")
+
+        if row.get('category_id') not in (None, ''):
+            category_id = int(row['category_id'])
+            if category_id not in context['category_ids']:
+                raise ValueError(f"Unknown category_id {category_id}.")
+        elif row.get('category'):
+            category_id = context['categories_by_name'].get(str(row['category']).strip().lower())
+            if category_id is None:
+                raise ValueError(f"Unknown category '{row['category']}'.")
+        else:
+            category_id = context['remembered_categories'].get((row_type, description.lower()))
+            if category_id is None and row_type == 'EXPENSE':
+                category_id = context['default_category_id']
+
+        is_business = row.get('is_business')
+        if isinstance(is_business, str):
+            is_business = is_business.strip().lower() in ('1', 'true', 'yes', 'y')
+
+        return {
+            'row': number,
+            'transaction_date': transaction_date,
+            'description': description,
+            'amount': float(amount),
+            'amount_cents': amount_cents,
+            'type': row_type,
+            'account': account,
+            'category_id': category_id,
+            'is_business': 1 if is_business else 0,
+        }
+
     # =============================================================================
     # FINANCIAL STATEMENTS
     # =============================================================================
@@ -2900,7 +4518,7 @@ class BusinessSimulator:
         try:
             # Get all revenue (Income account credits)
             cursor.execute("""
-                SELECT description, SUM(credit) as amount
+                SELECT description, SUM(credit_cents) / 100.0 as amount
                 FROM financial_ledger
                 WHERE user_id = ?
                   AND account = 'Income'
@@ -2915,12 +4533,12 @@ class BusinessSimulator:
             cursor.execute("""
                 SELECT
                     COALESCE(ec.name, 'Uncategorized') as category,
-                    SUM(fl.debit) as amount
+                    SUM(fl.debit_cents) / 100.0 as amount
                 FROM financial_ledger fl
                 LEFT JOIN expense_categories ec ON fl.category_id = ec.category_id
                 LEFT JOIN accounts a ON fl.account = a.name AND fl.user_id = a.user_id
                 WHERE fl.user_id = ?
-                  AND fl.debit > 0
+                  AND fl.debit_cents > 0
                   AND fl.transaction_date BETWEEN ? AND ?
                   AND (fl.account = 'Expenses' OR a.type IN ('CHECKING', 'SAVINGS', 'CASH', 'CREDIT'))
                 GROUP BY ec.name
@@ -2969,21 +4587,13 @@ class BusinessSimulator:
             """, (user_id,))
             accounts = cursor.fetchall()
 
-            # Calculate balances as of date by replaying transactions
+            # Calculate balances as of date with one grouped ledger pass
+            balances = self._get_account_balances(cursor, user_id, as_of_date)
             account_balances = {}
             for acc in accounts:
-                cursor.execute("""
-                    SELECT
-                        COALESCE(SUM(debit), 0) - COALESCE(SUM(credit), 0) as balance
-                    FROM financial_ledger
-                    WHERE user_id = ?
-                      AND account = ?
-                      AND transaction_date <= ?
-                """, (user_id, acc['name'], as_of_date))
-                result = self._row_to_dict(cursor.fetchone())
                 account_balances[acc['name']] = {
                     'type': acc['type'],
-                    'balance': result['balance'] if result else Decimal(0)
+                    'balance': balances.get(acc['name'], 0) / 100
                 }
 
             # Categorize as assets/liabilities
@@ -3031,8 +4641,8 @@ class BusinessSimulator:
             # Operating Activities: Income and day-to-day Expenses only
             cursor.execute("""
                 SELECT
-                    SUM(CASE WHEN fl.account = 'Income' THEN fl.credit ELSE 0 END) as income,
-                    SUM(CASE WHEN fl.account = 'Expenses' OR a.type IN ('CHECKING', 'SAVINGS', 'CASH', 'CREDIT') THEN fl.debit ELSE 0 END) as expenses
+                    SUM(CASE WHEN fl.account = 'Income' THEN fl.credit_cents ELSE 0 END) / 100.0 as income,
+                    SUM(CASE WHEN fl.account = 'Expenses' OR a.type IN ('CHECKING', 'SAVINGS', 'CASH', 'CREDIT') THEN fl.debit_cents ELSE 0 END) / 100.0 as expenses
                 FROM financial_ledger fl
                 LEFT JOIN accounts a ON fl.account = a.name AND fl.user_id = a.user_id
                 WHERE fl.user_id = ?
@@ -3044,7 +4654,7 @@ class BusinessSimulator:
             # Investing Activities: Fixed asset purchases and investment account changes
             cursor.execute("""
                 SELECT
-                    SUM(credit) - SUM(debit) as investing_flow
+                    SUM(credit_cents - debit_cents) / 100.0 as investing_flow
                 FROM financial_ledger fl
                 JOIN accounts a ON fl.account = a.name AND fl.user_id = a.user_id
                 WHERE fl.user_id = ?
@@ -3057,7 +4667,7 @@ class BusinessSimulator:
             # Financing Activities: Loan payments, credit card changes, line of credit
             cursor.execute("""
                 SELECT
-                    SUM(debit) - SUM(credit) as financing_flow
+                    SUM(debit_cents - credit_cents) / 100.0 as financing_flow
                 FROM financial_ledger fl
                 JOIN accounts a ON fl.account = a.name AND fl.user_id = a.user_id
                 WHERE fl.user_id = ?
@@ -3077,8 +4687,52 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    def _scan_dashboard_rollups(self, cursor, user_id, window_start):
+        """
+        Read everything get_dashboard_data needs from ledger_daily_rollups in one pass.
+
+        Only days from window_start (YYYY-MM-DD) on are read, including any
+        dated after the user's current date; the opening balances are
+        account_balances minus these rows' net change, not a sum of the
+        history before the window.
+
+        Returns:
+            list: Dicts with day, account, category_id (None if uncategorised),
+            is_reversal, is_business, is_system, debit_cents, credit_cents
+        """
+        cursor.execute("""
+            SELECT
+                transaction_date AS day,
+                account,
+                NULLIF(category_id, 0) AS category_id,
+                is_reversal,
+                is_business,
+                is_system,
+                debit_cents,
+                credit_cents
+            FROM ledger_daily_rollups
+            WHERE user_id = ? AND transaction_date >= ?
+        """, (user_id, window_start))
+        return self._rows_to_dicts(cursor.fetchall())
+
     def get_dashboard_data(self, user_id, days=30):
-        """Get dashboard summary data including stats and chart data."""
+        """
+        Get dashboard summary data including stats and chart data.
+
+        Every chart series is derived from a single read of the window's daily
+        rollups (see _scan_dashboard_rollups) rather than one query per chart;
+        opening balances come from account_balances.
+        The result includes 'timings', milliseconds spent per section.
+        """
+        timings = {}
+        section_started = time.perf_counter()
+
+        def end_section(name):
+            nonlocal section_started
+            now = time.perf_counter()
+            timings[name] = round((now - section_started) * 1000, 3)
+            section_started = now
+
         conn, cursor = self._get_db_connection()
         try:
             current_date_raw = self._get_user_current_date(cursor, user_id)
@@ -3087,10 +4741,14 @@ class BusinessSimulator:
             start_date_str = self._to_datetime_str(start_date)
             current_date_str = self._to_datetime_str(current_date)  # Convert current_date back to string for query
 
+            # Always use 90 days (or all data if less exists) for RUNWAY - independent of date range selector
+            runway_start = current_date - datetime.timedelta(days=90)
+            runway_start_str = self._to_datetime_str(runway_start)
+
             # Find the earliest transaction date for this user (for chart limiting)
             cursor.execute("""
                 SELECT MIN(transaction_date) as first_date
-                FROM financial_ledger
+                FROM transactions
                 WHERE user_id = ? AND description != 'Time Advanced' AND description != 'Initial Balance'
             """, (user_id,))
             first_date_result = self._row_to_dict(cursor.fetchone())
@@ -3103,447 +4761,302 @@ class BusinessSimulator:
             else:
                 effective_start_date_str = start_date_str
 
-            # Get total income and expenses for the period (exclude reversals and system entries)
-            cursor.execute("""
-                SELECT
-                    SUM(CASE WHEN account = 'Income' THEN credit ELSE 0 END) as total_income,
-                    SUM(CASE WHEN account = 'Expenses' THEN debit ELSE 0 END) as total_expenses
-                FROM financial_ledger
-                WHERE user_id = ? AND transaction_date BETWEEN ? AND ?
-                    AND is_reversal = 0
-                    AND description != 'Time Advanced'
-                    AND description != 'Initial Balance'
-            """, (user_id, start_date_str, current_date_str))
-            totals = self._row_to_dict(cursor.fetchone())
+            # The rollups are per day, so every window below covers whole days
+            start_day = start_date_str[:10]
+            current_day = current_date_str[:10]
+            runway_start_day = runway_start_str[:10]
+            effective_start_day = effective_start_date_str[:10]
+
+            cursor.execute("SELECT account_id, name, type FROM accounts WHERE user_id = ? ORDER BY name", (user_id,))
+            user_accounts = self._rows_to_dicts(cursor.fetchall())
+            accounts_by_name = {}
+            for account in user_accounts:
+                accounts_by_name.setdefault(account['name'], []).append(account)
+            end_section('setup')
+
+            # --- The one rollup pass ----------------------------------------------
+            scan_start = min(start_day, runway_start_day)
+            ledger_rows = self._scan_dashboard_rollups(cursor, user_id, scan_start)
+            balances = self._get_account_balances(cursor, user_id)
+
+            category_ids = {row['category_id'] for row in ledger_rows if row['category_id'] is not None}
+            categories = {}
+            if category_ids:
+                placeholders = ','.join('?' * len(category_ids))
+                cursor.execute(
+                    f"SELECT category_id, name, color, is_monthly FROM expense_categories WHERE category_id IN ({placeholders})",
+                    tuple(category_ids)
+                )
+                categories = {row['category_id']: row for row in self._rows_to_dicts(cursor.fetchall())}
+            end_section('rollup_scan')
+
+            # --- Bucket the pass into every series --------------------------------
+            cash_types = ('CHECKING', 'SAVINGS', 'CASH')
+            asset_types = ('CHECKING', 'SAVINGS', 'CASH', 'INVESTMENT', 'FIXED_ASSET')
+            liability_types = ('LOAN', 'CREDIT_CARD', 'LINE_OF_CREDIT')
+
+            week_keys = {}
+
+            def year_week(day):
+                # strftime('%Y-%W', transaction_date)
+                key = week_keys.get(day)
+                if key is None:
+                    key = week_keys[day] = datetime.datetime.strptime(day, '%Y-%m-%d').strftime('%Y-%W')
+                return key
+
+            def add(bucket, key, field, cents):
+                entry = bucket.get(key)
+                if entry is None:
+                    entry = bucket[key] = {}
+                entry[field] = entry.get(field, 0) + cents
+
+            def category_group(category_id):
+                # LEFT JOIN expense_categories: unknown ids share one NULL group
+                category = categories.get(category_id)
+                return (category['category_id'], category['name'], category['color']) if category else (None, None, None)
+
+            totals = {}
+            spending_by_category_map = {}
+            income_by_category_map = {}
+            monthly = {}
+            weekly = {}
+            business_weekly_map = {}
+            runway_months = {}
+            expenses_over_time_map = {}
+            weekly_expense_map = {}
+            top_category_map = {}
+            daily_net_worth = {}
+            daily_assets = {}
+            daily_credit = {}
+            change_since_effective = {}
+            change_since_start = {}
+
+            for row in ledger_rows:
+                day = row['day']
+                account = row['account']
+                debit_cents = row['debit_cents']
+                credit_cents = row['credit_cents']
+                not_reversal = row['is_reversal'] == 0
+                not_system = row['is_system'] == 0
+                matched_accounts = accounts_by_name.get(account, ())
+
+                # Net change from the effective/requested start on (see opening balances)
+                if day >= effective_start_day:
+                    change_since_effective[account] = change_since_effective.get(account, 0) + debit_cents - credit_cents
+                if day >= start_day:
+                    change_since_start[account] = change_since_start.get(account, 0) + debit_cents - credit_cents
+
+                in_window = start_day <= day <= current_day
+                in_effective_window = effective_start_day <= day <= current_day
+                is_income = account == 'Income'
+                is_expense = account == 'Expenses'
+
+                if in_window:
+                    month = day[:7]
+                    week = year_week(day)
+                    # The charts pass week_start to new Date(), which reads a bare YYYY-MM-DD as UTC
+                    week_start = day + ' 00:00:00'
+                    income_cents = credit_cents if is_income else 0
+                    expense_cents = debit_cents if is_expense else 0
+
+                    if not_reversal:
+                        add(monthly, month, 'income', income_cents)
+                        add(monthly, month, 'expenses', expense_cents)
+                        add(weekly, week, 'income', income_cents)
+                        add(weekly, week, 'expenses', expense_cents)
+                        weekly[week]['week_start'] = min(weekly[week].get('week_start', week_start), week_start)
+                        if row['is_business'] == 1:
+                            add(business_weekly_map, week, 'income', income_cents)
+                            add(business_weekly_map, week, 'expenses', expense_cents)
+                            business_weekly_map[week]['week_start'] = min(business_weekly_map[week].get('week_start', week_start), week_start)
+
+                    if not_reversal and not_system:
+                        add(totals, 'all', 'income', income_cents)
+                        add(totals, 'all', 'expenses', expense_cents)
+                        if is_expense and row['category_id'] is not None:
+                            add(spending_by_category_map, category_group(row['category_id']), 'cents', debit_cents)
+                        if is_income:
+                            add(income_by_category_map, category_group(row['category_id']), 'cents', credit_cents)
+
+                    if is_expense and row['category_id'] is not None:
+                        group = category_group(row['category_id'])
+                        add(expenses_over_time_map, (month,) + group, 'cents', debit_cents)
+                        add(weekly_expense_map, (week,) + group, 'cents', debit_cents)
+                        weekly_expense_map[(week,) + group]['week_start'] = min(
+                            weekly_expense_map[(week,) + group].get('week_start', week_start), week_start)
+                        add(top_category_map, group, 'cents', debit_cents)
+
+                    for a in matched_accounts:
+                        if a['type'] in liability_types:
+                            add(daily_credit, (day, a['account_id']), 'cents', credit_cents - debit_cents)
+
+                if runway_start_day <= day <= current_day and is_expense and not_reversal and row['is_business'] == 0:
+                    add(runway_months, day[:7], 'cents', debit_cents)
+
+                if in_effective_window:
+                    for a in matched_accounts:
+                        add(daily_assets, day, 'assets', debit_cents - credit_cents if a['type'] in asset_types else 0)
+                        add(daily_assets, day, 'liabilities', credit_cents - debit_cents if a['type'] in liability_types else 0)
+                        if not_reversal:
+                            add(daily_net_worth, day, 'cents', debit_cents - credit_cents if a['type'] in cash_types else 0)
+
+            # Opening balances: current balance less the net change since the start.
+            # The cash opening leaves out reversals; a reversal is dated with the
+            # transaction it cancels and both are flagged, so they net to zero per day.
+            before_effective = {'cash': 0, 'assets': 0, 'liabilities': 0}
+            credit_before_start = {}
+            for a in user_accounts:
+                balance = balances.get(a['name'], 0)
+                opening = balance - change_since_effective.get(a['name'], 0)
+                if a['type'] in asset_types:
+                    before_effective['assets'] += opening
+                if a['type'] in liability_types:
+                    before_effective['liabilities'] -= opening
+                    credit_before_start[a['account_id']] = change_since_start.get(a['name'], 0) - balance
+                if a['type'] in cash_types:
+                    before_effective['cash'] += opening
+            end_section('aggregate')
+
+            def ordered_groups(bucket):
+                # GROUP BY (category_id, ...) order with NULL first, then ORDER BY amount DESC
+                items = sorted(bucket.items(), key=lambda kv: (kv[0][0] is not None, kv[0][0] or 0))
+                return sorted(items, key=lambda kv: -kv[1]['cents'])
+
+            # Totals and category breakdowns (exclude reversals and system entries)
+            total_income = float(totals.get('all', {}).get('income', 0) / 100.0)
+            total_expenses = float(totals.get('all', {}).get('expenses', 0) / 100.0)
+            savings_rate = ((total_income - total_expenses) / total_income * 100) if total_income > 0 else 0
 
-            # Get spending by category (exclude reversals and system entries)
-            cursor.execute("""
-                SELECT c.name, c.color, SUM(l.debit) as amount
-                FROM financial_ledger l
-                LEFT JOIN expense_categories c ON l.category_id = c.category_id
-                WHERE l.user_id = ?
-                    AND l.account = 'Expenses'
-                    AND l.transaction_date BETWEEN ? AND ?
-                    AND l.category_id IS NOT NULL
-                    AND l.is_reversal = 0
-                    AND l.description != 'Time Advanced'
-                    AND l.description != 'Initial Balance'
-                GROUP BY c.category_id, c.name, c.color
-                ORDER BY amount DESC
-            """, (user_id, start_date_str, current_date_str))
-            spending_by_category = self._rows_to_dicts(cursor.fetchall())
+            spending_by_category = [
+                {'name': name, 'color': color, 'amount': v['cents'] / 100.0}
+                for (_, name, color), v in ordered_groups(spending_by_category_map)
+            ]
+            income_by_category = [
+                {'name': name if name is not None else 'Uncategorized',
+                 'color': color if color is not None else '#10b981',
+                 'amount': v['cents'] / 100.0}
+                for (_, name, color), v in ordered_groups(income_by_category_map)
+            ]
 
             # Get income breakdown by description (for Income by Source chart)
             cursor.execute("""
-                SELECT description, SUM(credit) as amount
-                FROM financial_ledger
+                SELECT description, SUM(amount_cents) / 100.0 as amount
+                FROM transactions
                 WHERE user_id = ?
-                    AND account = 'Income'
-                    AND transaction_date BETWEEN ? AND ?
+                    AND type = 'INCOME'
+                    AND transaction_date >= ? AND transaction_date < DATE(?, '+1 day')
                     AND is_reversal = 0
-                    AND description != 'Time Advanced'
-                    AND description != 'Initial Balance'
                 GROUP BY description
                 ORDER BY amount DESC
-            """, (user_id, start_date_str, current_date_str))
+            """, (user_id, start_day, current_day))
             income_by_description = self._rows_to_dicts(cursor.fetchall())
+            end_section('totals_and_categories')
 
-            # Get income breakdown by category (for Income by Source chart)
-            # Uses expense_categories since income categories are stored there with parent_id linking to income parent groups
-            cursor.execute("""
-                SELECT
-                    COALESCE(ec.name, 'Uncategorized') as name,
-                    COALESCE(ec.color, '#10b981') as color,
-                    SUM(l.credit) as amount
-                FROM financial_ledger l
-                LEFT JOIN expense_categories ec ON l.category_id = ec.category_id
-                WHERE l.user_id = ?
-                    AND l.account = 'Income'
-                    AND l.transaction_date BETWEEN ? AND ?
-                    AND l.is_reversal = 0
-                    AND l.description != 'Time Advanced'
-                    AND l.description != 'Initial Balance'
-                GROUP BY ec.category_id, ec.name, ec.color
-                ORDER BY amount DESC
-            """, (user_id, start_date_str, current_date_str))
-            income_by_category = self._rows_to_dicts(cursor.fetchall())
-
-            # Get net worth over time (daily snapshots) - exclude reversals
-            # Use effective_start_date_str to avoid showing zeros before first transaction
-            cursor.execute("""
-                SELECT DATE(transaction_date) as date,
-                    SUM(CASE WHEN a.type IN ('CHECKING', 'SAVINGS', 'CASH') THEN debit - credit ELSE 0 END) as daily_change
-                FROM financial_ledger l
-                JOIN accounts a ON l.account = a.name AND l.user_id = a.user_id
-                WHERE l.user_id = ? AND transaction_date BETWEEN ? AND ?
-                    AND l.is_reversal = 0
-                GROUP BY DATE(transaction_date)
-                ORDER BY date
-            """, (user_id, effective_start_date_str, current_date_str))
-            daily_changes = self._rows_to_dicts(cursor.fetchall())
-
-            # Calculate starting balance at the beginning of the effective period (exclude reversals)
-            cursor.execute("""
-                SELECT SUM(CASE WHEN a.type IN ('CHECKING', 'SAVINGS', 'CASH') THEN debit - credit ELSE 0 END) as balance_before_period
-                FROM financial_ledger l
-                JOIN accounts a ON l.account = a.name AND l.user_id = a.user_id
-                WHERE l.user_id = ? AND transaction_date < ?
-                    AND l.is_reversal = 0
-            """, (user_id, effective_start_date_str))
-            result = self._row_to_dict(cursor.fetchone())
-            starting_balance = self._from_money_str(result['balance_before_period']) if result and result['balance_before_period'] else Decimal('0.0')
-
-            # Start with the balance at the beginning of the effective period
+            # Net worth over time (daily snapshots) - exclude reversals
+            # Starts at the effective start date to avoid showing zeros before first transaction
+            starting_balance = before_effective['cash'] / 100.0
+            starting_balance = self._from_money_str(starting_balance) if starting_balance else Decimal('0.0')
             net_worth_trend = [{
                 'date': effective_start_date_str,
                 'net_worth': float(starting_balance)
             }]
             cumulative = float(starting_balance)
-            for row in daily_changes:
-                daily_change = float(self._from_money_str(row['daily_change'])) if row['daily_change'] else 0.0
+            for date_key in sorted(daily_net_worth):
+                daily_change = daily_net_worth[date_key]['cents'] / 100.0
+                daily_change = float(self._from_money_str(daily_change)) if daily_change else 0.0
                 cumulative += daily_change
                 net_worth_trend.append({
-                    'date': row['date'],  # Already a string from SQLite DATE()
+                    'date': date_key,
                     'net_worth': float(cumulative)
                 })
 
-            # Calculate savings rate
-            total_income = float(self._from_money_str(totals['total_income']))
-            total_expenses = float(self._from_money_str(totals['total_expenses']))
-            savings_rate = ((total_income - total_expenses) / total_income * 100) if total_income > 0 else 0
-
-            # Get monthly income vs expenses for bar chart (exclude reversals)
-            cursor.execute("""
-                SELECT
-                    strftime('%Y-%m', transaction_date) as month,
-                    SUM(CASE WHEN account = 'Income' THEN credit ELSE 0 END) as income,
-                    SUM(CASE WHEN account = 'Expenses' THEN debit ELSE 0 END) as expenses
-                FROM financial_ledger
-                WHERE user_id = ? AND transaction_date BETWEEN ? AND ?
-                    AND is_reversal = 0
-                GROUP BY strftime('%Y-%m', transaction_date)
-                ORDER BY month
-            """, (user_id, start_date_str, current_date_str))
-            monthly_data = self._rows_to_dicts(cursor.fetchall())
-            income_vs_expenses = [
-                {
-                    'month': row['month'],
-                    'income': float(self._from_money_str(row['income'])),
-                    'expenses': float(self._from_money_str(row['expenses']))
-                } for row in monthly_data
-            ]
-
-            # Get weekly income vs expenses for dashboard line chart (exclude reversals)
-            cursor.execute("""
-                SELECT
-                    MIN(transaction_date) as week_start,
-                    strftime('%Y-%W', transaction_date) as year_week,
-                    SUM(CASE WHEN account = 'Income' THEN credit ELSE 0 END) as income,
-                    SUM(CASE WHEN account = 'Expenses' THEN debit ELSE 0 END) as expenses
-                FROM financial_ledger
-                WHERE user_id = ? AND transaction_date BETWEEN ? AND ?
-                    AND is_reversal = 0
-                GROUP BY strftime('%Y-%W', transaction_date)
-                ORDER BY year_week
-            """, (user_id, start_date_str, current_date_str))
-            weekly_data = self._rows_to_dicts(cursor.fetchall())
-
-            # Format weekly data
-            weekly_income_expenses = []
-            for row in weekly_data:
-                weekly_income_expenses.append({
-                    'week_start': row['week_start'],  # Already a string from SQLite
-                    'income': float(self._from_money_str(row['income'])),
-                    'expenses': float(self._from_money_str(row['expenses']))
-                })
-
-            # Get weekly expenses by category - monthly categories show as weekly average
-            cursor.execute("""
-                SELECT
-                    MIN(l.transaction_date) as week_start,
-                    strftime('%Y-%W', l.transaction_date) as year_week,
-                    c.name as category,
-                    c.color,
-                    c.is_monthly,
-                    SUM(l.debit) as amount
-                FROM financial_ledger l
-                LEFT JOIN expense_categories c ON l.category_id = c.category_id
-                WHERE l.user_id = ?
-                    AND l.account = 'Expenses'
-                    AND l.transaction_date BETWEEN ? AND ?
-                    AND l.category_id IS NOT NULL
-                GROUP BY strftime('%Y-%W', l.transaction_date), c.category_id, c.name, c.color, c.is_monthly
-                ORDER BY year_week, amount DESC
-            """, (user_id, start_date_str, current_date_str))
-            weekly_expenses_raw = self._rows_to_dicts(cursor.fetchall())
-
-            # Build a complete weekly series and smooth monthly categories across all weeks
-            # 1) Collect all ISO weeks in range (week starts Monday)
-            def week_monday(d):
-                if isinstance(d, str):
-                    # Try datetime format first (with time), then date-only format
-                    try:
-                        d = datetime.datetime.strptime(d, '%Y-%m-%d %H:%M:%S').date()
-                    except ValueError:
-                        d = datetime.datetime.strptime(d, '%Y-%m-%d').date()
-                elif isinstance(d, datetime.datetime):
-                    d = d.date()
-                return d - datetime.timedelta(days=d.weekday())
-
-            weeks = []
-            w = week_monday(start_date)
-            last = week_monday(current_date)
-            while w <= last:
-                weeks.append(w)
-                w = w + datetime.timedelta(days=7)
-
-            # 2) Map raw weekly sums for non-monthly categories
-            non_monthly_map = {}
-            for row in weekly_expenses_raw:
-                if not row.get('is_monthly'):
-                    raw_ws = row['week_start']  # Already a string from SQLite
-                    # Normalize to Monday of that week for consistent x-axis
-                    ws = week_monday(raw_ws)
-                    key = (ws, row['category'])
-                    non_monthly_map[key] = {
-                        'week_start': ws.strftime('%Y-%m-%d'),
-                        'category': row['category'],
-                        'color': row['color'],
-                        'is_monthly': False,
-                        'amount': round(float(self._from_money_str(row['amount'])), 2)
-                    }
-
-            # 3) Compute monthly totals for monthly categories
-            cursor.execute("""
-                SELECT
-                    strftime('%Y-%m', l.transaction_date) as ym,
-                    c.name as category,
-                    c.color,
-                    SUM(l.debit) as monthly_amount
-                FROM financial_ledger l
-                LEFT JOIN expense_categories c ON l.category_id = c.category_id
-                WHERE l.user_id = ?
-                    AND l.account = 'Expenses'
-                    AND l.transaction_date BETWEEN ? AND ?
-                    AND l.category_id IS NOT NULL
-                    AND c.is_monthly = 1
-                GROUP BY ym, c.category_id, c.name, c.color
-            """, (user_id, start_date_str, current_date_str))
-            monthly_totals = self._rows_to_dicts(cursor.fetchall())
-
-            monthly_map = {}  # (ym, category) -> {color, monthly_amount}
-            monthly_categories = set()
-            for row in monthly_totals:
-                ym = row['ym']
-                cat = row['category']
-                monthly_map[(ym, cat)] = {
-                    'color': row['color'],
-                    'monthly_amount': float(self._from_money_str(row['monthly_amount']))
-                }
-                monthly_categories.add(cat)
-
-            # 4) Fill every week for monthly categories with monthly_avg = monthly_amount / 4.33
-            final_map = { **non_monthly_map }
-            for ws in weeks:
-                ym = ws.strftime('%Y-%m')
-                for cat in monthly_categories:
-                    info = monthly_map.get((ym, cat))
-                    monthly_amount = info['monthly_amount'] if info else 0.0
-                    weekly_amount = monthly_amount / 4.33 if monthly_amount > 0 else 0.0
-                    key = (ws, cat)
-                    final_map[key] = {
-                        'week_start': ws.strftime('%Y-%m-%d'),
-                        'category': cat,
-                        'color': (info['color'] if info else '#6366f1'),
-                        'is_monthly': True,
-                        'amount': round(weekly_amount, 2)
-                    }
-
-            # 5) Emit flattened list sorted by week then category
-            weekly_expenses_by_category = [v for _, v in sorted(final_map.items(), key=lambda x: (x[0][0], x[0][1]))]
-
-
-            # Get expenses by category over time (stacked bar)
-            cursor.execute("""
-                SELECT
-                    strftime('%Y-%m', l.transaction_date) as month,
-                    c.name as category,
-                    c.color,
-                    SUM(l.debit) as amount
-                FROM financial_ledger l
-                LEFT JOIN expense_categories c ON l.category_id = c.category_id
-                WHERE l.user_id = ?
-                    AND l.account = 'Expenses'
-                    AND l.transaction_date BETWEEN ? AND ?
-                    AND l.category_id IS NOT NULL
-                GROUP BY strftime('%Y-%m', l.transaction_date), c.category_id, c.name, c.color
-                ORDER BY month, amount DESC
-            """, (user_id, start_date, current_date))
-            expenses_over_time = self._rows_to_dicts(cursor.fetchall())
-
-            # Get weekly expenses by category for trends chart
-            cursor.execute("""
-                SELECT
-                    MIN(l.transaction_date) as week_start,
-                    strftime('%Y-%W', l.transaction_date) as year_week,
-                    c.name as category,
-                    c.color,
-                    SUM(l.debit) as amount
-                FROM financial_ledger l
-                LEFT JOIN expense_categories c ON l.category_id = c.category_id
-                WHERE l.user_id = ?
-                    AND l.account = 'Expenses'
-                    AND l.transaction_date BETWEEN ? AND ?
-                    AND l.category_id IS NOT NULL
-                GROUP BY strftime('%Y-%W', l.transaction_date), c.category_id, c.name, c.color
-                ORDER BY year_week, amount DESC
-            """, (user_id, start_date_str, current_date_str))
-            weekly_expenses_raw = self._rows_to_dicts(cursor.fetchall())
-
-            # Format weekly expenses data
-            weekly_expenses_by_category = []
-            for row in weekly_expenses_raw:
-                # Check if week_start is a string or datetime object
-                week_start_val = row['week_start']
-                if isinstance(week_start_val, str):
-                    formatted_week_start = week_start_val
-                elif week_start_val:
-                    formatted_week_start = week_start_val.strftime('%Y-%m-%d')
-                else:
-                    formatted_week_start = None
-
-                weekly_expenses_by_category.append({
-                    'week_start': formatted_week_start,
-                    'category': row['category'],
-                    'color': row['color'],
-                    'amount': float(row['amount'] or 0)
-                })
-
-            # Get assets vs liabilities over time (area chart)
-            # Use effective_start_date_str to avoid showing zeros before first transaction
-            cursor.execute("""
-                SELECT DATE(transaction_date) as date,
-                    SUM(CASE WHEN a.type IN ('CHECKING', 'SAVINGS', 'CASH', 'INVESTMENT', 'FIXED_ASSET') THEN debit - credit ELSE 0 END) as asset_change,
-                    SUM(CASE WHEN a.type IN ('LOAN', 'CREDIT_CARD', 'LINE_OF_CREDIT') THEN credit - debit ELSE 0 END) as liability_change
-                FROM financial_ledger l
-                JOIN accounts a ON l.account = a.name AND l.user_id = a.user_id
-                WHERE l.user_id = ? AND transaction_date BETWEEN ? AND ?
-                GROUP BY DATE(transaction_date)
-                ORDER BY date
-            """, (user_id, effective_start_date_str, current_date_str))
-            daily_balance_changes = self._rows_to_dicts(cursor.fetchall())
-
-            # Calculate starting assets and liabilities at the effective start date
-            cursor.execute("""
-                SELECT
-                    SUM(CASE WHEN a.type IN ('CHECKING', 'SAVINGS', 'CASH', 'INVESTMENT', 'FIXED_ASSET') THEN debit - credit ELSE 0 END) as starting_assets,
-                    SUM(CASE WHEN a.type IN ('LOAN', 'CREDIT_CARD', 'LINE_OF_CREDIT') THEN credit - debit ELSE 0 END) as starting_liabilities
-                FROM financial_ledger l
-                JOIN accounts a ON l.account = a.name AND l.user_id = a.user_id
-                WHERE l.user_id = ? AND transaction_date < ?
-            """, (user_id, effective_start_date_str))
-            starting = self._row_to_dict(cursor.fetchone())
-            cumulative_assets = float(starting['starting_assets'] or 0) if starting else 0.0
-            cumulative_liabilities = float(starting['starting_liabilities'] or 0) if starting else 0.0
-
-            # Start with the balance at the beginning of the effective period
+            # Assets vs liabilities over time (area chart)
+            cumulative_assets = float(before_effective['assets'] / 100.0 or 0)
+            cumulative_liabilities = float(before_effective['liabilities'] / 100.0 or 0)
             assets_vs_liabilities = [{
                 'date': effective_start_date_str,
                 'assets': float(cumulative_assets),
                 'liabilities': float(cumulative_liabilities)
             }]
-            for row in daily_balance_changes:
-                cumulative_assets += float(row['asset_change'] or 0)
-                cumulative_liabilities += float(row['liability_change'] or 0)
-                # Check if date is a string or datetime object
-                date_val = row['date']
-                if isinstance(date_val, str):
-                    formatted_date = date_val
-                else:
-                    formatted_date = date_val.strftime('%Y-%m-%d')
-
+            for date_key in sorted(daily_assets):
+                cumulative_assets += float(daily_assets[date_key]['assets'] / 100.0 or 0)
+                cumulative_liabilities += float(daily_assets[date_key]['liabilities'] / 100.0 or 0)
                 assets_vs_liabilities.append({
-                    'date': formatted_date,
+                    'date': date_key,
                     'assets': float(cumulative_assets),
                     'liabilities': float(cumulative_liabilities)
                 })
+            end_section('balance_trends')
 
-            # Get top 5 expense categories (horizontal bar)
-            cursor.execute("""
-                SELECT c.name, c.color, SUM(l.debit) as amount
-                FROM financial_ledger l
-                LEFT JOIN expense_categories c ON l.category_id = c.category_id
-                WHERE l.user_id = ?
-                    AND l.account = 'Expenses'
-                    AND l.transaction_date BETWEEN ? AND ?
-                    AND l.category_id IS NOT NULL
-                GROUP BY c.category_id, c.name, c.color
-                ORDER BY amount DESC
-                LIMIT 5
-            """, (user_id, start_date, current_date))
-            top_categories = self._rows_to_dicts(cursor.fetchall())
+            # Monthly and weekly income vs expenses (exclude reversals)
+            income_vs_expenses = [
+                {
+                    'month': month,
+                    'income': float(self._from_money_str(monthly[month]['income'] / 100.0)),
+                    'expenses': float(self._from_money_str(monthly[month]['expenses'] / 100.0))
+                } for month in sorted(monthly)
+            ]
+            weekly_income_expenses = [
+                {
+                    'week_start': weekly[week]['week_start'],
+                    'income': float(self._from_money_str(weekly[week]['income'] / 100.0)),
+                    'expenses': float(self._from_money_str(weekly[week]['expenses'] / 100.0))
+                } for week in sorted(weekly)
+            ]
+            business_weekly = [
+                {
+                    'week_start': business_weekly_map[week]['week_start'],
+                    'income': float(self._from_money_str(business_weekly_map[week]['income'] / 100.0)),
+                    'expenses': float(self._from_money_str(business_weekly_map[week]['expenses'] / 100.0))
+                } for week in sorted(business_weekly_map)
+            ]
 
-            # Get credit balance over time (credit cards + loans + lines of credit)
-            # First, get all credit accounts for this user
-            cursor.execute("""
-                SELECT account_id, name, type
-                FROM accounts
-                WHERE user_id = ? AND type IN ('CREDIT_CARD', 'LOAN', 'LINE_OF_CREDIT')
-                ORDER BY name
-            """, (user_id,))
-            credit_accounts = self._rows_to_dicts(cursor.fetchall())
+            # Expenses by category over time (stacked bar) and weekly for the trends chart
+            def by_period_then_amount(bucket):
+                items = sorted(bucket.items(), key=lambda kv: (kv[0][0], kv[0][1] is not None, kv[0][1] or 0))
+                return sorted(items, key=lambda kv: (kv[0][0], -kv[1]['cents']))
 
-            # Get daily balance changes for credit accounts
-            cursor.execute("""
-                SELECT DATE(transaction_date) as date,
-                    a.account_id,
-                    a.name as account_name,
-                    a.type as account_type,
-                    SUM(credit - debit) as daily_change
-                FROM financial_ledger l
-                JOIN accounts a ON l.account = a.name AND l.user_id = a.user_id
-                WHERE l.user_id = ?
-                    AND a.type IN ('CREDIT_CARD', 'LOAN', 'LINE_OF_CREDIT')
-                    AND transaction_date BETWEEN ? AND ?
-                GROUP BY DATE(transaction_date), a.account_id, a.name, a.type
-                ORDER BY date, a.name
-            """, (user_id, start_date, current_date))
-            daily_credit_changes = self._rows_to_dicts(cursor.fetchall())
-
-            # Calculate starting balance for each credit account before the period
-            cursor.execute("""
-                SELECT
-                    a.account_id,
-                    a.name as account_name,
-                    a.type as account_type,
-                    SUM(credit - debit) as balance_before_period
-                FROM financial_ledger l
-                JOIN accounts a ON l.account = a.name AND l.user_id = a.user_id
-                WHERE l.user_id = ?
-                    AND a.type IN ('CREDIT_CARD', 'LOAN', 'LINE_OF_CREDIT')
-                    AND transaction_date < ?
-                GROUP BY a.account_id, a.name, a.type
-            """, (user_id, start_date_str))
-            starting_balances = self._rows_to_dicts(cursor.fetchall())
+            expenses_over_time = [
+                {'month': month, 'category': name, 'color': color, 'amount': v['cents'] / 100.0}
+                for (month, _, name, color), v in by_period_then_amount(expenses_over_time_map)
+            ]
+            weekly_expenses_by_category = [
+                {'week_start': v['week_start'], 'category': name, 'color': color, 'amount': float(v['cents'] / 100.0 or 0)}
+                for (_, _, name, color), v in by_period_then_amount(weekly_expense_map)
+            ]
+
+            # Top 5 expense categories (horizontal bar)
+            top_categories = [
+                {'name': name, 'color': color, 'amount': v['cents'] / 100.0}
+                for (_, name, color), v in ordered_groups(top_category_map)[:5]
+            ]
+            end_section('period_series')
+
+            # Credit balance over time (credit cards + loans + lines of credit)
+            credit_accounts = [a for a in user_accounts if a['type'] in liability_types]
+            account_names = {a['account_id']: a['name'] for a in credit_accounts}
+            daily_credit_changes = [
+                {'date': date_key, 'account_id': account_id, 'daily_change': v['cents'] / 100.0}
+                for (date_key, account_id), v in sorted(daily_credit.items(),
+                                                        key=lambda kv: (kv[0][0], account_names[kv[0][1]]))
+            ]
 
             # Build a map of starting balances by account_id
             starting_balance_map = {}
-            for row in starting_balances:
-                starting_balance_map[row['account_id']] = float(row['balance_before_period'] or 0)
+            for account_id, cents in credit_before_start.items():
+                starting_balance_map[account_id] = float(cents / 100.0 or 0)
 
             # Build cumulative balance by date for each account
             credit_balance_by_account = {}
             for account in credit_accounts:
                 account_id = account['account_id']
-                account_name = account['name']
-                account_type = account['type']
 
                 # Initialize with starting balance
                 cumulative = starting_balance_map.get(account_id, 0.0)
                 credit_balance_by_account[account_id] = {
                     'account_id': account_id,
-                    'account_name': account_name,
-                    'account_type': account_type,
+                    'account_name': account['name'],
+                    'account_type': account['type'],
                     'starting_balance': cumulative,  # Include starting balance for chart
                     'balances': {
                         start_date_str: cumulative  # Add starting balance as first data point
@@ -3554,25 +5067,10 @@ class BusinessSimulator:
                 for row in daily_credit_changes:
                     if row['account_id'] == account_id:
                         cumulative += float(row['daily_change'] or 0)
-                        # Check if date is a string or datetime object
-                        date_val = row['date']
-                        if isinstance(date_val, str):
-                            date_str = date_val
-                        else:
-                            date_str = date_val.strftime('%Y-%m-%d')
-                        credit_balance_by_account[account_id]['balances'][date_str] = float(cumulative)
+                        credit_balance_by_account[account_id]['balances'][row['date']] = float(cumulative)
 
             # Calculate total credit balance trend (sum of all selected accounts)
-            # Get all unique dates
-            all_dates = set()
-            for row in daily_credit_changes:
-                # Check if date is a string or datetime object
-                date_val = row['date']
-                if isinstance(date_val, str):
-                    all_dates.add(date_val)
-                else:
-                    all_dates.add(date_val.strftime('%Y-%m-%d'))
-            all_dates = sorted(list(all_dates))
+            all_dates = sorted({row['date'] for row in daily_credit_changes})
 
             credit_balance_trend = []
             for date_str in all_dates:
@@ -3593,50 +5091,13 @@ class BusinessSimulator:
                     'date': date_str,
                     'total_balance': round(total_balance, 2)
                 })
+            end_section('credit_balances')
 
-            # Get weekly business income vs expenses (is_business = 1)
-            cursor.execute("""
-                SELECT
-                    MIN(transaction_date) as week_start,
-                    strftime('%Y-%W', transaction_date) as year_week,
-                    SUM(CASE WHEN account = 'Income' THEN credit ELSE 0 END) as income,
-                    SUM(CASE WHEN account = 'Expenses' THEN debit ELSE 0 END) as expenses
-                FROM financial_ledger
-                WHERE user_id = ? AND transaction_date BETWEEN ? AND ?
-                    AND is_reversal = 0
-                    AND is_business = 1
-                GROUP BY strftime('%Y-%W', transaction_date)
-                ORDER BY year_week
-            """, (user_id, start_date_str, current_date_str))
-            business_weekly_data = self._rows_to_dicts(cursor.fetchall())
-            business_weekly = [
-                {
-                    'week_start': row['week_start'],
-                    'income': float(self._from_money_str(row['income'])),
-                    'expenses': float(self._from_money_str(row['expenses']))
-                } for row in business_weekly_data
-            ]
-
-            # Get average monthly personal expenses for RUNWAY calculation
-            # Always use 90 days (or all data if less exists) - independent of date range selector
-            runway_start = current_date - datetime.timedelta(days=90)
-            runway_start_str = self._to_datetime_str(runway_start)
-
-            cursor.execute("""
-                SELECT AVG(monthly_total) as avg_monthly, COUNT(*) as month_count
-                FROM (
-                    SELECT SUM(debit) as monthly_total
-                    FROM financial_ledger
-                    WHERE user_id = ? AND account = 'Expenses'
-                        AND is_reversal = 0
-                        AND is_business = 0
-                        AND transaction_date BETWEEN ? AND ?
-                    GROUP BY strftime('%Y-%m', transaction_date)
-                )
-            """, (user_id, runway_start_str, current_date_str))
-            personal_avg_result = self._row_to_dict(cursor.fetchone())
-            personal_monthly_avg = float(self._from_money_str(personal_avg_result['avg_monthly'])) if personal_avg_result and personal_avg_result['avg_monthly'] else 0.0
-            runway_months_of_data = int(personal_avg_result['month_count'] or 0) if personal_avg_result else 0
+            # Average monthly personal expenses for RUNWAY calculation
+            monthly_totals = [runway_months[month]['cents'] / 100.0 for month in sorted(runway_months)]
+            personal_monthly_avg = float(self._from_money_str(sum(monthly_totals) / len(monthly_totals))) if monthly_totals and sum(monthly_totals) else 0.0
+            runway_months_of_data = len(monthly_totals)
+            end_section('runway')
 
             return {
                 'total_income': total_income,
@@ -3657,9 +5118,11 @@ class BusinessSimulator:
                 'assets_vs_liabilities': assets_vs_liabilities,
                 'top_categories': top_categories,
                 'credit_accounts': [{'account_id': a['account_id'], 'name': a['name'], 'type': a['type']} for a in credit_accounts],
-                'credit_balance_by_account': credit_balance_by_account,
+                # String keys, as JSON would write them anyway
+                'credit_balance_by_account': {str(k): v for k, v in credit_balance_by_account.items()},
                 'credit_balance_trend': credit_balance_trend,
-                'period_days': days
+                'period_days': days,
+                'timings': timings
             }
         finally:
             cursor.close()
@@ -3692,14 +5155,15 @@ class BusinessSimulator:
                 SELECT b.budget_id, b.category_id, b.monthly_limit,
                        c.name as category_name, c.color as category_color,
                        COALESCE(SUM(CASE
-                           WHEN l.transaction_date >= ? AND l.transaction_date <= ?
-                           AND l.account = 'Expenses' AND l.is_reversal = 0
-                           THEN CAST(l.debit AS REAL)
+                           WHEN l.account = 'Expenses' AND l.is_reversal = 0
+                           THEN l.debit_cents / 100.0
                            ELSE 0
                        END), 0) as spent
                 FROM budgets b
                 JOIN expense_categories c ON b.category_id = c.category_id
-                LEFT JOIN financial_ledger l ON l.category_id = b.category_id AND l.user_id = b.user_id
+                LEFT JOIN ledger_daily_rollups l ON l.user_id = b.user_id
+                    AND l.transaction_date >= ? AND l.transaction_date <= ?
+                    AND l.category_id = b.category_id
                 WHERE b.user_id = ?
                 GROUP BY b.budget_id, b.category_id, b.monthly_limit, c.name, c.color
                 ORDER BY c.name
@@ -3725,6 +5189,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def set_budget(self, user_id, category_id, monthly_limit):
         """Set or update a budget for a category"""
         conn, cursor = self._get_db_connection()
@@ -3743,6 +5208,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def delete_budget(self, user_id, budget_id):
         """Delete a budget"""
         conn, cursor = self._get_db_connection()
@@ -3795,6 +5261,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def add_savings_goal(self, user_id, name, target_amount, target_date=None, color='#10b981', icon='piggy-bank', account_id=None):
         """Add a new savings goal"""
         conn, cursor = self._get_db_connection()
@@ -3822,6 +5289,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def update_savings_goal(self, user_id, goal_id, name=None, target_amount=None, current_amount=None, target_date=None, color=None, icon=None, account_id=None, clear_account=False):
         """Update a savings goal"""
         conn, cursor = self._get_db_connection()
@@ -3885,6 +5353,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def contribute_to_goal(self, user_id, goal_id, amount):
         """Add or withdraw money from a savings goal (positive = add, negative = withdraw)"""
         conn, cursor = self._get_db_connection()
@@ -3926,6 +5395,7 @@ class BusinessSimulator:
             cursor.close()
             conn.close()
 
+    @writes_user_data
     def delete_savings_goal(self, user_id, goal_id):
         """Delete a savings goal"""
         conn, cursor = self._get_db_connection()
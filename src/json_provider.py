@@ -0,0 +1,92 @@
+"""
+Perfect Books - JSON Providers
+
+Flask JSON providers for API responses. Both encode the engine's values the
+same way:
+- Decimal as a float
+- datetime as ISO 8601 (e.g. "2025-10-18T12:00:00")
+- date as ISO 8601 with noon appended, to avoid UTC interpretation in browsers
+
+CustomJSONProvider runs on the standard library encoder, which calls
+default() from Python for every value it doesn't know. OrjsonJSONProvider
+hands the whole payload to orjson (when it is installed) and only falls back
+to default() for those same types, so a 5k-row ledger page is encoded in C
+instead of walking every row in Python.
+
+get_json_provider_class() picks orjson when available. Set
+PERFECTBOOKS_JSON_PROVIDER=stdlib to force the standard library encoder.
+
+Benchmark: python benchmarks/json_encode.py
+
+Author: Matthew Jenkins
+License: MIT
+"""
+
+import datetime
+import os
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class CustomJSONProvider(DefaultJSONProvider):
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return float(obj)
+        if isinstance(obj, datetime.datetime):
+            return obj.isoformat()
+        if isinstance(obj, datetime.date):
+            # Append time to avoid UTC interpretation issues
+            return obj.isoformat() + 'T12:00:00'
+        return super().default(obj)
+
+
+class OrjsonJSONProvider(CustomJSONProvider):
+    """
+    CustomJSONProvider with orjson doing the encoding.
+
+    Keys are sorted like the default provider. Dates and datetimes are passed
+    through to default() because orjson would otherwise write dates without
+    the noon suffix. Non-string keys are written as strings, as json.dumps
+    does. Output is UTF-8 rather than ASCII-escaped, which is equivalent JSON.
+    Calls with explicit json.dumps keyword arguments use the standard encoder.
+    """
+
+    if orjson is not None:
+        OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self.OPTIONS | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        body = orjson.dumps(obj, default=self.default, option=options)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def get_json_provider_class():
+    """
+    Return the JSON provider class to install on the Flask app.
+
+    Returns:
+        type: OrjsonJSONProvider if orjson is importable and not disabled,
+              otherwise CustomJSONProvider
+    """
+    if orjson is not None and os.getenv('PERFECTBOOKS_JSON_PROVIDER', 'orjson').lower() != 'stdlib':
+        return OrjsonJSONProvider
+    return CustomJSONProvider
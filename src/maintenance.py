@@ -0,0 +1,347 @@
+"""
+Perfect Books - Database Maintenance Commands
+
+Command-line checks and repairs for data the engine maintains alongside the
+financial ledger.
+
+Usage:
+    python src/maintenance.py verify-balances [user_id]
+    python src/maintenance.py rebuild-balances [user_id]
+    python src/maintenance.py verify-rollups [user_id]
+    python src/maintenance.py rebuild-rollups [user_id]
+    python src/maintenance.py verify-running-balances [user_id]
+    python src/maintenance.py rebuild-running-balances [user_id]
+    python src/maintenance.py rebuild-search [user_id]
+    python src/maintenance.py check-indexes
+
+verify-balances compares the materialised account_balances table against a
+full recomputation from financial_ledger and exits non-zero on any mismatch.
+rebuild-balances recomputes it from the ledger.
+verify-rollups / rebuild-rollups do the same for ledger_daily_rollups.
+verify-running-balances / rebuild-running-balances do the same for
+ledger_running_balances.
+rebuild-search rebuilds the ledger_search full-text index.
+check-indexes runs the engine's hot read and posting paths against a scratch
+database with the live schema, EXPLAINs every statement they issue and exits
+non-zero if any of them scans a ledger table instead of seeking an index.
+"""
+
+import datetime
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+try:
+    import engine
+    from engine import BusinessSimulator, DB_PATH
+    from db_pool import get_pool
+except ModuleNotFoundError:
+    from src import engine
+    from src.engine import BusinessSimulator, DB_PATH
+    from src.db_pool import get_pool
+
+
+def verify_balances(user_id=None):
+    """
+    Report accounts whose stored balance differs from the ledger.
+
+    Returns:
+        bool: True if every stored balance matches the ledger
+    """
+    sim = BusinessSimulator()
+    mismatches = sim.verify_account_balances(user_id)
+
+    if not mismatches:
+        print("[OK] account_balances matches financial_ledger")
+        return True
+
+    print(f"[ERROR] {len(mismatches)} account balance mismatch(es):")
+    for m in mismatches:
+        print(f"  user {m['user_id']:<5} {m['account']:<30} "
+              f"stored {m['stored_cents'] / 100:>14,.2f}  ledger {m['ledger_cents'] / 100:>14,.2f}")
+    return False
+
+
+def rebuild_balances(user_id=None):
+    """Recompute account_balances from financial_ledger."""
+    sim = BusinessSimulator()
+    count = sim.rebuild_account_balances(user_id)
+    print(f"[OK] Rebuilt account balances for {count} user(s)")
+    return True
+
+
+def verify_rollups(user_id=None):
+    """
+    Report days whose ledger_daily_rollups rows differ from the ledger.
+
+    Returns:
+        bool: True if every rollup row matches the ledger
+    """
+    sim = BusinessSimulator()
+    mismatches = sim.verify_daily_rollups(user_id)
+
+    if not mismatches:
+        print("[OK] ledger_daily_rollups matches financial_ledger")
+        return True
+
+    print(f"[ERROR] {len(mismatches)} rollup mismatch(es):")
+    for uid, transaction_date, account in mismatches:
+        print(f"  user {uid:<5} {transaction_date:<20} {account}")
+    return False
+
+
+def rebuild_rollups(user_id=None):
+    """Recompute ledger_daily_rollups from financial_ledger."""
+    sim = BusinessSimulator()
+    count = sim.rebuild_daily_rollups(user_id)
+    print(f"[OK] Rebuilt daily rollups for {count} user(s)")
+    return True
+
+
+def verify_running_balances(user_id=None):
+    """
+    Report ledger lines whose stored running balance differs from the ledger.
+
+    Returns:
+        bool: True if every running balance matches the ledger
+    """
+    sim = BusinessSimulator()
+    mismatches = sim.verify_running_balances(user_id)
+
+    if not mismatches:
+        print("[OK] ledger_running_balances matches financial_ledger")
+        return True
+
+    print(f"[ERROR] {len(mismatches)} running balance mismatch(es):")
+    for uid, account, transaction_date, entry_id in mismatches:
+        print(f"  user {uid:<5} {account:<30} {transaction_date:<20} entry {entry_id}")
+    return False
+
+
+def rebuild_running_balances(user_id=None):
+    """Recompute ledger_running_balances from financial_ledger."""
+    sim = BusinessSimulator()
+    count = sim.rebuild_running_balances(user_id)
+    print(f"[OK] Rebuilt running balances for {count} user(s)")
+    return True
+
+
+def rebuild_search(user_id=None):
+    """Rebuild the ledger_search full-text index from financial_ledger."""
+    sim = BusinessSimulator()
+    count = sim.rebuild_ledger_search(user_id)
+    print(f"[OK] Indexed {count} transaction(s) for ledger search")
+    return True
+
+
+# Tables that grow with the ledger; a full scan of one of these grows with
+# every user's history instead of only the caller's rows
+LEDGER_TABLES = {
+    'financial_ledger', 'transactions', 'account_balances', 'ledger_daily_rollups',
+    'ledger_running_balances', 'ledger_descriptions',
+}
+
+# Engine calls run on every page load or posting, with the indexes their plans
+# are expected to use. check-indexes runs each call against a scratch copy of
+# the schema and EXPLAINs the statements it actually issued, so the check
+# follows engine.py as it changes. `seed` is the data _seed_check_user made.
+HOT_PATHS = [
+    ('ledger page', ('idx_transactions_user_order',),
+     lambda sim, seed: sim.get_ledger_entries(seed['user_id'], transaction_limit=2)),
+    ('ledger page (keyset)', ('idx_transactions_user_order',),
+     lambda sim, seed: sim.get_ledger_entries(seed['user_id'], transaction_limit=2, page_cursor=seed['page_cursor'])),
+    ('ledger page (account)', ('idx_transactions_user_order', 'PRIMARY KEY'),
+     lambda sim, seed: sim.get_ledger_entries(seed['user_id'], transaction_limit=2, account_filter='Checking')),
+    ('transactions by amount', ('idx_transactions_user_amount',),
+     lambda sim, seed: sim.get_ledger_entries(seed['user_id'], search_query='10..100')),
+    ('account balance as of date', ('idx_ledger_user_account_date',),
+     lambda sim, seed: sim.get_balance_sheet(seed['user_id'], as_of_date=seed['today'])),
+    ('back-dated expense', ('PRIMARY KEY',),
+     lambda sim, seed: sim.log_expense(seed['user_id'], seed['checking_id'], 'Index Check', 1.00,
+                                       transaction_date=seed['start'], category_id=seed['category_id'])),
+    ('transaction reversal', ('idx_ledger_user_uuid',),
+     lambda sim, seed: sim.reverse_transaction(seed['user_id'], seed['reverse_uuid'])),
+    ('category transaction count', ('idx_transactions_user_category',),
+     lambda sim, seed: sim.get_category_transaction_count(seed['user_id'], seed['category_id'])),
+    ('transactions by category', ('idx_ledger_user_category_date',),
+     lambda sim, seed: sim.get_transactions_by_category(seed['user_id'], seed['category_id'], seed['start'], seed['today'])),
+    ('expense analysis', ('PRIMARY KEY',),
+     lambda sim, seed: sim.get_expense_analysis(seed['user_id'], seed['start'], seed['today'])),
+    ('dashboard', ('PRIMARY KEY', 'idx_transactions_user_order'),
+     lambda sim, seed: sim.get_dashboard_data(seed['user_id'], days=30)),
+    ('daily net', ('PRIMARY KEY',),
+     lambda sim, seed: sim.get_daily_net(seed['user_id'], seed['today'])),
+    ('account deletion', ('idx_ledger_user_account_date',),
+     lambda sim, seed: sim.delete_account(seed['user_id'], seed['closed_account_id'])),
+]
+
+_TABLE_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|INNER\b|USING\b)(\w+))?",
+                          re.IGNORECASE)
+
+
+def _create_scratch_database(live_path, scratch_path):
+    """
+    Create an empty database with the live database's schema and planner
+    statistics (sqlite_stat1), so statements are planned as they would be live.
+    """
+    live = sqlite3.connect(f"file:{live_path}?mode=ro", uri=True)
+    scratch = sqlite3.connect(str(scratch_path))
+    try:
+        objects = live.execute(
+            "SELECT name, tbl_name, sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY rowid"
+        ).fetchall()
+        # Full-text tables create their own shadow tables
+        virtual = [name for name, _, sql in objects if sql.upper().startswith('CREATE VIRTUAL TABLE')]
+        for name, table, sql in objects:
+            if table.startswith('sqlite_') or any(table.startswith(f"{v}_") for v in virtual):
+                continue
+            scratch.execute(sql)
+
+        if live.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            scratch.execute("ANALYZE")
+            scratch.execute("DELETE FROM sqlite_stat1")
+            scratch.executemany("INSERT INTO sqlite_stat1 VALUES (?, ?, ?)",
+                                live.execute("SELECT tbl, idx, stat FROM sqlite_stat1"))
+        scratch.commit()
+    finally:
+        live.close()
+        scratch.close()
+
+
+def _seed_check_user(sim):
+    """Give the scratch database one user with enough history for every HOT_PATHS call."""
+    success, message, user_id = sim.register_user('check-indexes', 'check-indexes-password')
+    if not success:
+        raise RuntimeError(message)
+    sim.add_single_account(user_id, 'Checking', 'CHECKING', 5000)
+    sim.add_single_account(user_id, 'Visa', 'CREDIT_CARD', 0, credit_limit=5000)
+    sim.add_single_account(user_id, 'Closed Savings', 'SAVINGS', 0)
+    accounts = {account['name']: account['account_id'] for account in sim.get_accounts_list(user_id)}
+    category_id = sim.get_expense_categories(user_id)[0]['category_id']
+
+    today = datetime.date.today()
+    start = today - datetime.timedelta(days=60)
+    for days_ago in range(60, 0, -6):
+        day = (today - datetime.timedelta(days=days_ago)).isoformat()
+        sim.log_income(user_id, accounts['Checking'], 'Paycheck', 1200, transaction_date=day)
+        sim.log_expense(user_id, accounts['Checking'], 'Groceries', 45.10, transaction_date=day, category_id=category_id)
+        sim.log_expense(user_id, accounts['Visa'], 'Fuel', 38.75, transaction_date=day, category_id=category_id)
+
+    first_page = sim.get_ledger_entries(user_id, transaction_limit=2, page_cursor='')
+    return {
+        'user_id': user_id,
+        'checking_id': accounts['Checking'],
+        'closed_account_id': accounts['Closed Savings'],
+        'category_id': category_id,
+        'today': today.isoformat(),
+        'start': start.isoformat(),
+        'page_cursor': first_page['next_cursor'],
+        'reverse_uuid': first_page['entries'][0]['transaction_uuid'],
+    }
+
+
+def _plan_problems(conn, sql):
+    """
+    EXPLAIN one traced statement.
+
+    Returns:
+        tuple: (plan steps, the steps that scan a ledger table)
+    """
+    plan = [row['detail'] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    tables = {}
+    for table, alias in _TABLE_ALIAS.findall(sql):
+        tables[table] = table
+        if alias:
+            tables[alias] = table
+    materialised = {step.split()[1] for step in plan if step.startswith(('MATERIALIZE ', 'CO-ROUTINE '))}
+    scans = [step for step in plan
+             if step.startswith('SCAN ') and step.split()[1] not in materialised
+             and tables.get(step.split()[1], step.split()[1]) in LEDGER_TABLES]
+    return plan, scans
+
+
+def check_indexes(user_id=None):
+    """
+    Run every HOT_PATHS call and EXPLAIN the statements it issued; flag full
+    scans of ledger tables and calls that no longer use their expected index.
+
+    The calls run against a scratch database with the live schema and planner
+    statistics, never against live data. A plan step starting with "SCAN" walks
+    a whole table (or a whole index). Scans of a subquery the plan materialised
+    itself (e.g. the ledger page's LIMITed recent_t) are bounded and allowed.
+
+    Returns:
+        bool: True if every hot path is answered with index seeks
+    """
+    failures = []
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        scratch_path = Path(scratch_dir) / "check_indexes.db"
+        _create_scratch_database(DB_PATH, scratch_path)
+
+        live_path = engine.DB_PATH
+        engine.DB_PATH = scratch_path
+        pool = get_pool(scratch_path)
+        try:
+            sim = BusinessSimulator()
+            seed = _seed_check_user(sim)
+
+            for name, indexes, call in HOT_PATHS:
+                statements = []
+                with pool.traced(statements.append):
+                    call(sim, seed)
+
+                problems, plans = [], []
+                with pool.connection() as conn:
+                    for sql in dict.fromkeys(statements):
+                        if not sql.lstrip().upper().startswith(('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')):
+                            continue
+                        plan, scans = _plan_problems(conn, sql)
+                        plans.append((sql, plan, scans))
+                        problems += [f"scan: {step}" for step in scans]
+                missing = [index for index in indexes
+                           if not any(f"{index} (" in step for _, plan, _ in plans for step in plan)]
+                problems += [f"expected {index}" for index in missing]
+
+                if problems:
+                    failures.append(name)
+                    print(f"[ERROR] {name}: {'; '.join(problems)}")
+                    for sql, plan, scans in plans:
+                        if scans or missing:
+                            print(f"    {' '.join(sql.split())[:200]}")
+                            for step in plan:
+                                print(f"        {step}")
+                else:
+                    print(f"[OK] {name} ({len(plans)} statements)")
+        finally:
+            engine.DB_PATH = live_path
+            pool.close_idle()
+
+    if failures:
+        print(f"[ERROR] {len(failures)} hot path(s) fall back to a scan or lost their index")
+        return False
+    print(f"[OK] All {len(HOT_PATHS)} hot paths use an index")
+    return True
+
+
+COMMANDS = {
+    'verify-balances': verify_balances,
+    'rebuild-balances': rebuild_balances,
+    'verify-rollups': verify_rollups,
+    'rebuild-rollups': rebuild_rollups,
+    'verify-running-balances': verify_running_balances,
+    'rebuild-running-balances': rebuild_running_balances,
+    'rebuild-search': rebuild_search,
+    'check-indexes': check_indexes,
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print(__doc__)
+        sys.exit(2)
+
+    command = COMMANDS[sys.argv[1]]
+    target_user = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    sys.exit(0 if command(target_user) else 1)
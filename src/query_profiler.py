@@ -0,0 +1,382 @@
+"""
+Perfect Books - SQL Query Profiler
+
+Opt-in instrumentation of every statement the engine runs. When enabled, the
+connection pool (db_pool.py) hands out connections whose cursors time each
+execute, count the rows it returned or changed, and report them here together
+with the engine method that issued it.
+
+Statements are grouped by fingerprint: the SQL with whitespace collapsed and
+literals and IN (?, ?, ...) lists folded, so the same query shape counts as
+one entry however it was parameterised. Each fingerprint keeps its call count,
+total/max time, rows and a fixed-bucket latency histogram, so memory stays
+bounded however long the process runs; past PERFECTBOOKS_QUERY_PROFILE_MAX
+distinct fingerprints, new shapes are pooled under '(other)'.
+
+Statements slower than the threshold are also appended, one JSON object per
+line, to a rotating slow-query log and kept in a short in-memory list. Only
+the SQL text is logged, never the bound parameters (they carry user data).
+
+The numbers are per process: each gunicorn worker profiles its own queries.
+With profiling off (the default) connections are plain pooled connections and
+nothing here runs.
+
+Usage:
+    profiler.snapshot()          # what /api/admin/queries returns
+    profiler.reset()
+
+Configuration (environment variables):
+- PERFECTBOOKS_QUERY_PROFILE: 1 to enable profiling (default 0)
+- PERFECTBOOKS_SLOW_QUERY_MS: Slow-query threshold in ms (default 100)
+- PERFECTBOOKS_SLOW_QUERY_LOG: Slow-query log file (default src/data/slow_queries.log)
+- PERFECTBOOKS_QUERY_PROFILE_MAX: Distinct fingerprints tracked (default 500)
+
+Author: Matthew Jenkins
+License: MIT
+"""
+
+import bisect
+import datetime
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+
+DEFAULT_ENABLED = os.getenv('PERFECTBOOKS_QUERY_PROFILE', '0') == '1'
+DEFAULT_SLOW_MS = float(os.getenv('PERFECTBOOKS_SLOW_QUERY_MS', '100'))
+DEFAULT_SLOW_LOG = os.getenv('PERFECTBOOKS_SLOW_QUERY_LOG') or str(Path(__file__).parent / "data" / "slow_queries.log")
+DEFAULT_MAX_FINGERPRINTS = int(os.getenv('PERFECTBOOKS_QUERY_PROFILE_MAX', '500'))
+
+# Histogram bucket upper bounds in ms; the last bucket is everything slower
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Slow queries kept in memory for the admin endpoint
+RECENT_SLOW_QUERIES = 100
+
+# Methods of this class (in these modules) count as the calling engine method;
+# decorator wrappers and nested helpers are skipped
+CALLER_MODULES = ('engine', 'src.engine')
+CALLER_CLASS = 'BusinessSimulator'
+
+OTHER_FINGERPRINT = '(other)'
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """
+    Normalise a statement to its shape.
+
+    Example:
+        "SELECT * FROM t WHERE id IN (?, ?, ?) AND kind = 'x' LIMIT 20"
+        -> "SELECT * FROM t WHERE id IN (?...) AND kind = ? LIMIT ?"
+    """
+    text = _STRING_LITERAL.sub('?', sql)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _PLACEHOLDER_LIST.sub('?...', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+# code object -> whether it is a BusinessSimulator method's own body
+_engine_method_codes = {}
+
+
+def _is_engine_method(code, frame):
+    """
+    True if the frame runs a method defined on BusinessSimulator itself, not a
+    decorator wrapper or a function nested in a method.
+
+    Compares the frame's code with the method of that name on self's class
+    (unwrapped), so it works without code.co_qualname (Python 3.11+).
+    """
+    known = _engine_method_codes.get(code)
+    if known is not None:
+        return known
+    owner = frame.f_locals.get('self')
+    is_method = False
+    for cls in type(owner).__mro__ if owner is not None else ():
+        if cls.__name__ == CALLER_CLASS:
+            func = cls.__dict__.get(code.co_name)
+            while hasattr(func, '__wrapped__'):
+                func = func.__wrapped__
+            is_method = getattr(func, '__code__', None) is code
+            break
+    _engine_method_codes[code] = is_method
+    return is_method
+
+
+def calling_method():
+    """
+    Name the engine method running the current statement.
+
+    Returns:
+        str: 'public_method' or 'public_method > _helper' (outermost and
+             innermost engine frames), or '' outside the engine
+    """
+    frame = sys._getframe(2)
+    outer = inner = None
+    while frame is not None:
+        code = frame.f_code
+        if frame.f_globals.get('__name__') in CALLER_MODULES and _is_engine_method(code, frame):
+            inner = inner or code.co_name
+            outer = code.co_name
+        frame = frame.f_back
+    if outer is None:
+        return ''
+    return outer if outer == inner else f"{outer} > {inner}"
+
+
+class QueryStats:
+    """Running totals and latency histogram for one fingerprint."""
+
+    __slots__ = ('calls', 'total_ms', 'max_ms', 'rows', 'buckets', 'methods')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.methods = {}
+
+    def add(self, ms, rows, method):
+        self.calls += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.rows += rows
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.methods[method] = self.methods.get(method, 0) + 1
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile call (ms)."""
+        target = p / 100 * self.calls
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return round(self.max_ms, 3)
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.calls, 3) if self.calls else 0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': round(self.max_ms, 3),
+            'rows': self.rows,
+            'histogram': dict(zip([f"<={bound}ms" for bound in BUCKET_BOUNDS_MS] + ['slower'], self.buckets)),
+            'methods': dict(sorted(self.methods.items(), key=lambda item: -item[1])),
+        }
+
+
+class QueryProfiler:
+    """
+    Per-process collector of statement timings.
+
+    Args:
+        enabled (bool): Whether the pool should hand out profiled connections
+        slow_ms (float): Statements at least this slow go to the slow-query log
+        slow_log_path (str): Slow-query log file ('' to keep them in memory only)
+        max_fingerprints (int): Distinct statement shapes tracked individually
+    """
+
+    def __init__(self, enabled=DEFAULT_ENABLED, slow_ms=DEFAULT_SLOW_MS,
+                 slow_log_path=DEFAULT_SLOW_LOG, max_fingerprints=DEFAULT_MAX_FINGERPRINTS):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.slow_log_path = slow_log_path
+        self.max_fingerprints = max(1, int(max_fingerprints))
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._recent_slow = deque(maxlen=RECENT_SLOW_QUERIES)
+        self._slow_logger = None
+        self._started = time.time()
+
+    def record(self, sql, ms, rows, method):
+        """Add one executed statement."""
+        shape = fingerprint(sql)
+        with self._lock:
+            stats = self._stats.get(shape)
+            if stats is None:
+                key = shape if len(self._stats) < self.max_fingerprints else OTHER_FINGERPRINT
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = QueryStats()
+            stats.add(ms, rows, method)
+
+        if ms >= self.slow_ms:
+            self._log_slow(shape, sql, ms, rows, method)
+
+    def _log_slow(self, shape, sql, ms, rows, method):
+        entry = {
+            'at': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'ms': round(ms, 3),
+            'rows': rows,
+            'method': method,
+            'fingerprint': shape,
+            'sql': sql.strip()[:2000],
+        }
+        self._recent_slow.append(entry)
+        logger = self._get_slow_logger()
+        if logger is not None:
+            logger.warning(json.dumps(entry))
+
+    def _get_slow_logger(self):
+        if not self.slow_log_path:
+            return None
+        if self._slow_logger is None:
+            with self._lock:
+                if self._slow_logger is None:
+                    Path(self.slow_log_path).parent.mkdir(parents=True, exist_ok=True)
+                    handler = logging.handlers.RotatingFileHandler(
+                        self.slow_log_path, maxBytes=5 * 1024 * 1024, backupCount=3, encoding='utf-8')
+                    handler.setFormatter(logging.Formatter('%(message)s'))
+                    logger = logging.getLogger('perfectbooks.slow_queries')
+                    logger.addHandler(handler)
+                    logger.setLevel(logging.WARNING)
+                    logger.propagate = False
+                    self._slow_logger = logger
+        return self._slow_logger
+
+    def snapshot(self, limit=50, sort='total_ms'):
+        """
+        Return the profile collected so far.
+
+        Args:
+            limit (int): Fingerprints returned
+            sort (str): total_ms, calls, max_ms, mean_ms or rows (descending)
+
+        Returns:
+            dict: enabled, thresholds, fingerprints (busiest first) and recent slow queries
+        """
+        with self._lock:
+            queries = [dict(stats.to_dict(), fingerprint=shape) for shape, stats in self._stats.items()]
+            recent_slow = list(self._recent_slow)
+        if sort not in ('total_ms', 'calls', 'max_ms', 'mean_ms', 'rows'):
+            sort = 'total_ms'
+        queries.sort(key=lambda query: -query[sort])
+        return {
+            'enabled': self.enabled,
+            'pid': os.getpid(),
+            'since': datetime.datetime.fromtimestamp(self._started).isoformat(timespec='seconds'),
+            'slow_ms': self.slow_ms,
+            'slow_log': self.slow_log_path or None,
+            'fingerprints': len(queries),
+            'statements': sum(query['calls'] for query in queries),
+            'queries': queries[:limit],
+            'recent_slow': recent_slow[::-1],
+        }
+
+    def reset(self):
+        """Forget everything collected so far (the slow-query log file is kept)."""
+        with self._lock:
+            self._stats.clear()
+            self._recent_slow.clear()
+            self._started = time.time()
+
+
+# Process-wide profiler used by the connection pool and the admin endpoint
+profiler = QueryProfiler()
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """
+    Cursor that reports each statement to the profiler.
+
+    A SELECT is timed from execute until its rows have been fetched (or the
+    cursor moves on to another statement), so the time includes the row
+    stepping SQLite does lazily during fetches.
+    """
+
+    _pending = None
+
+    def _finish(self):
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            profiler.record(*pending)
+
+    def _run(self, run, sql, *args):
+        self._finish()
+        method = calling_method()
+        started = time.perf_counter()
+        try:
+            run(sql, *args)
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            if self.description is None:
+                # No result set: report now with the rows changed
+                profiler.record(sql, ms, max(self.rowcount, 0), method)
+            else:
+                self._pending = [sql, ms, 0, method]
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run(super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._run(super().executescript, sql_script)
+
+    def _fetched(self, started, rows, done):
+        pending = self._pending
+        if pending is not None:
+            pending[1] += (time.perf_counter() - started) * 1000
+            pending[2] += rows
+            if done:
+                self._finish()
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Cursors dropped after a single fetchone() still get reported
+        if self._pending is not None and profiler is not None:
+            self._finish()
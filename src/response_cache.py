@@ -0,0 +1,239 @@
+"""
+Perfect Books - Per-User Response Cache
+
+This module keeps serialized JSON responses for the read endpoints the web
+interface polls (/api/dashboard, /api/accounts, /api/status, reports, ...) so
+a repeat request for unchanged data is answered without recomputing it from
+SQLite or re-encoding it.
+
+Entries are keyed by user, endpoint and query parameters, and stored together
+with the user's data version (BusinessSimulator.get_data_version). Every
+engine write bumps that version, so an entry is served only while the data it
+was built from is still current - nothing has to be invalidated explicitly,
+stale entries simply stop matching and age out of the LRU.
+
+Two tiers:
+- In-process LRU (always on unless the size is 0): a dict lookup per hit.
+- Shared SQLite file (optional): lets gunicorn workers reuse each other's
+  responses. Checked after an in-process miss; hits are copied into the LRU.
+
+The same key and version also make the ETag (make_etag) the API sends, so a
+client revalidating unchanged data gets a 304 before the cache is consulted.
+
+Usage:
+    cache = ResponseCache()
+    key = cache.make_key(user_id, 'get_dashboard_data', request.args)
+    body = cache.get(key, version)
+    if body is None:
+        body = render()
+        cache.put(key, version, body)
+
+Configuration (environment variables):
+- PERFECTBOOKS_RESPONSE_CACHE_SIZE: Entries kept in the in-process LRU
+  (default 512, 0 disables the cache)
+- PERFECTBOOKS_RESPONSE_CACHE_PATH: SQLite file for the shared tier
+  (default unset = in-process only)
+- PERFECTBOOKS_RESPONSE_CACHE_SHARED_SIZE: Entries kept in the shared tier
+  before the oldest are pruned (default 5000)
+
+Author: Matthew Jenkins
+License: MIT
+"""
+
+import datetime
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from db_pool import get_pool
+except ModuleNotFoundError:
+    from src.db_pool import get_pool
+
+
+DEFAULT_CACHE_SIZE = int(os.getenv('PERFECTBOOKS_RESPONSE_CACHE_SIZE', '512'))
+DEFAULT_SHARED_PATH = os.getenv('PERFECTBOOKS_RESPONSE_CACHE_PATH') or None
+DEFAULT_SHARED_SIZE = int(os.getenv('PERFECTBOOKS_RESPONSE_CACHE_SHARED_SIZE', '5000'))
+
+# Prune the shared tier once per this many writes rather than on every put
+SHARED_PRUNE_EVERY = 100
+
+
+def make_etag(key, version):
+    """
+    ETag for a response identified by a cache key at a data version.
+
+    Equal keys at equal versions always carry the same body, so the tag can
+    be derived without encoding (or even computing) the response.
+
+    Returns:
+        str: Opaque tag value (unquoted)
+    """
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).hexdigest()
+    return f"{digest}-{version}"
+
+
+class ResponseCache:
+    """
+    Bounded LRU of serialized responses, validated against a data version.
+
+    Args:
+        size (int): Maximum entries in the in-process LRU (0 disables caching)
+        shared_path (str): SQLite file for the cross-process tier, or None
+        shared_size (int): Maximum entries kept in the shared tier
+    """
+
+    def __init__(self, size=DEFAULT_CACHE_SIZE, shared_path=DEFAULT_SHARED_PATH,
+                 shared_size=DEFAULT_SHARED_SIZE):
+        self.size = max(0, int(size))
+        self.shared_path = shared_path
+        self.shared_size = max(1, int(shared_size))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared_writes = 0
+        self._shared_ready = False
+        self.stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0}
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    @staticmethod
+    def make_key(user_id, endpoint, args=None, today=None):
+        """
+        Build the cache key for one request.
+
+        Several readers window their results on the engine's current date, so
+        the date is part of the key and entries roll over at midnight even if
+        the user wrote nothing. That date is SQLite's current_date, which is
+        UTC, so the key uses the UTC date rather than the server's local one.
+
+        Args:
+            user_id: Logged-in user's ID
+            endpoint (str): Flask endpoint (view function) name
+            args: Query parameters (MultiDict or dict)
+            today (date, optional): Defaults to the current UTC date
+
+        Returns:
+            str: Cache key
+        """
+        if args is None:
+            params = ''
+        elif hasattr(args, 'items') and hasattr(args, 'getlist'):
+            params = '&'.join(f"{k}={v}" for k, v in sorted(args.items(multi=True)))
+        else:
+            params = '&'.join(f"{k}={v}" for k, v in sorted(args.items()))
+        today = today or datetime.datetime.now(datetime.timezone.utc).date()
+        return f"{int(user_id)}|{endpoint}|{params}|{today.isoformat()}"
+
+    def get(self, key, version):
+        """
+        Return the cached body for key if it was stored at this version.
+
+        Returns:
+            bytes: Cached response body, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[1]
+                # Built from older data - drop it now rather than wait for LRU
+                del self._entries[key]
+                self.stats['stale'] += 1
+
+        body = self._shared_get(key, version)
+        if body is not None:
+            self._store(key, version, body)
+            with self._lock:
+                self.stats['shared_hits'] += 1
+            return body
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key, version, body):
+        """Store a serialized response body for key at this data version."""
+        if not self.enabled:
+            return
+        self._store(key, version, body)
+        self._shared_put(key, version, body)
+
+    def _store(self, key, version, body):
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        """Drop every in-process entry (the shared tier is left alone)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # --- Shared SQLite tier ---
+
+    def _shared_connection(self):
+        pool = get_pool(self.shared_path)
+        if not self._shared_ready:
+            with pool.connection() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS response_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        version INTEGER NOT NULL,
+                        body BLOB NOT NULL,
+                        stored_at REAL NOT NULL
+                    )
+                """)
+            self._shared_ready = True
+        return pool.connection()
+
+    def _shared_get(self, key, version):
+        if not self.shared_path:
+            return None
+        try:
+            with self._shared_connection() as conn:
+                row = conn.execute(
+                    "SELECT body FROM response_cache WHERE cache_key = ? AND version = ?",
+                    (key, version)
+                ).fetchone()
+            return bytes(row['body']) if row else None
+        except sqlite3.Error as e:
+            # The shared tier is an optimisation; never fail a request over it
+            print(f"[CACHE] Shared cache read failed: {e}")
+            return None
+
+    def _shared_put(self, key, version, body):
+        if not self.shared_path:
+            return
+        try:
+            with self._shared_connection() as conn:
+                conn.execute("""
+                    INSERT INTO response_cache (cache_key, version, body, stored_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(cache_key) DO UPDATE
+                    SET version = excluded.version, body = excluded.body, stored_at = excluded.stored_at
+                """, (key, version, body, time.time()))
+
+                self._shared_writes += 1
+                if self._shared_writes % SHARED_PRUNE_EVERY == 0:
+                    conn.execute("""
+                        DELETE FROM response_cache WHERE cache_key NOT IN (
+                            SELECT cache_key FROM response_cache ORDER BY stored_at DESC LIMIT ?
+                        )
+                    """, (self.shared_size,))
+        except sqlite3.Error as e:
+            print(f"[CACHE] Shared cache write failed: {e}")
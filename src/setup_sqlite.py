@@ -31,6 +31,11 @@ import sqlite3
 from pathlib import Path
 from datetime import datetime
 
+try:
+    from db_pool import PRAGMA_PROFILE, get_pool
+except ModuleNotFoundError:
+    from src.db_pool import PRAGMA_PROFILE, get_pool
+
 
 def get_db_path():
     """Return the path to the SQLite database file"""
@@ -56,6 +61,10 @@ def create_database():
     # Enable foreign key constraints (CRITICAL for data integrity)
     cursor.execute("PRAGMA foreign_keys = ON;")
 
+    # WAL journaling is stored in the file, so set it once here; the engine's
+    # connection pool applies the rest of the PRAGMA profile per connection
+    cursor.execute(f"PRAGMA journal_mode = {PRAGMA_PROFILE['journal_mode']};")
+
     print(f"--- Creating Perfect Books Database ---")
     print(f"Location: {db_path}")
     print()
@@ -314,7 +323,14 @@ def reset_database():
 
     if db_path.exists():
         print(f"[WARNING]  WARNING: Deleting existing database at {db_path}")
+        # Pooled connections would keep writing to the deleted file
+        get_pool(db_path).invalidate()
         db_path.unlink()
+        # Remove WAL side files so they aren't replayed into the new database
+        for suffix in ('-wal', '-shm'):
+            side_file = db_path.with_name(db_path.name + suffix)
+            if side_file.exists():
+                side_file.unlink()
         print("[OK] Old database deleted")
 
     return create_database()
@@ -60,6 +60,14 @@ def backup_database(db_path):
 
     today = datetime.now()
 
+    # Fold any WAL contents into the main file so the copies are complete
+    import sqlite3
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    finally:
+        conn.close()
+
     # 1. Always copy to latest
     shutil.copy2(db_path, backup_dir / 'perfectbooks.db')
 